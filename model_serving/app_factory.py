@@ -7,6 +7,14 @@ from flask import Flask
 
 from model_serving.services.database.database_client import init_db
 from model_serving.services.inference_service import inference_service
+from model_serving.services.batching_service import micro_batching_service
+from model_serving.services.umap_service import umap_service
+from model_serving.services.cache_service import cache_service
+from model_serving.services.memoization_service import memoization_service
+from model_serving.services.enrichment_service import enrichment_service
+from model_serving.services.database.prediction_writer import prediction_writer
+from model_serving.services.database.encoding import compact_encoding
+from model_serving.services.warmup_service import warmup_service
 from model_serving.gateways.mlflow_gateway import mlflow_gateway
 from model_serving.monitoring import init_metrics
 
@@ -23,14 +31,44 @@ def create_app(config):
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     init_db(app=app)
+    compact_encoding.init_app(app=app)
     init_blueprints(app=app)
     init_metrics(app=app)
     # inference_service(app=app)
     mlflow_gateway.init_app(app=app)
+    micro_batching_service.init_app(app=app, gateway=mlflow_gateway)
+    umap_service.init_app(app=app, gateway=mlflow_gateway)
+    enrichment_service.init_app(app=app)
+    prediction_writer.init_app(app=app)
+    cache_service.init_app(app=app, gateway=mlflow_gateway)
+    memoization_service.init_app(app=app, gateway=mlflow_gateway)
+    warmup_service.init_app(app=app, gateway=mlflow_gateway)
     
     return app
 
 
+def create_asgi_app(config):
+    """
+    ASGI variant of create_app for uvicorn/hypercorn. The Flask app is built as usual and each request is
+    dispatched to a pool of ASGI_MAX_WORKERS threads, while inference and SHAP/UMAP calls run on the separately
+    bounded ASGI_INFERENCE_WORKERS and ASGI_ENRICHMENT_WORKERS pools. Predictions are always stored through the
+    write-behind writer, so request threads don't wait on database commits either.
+    """
+    from model_serving.asgi import WSGIToASGI
+    from model_serving.services.offload_service import offload_service
+
+    app = create_app(config)
+    offload_service.init_app(app=app)
+
+    app.config['WRITE_BEHIND'] = {**app.config.get('WRITE_BEHIND', {}), 'enabled': True}
+    prediction_writer.init_app(app=app)
+
+    return WSGIToASGI(
+        app, max_workers=app.config.get('ASGI_MAX_WORKERS', 64),
+        on_shutdown=[prediction_writer.flush, offload_service.shutdown]
+    )
+
+
 def create_unittest_app(config):
 
     app = Flask(__name__)
@@ -42,10 +80,18 @@ def create_unittest_app(config):
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     init_db(app=app, drop_db=True)
+    compact_encoding.init_app(app=app)
     init_blueprints(app=app)
     init_metrics(app=app)
     # inference_service(app=app)
     mlflow_gateway.init_app(app=app)
+    micro_batching_service.init_app(app=app, gateway=mlflow_gateway)
+    umap_service.init_app(app=app, gateway=mlflow_gateway)
+    enrichment_service.init_app(app=app)
+    prediction_writer.init_app(app=app)
+    cache_service.init_app(app=app, gateway=mlflow_gateway)
+    memoization_service.init_app(app=app, gateway=mlflow_gateway)
+    warmup_service.init_app(app=app, gateway=mlflow_gateway)
 
     return app
 
@@ -58,4 +104,7 @@ def init_blueprints(app):
     app.register_blueprint(metrics)
     
     from model_serving.routes.prediction import prediction
-    app.register_blueprint(prediction)
\ No newline at end of file
+    app.register_blueprint(prediction)
+
+    from model_serving.routes.health import health
+    app.register_blueprint(health)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Callable, Iterable
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    raise ImportError('Serving over ASGI requires a2wsgi (pip install a2wsgi)')
+
+
+logger = logging.getLogger(__name__)
+
+
+class WSGIToASGI:
+    """
+    Serves a WSGI app (the Flask app from create_app) over ASGI. Requests go through a2wsgi's WSGIMiddleware: the
+    event loop only does socket I/O, and every request runs on a thread of its bounded pool with the request and
+    response bodies streamed through. The request threads mostly wait: create_asgi_app hands the CPU-bound model
+    calls to OffloadService's own pools, which keeps slow SHAP/UMAP requests from starving cheap predictions.
+
+    Only the lifespan protocol is handled here, so that on_shutdown callbacks run once in-flight requests are done.
+    """
+
+    def __init__(self, wsgi_app, max_workers: int = 8, max_pending_chunks: int = 16,
+                 on_shutdown: Iterable[Callable[[], None]] = ()):
+        self.middleware = WSGIMiddleware(
+            self._input_terminated(wsgi_app), workers=max_workers, send_queue_size=max_pending_chunks
+        )
+        self.executor = self.middleware.executor
+        self.on_shutdown = list(on_shutdown)
+
+    @staticmethod
+    def _input_terminated(wsgi_app):
+        def app(environ, start_response):
+            # a2wsgi's request body reads return b'' once the request is complete, so chunked uploads without a
+            # Content-Length (streamed NDJSON) can be read to the end instead of being seen as empty
+            environ['wsgi.input_terminated'] = True
+            return wsgi_app(environ, start_response)
+
+        return app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            await self.middleware(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+
+            elif message['type'] == 'lifespan.shutdown':
+                # Off the loop: requests still in flight need it to send their responses before the pool can finish
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+                except Exception as e:
+                    logger.exception(f'Shutdown failed: {str(e)}')
+                    await send({'type': 'lifespan.shutdown.failed', 'message': str(e)})
+                else:
+                    await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _shutdown(self):
+        self.executor.shutdown(wait=True)
+
+        for callback in self.on_shutdown:
+            callback()
@@ -0,0 +1,228 @@
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from typing import Iterator, List
+
+import pandas as pd
+
+from model_serving.models.prediction import Model, Prediction
+from model_serving.domain.exceptions import InvalidInputException, ModelNotFoundException, ModelServingException
+
+
+logger = logging.getLogger(__name__)
+
+# Set in the parent before the pool forks, so every worker scores with the same copy-on-write model
+_model: Model = None
+_options: dict = {}
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read a CSV or Parquet file chunk_size rows at a time"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Reading Parquet requires pyarrow (pip install pyarrow)')
+
+        # Batches follow the file's row groups, only one is decoded at a time
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def check_columns(chunks: Iterator[pd.DataFrame], model: Model) -> Iterator[pd.DataFrame]:
+    """Fail on the first chunk, before any worker starts, when the input lacks some of the model's features"""
+    for idx, chunk in enumerate(chunks):
+        if idx == 0 and model.feature_names:
+            missing = [name for name in model.feature_names if name not in chunk.columns]
+            if missing:
+                raise InvalidInputException({name: 'Missing input column' for name in missing})
+
+            extra = [str(column) for column in chunk.columns if column not in model.feature_names]
+            if extra:
+                logger.info(f'Copying columns {", ".join(extra)} to the output without scoring them')
+
+        yield chunk
+
+
+class ResultWriter:
+    """Appends scored chunks to a Parquet or CSV file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer = None
+        self._header = True
+
+    def write(self, frame: pd.DataFrame):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_chunk(frame: pd.DataFrame) -> List[Prediction]:
+    """Score one chunk with the module's model, in the worker process"""
+    from model_serving.services.inference_service import inference_service
+    from model_serving.services.umap_service import umap_service
+    from model_serving.services.explainer_service import explainer_service
+
+    # Other columns (ids, labels) only pass through to the output
+    features = frame[_model.feature_names] if _model.feature_names else frame
+    predictions = [Prediction(inputs=inputs) for inputs in features.to_dict('records')]
+    predictions = inference_service.create_batch_inference(_model, predictions)
+
+    if _options.get('embeddings'):
+        embeddings = umap_service.create_embeddings(_model, predictions)
+        if embeddings:
+            for prediction, embedding in zip(predictions, embeddings):
+                prediction.embeddings = embedding
+
+    if _options.get('explain') and _model._explainer is not None:
+        predictions = explainer_service.create_explanations(_model, predictions)
+
+    return predictions
+
+
+def to_frame(frame: pd.DataFrame, predictions: List[Prediction]) -> pd.DataFrame:
+    """The input chunk with the prediction columns appended"""
+    result = frame.reset_index(drop=True).copy()
+    result['prediction_id'] = [prediction.id for prediction in predictions]
+    result['value'] = [getattr(prediction.value, 'value', prediction.value) for prediction in predictions]
+    result['probability'] = [prediction.probability for prediction in predictions]
+
+    if _options.get('embeddings'):
+        result['embeddings'] = [prediction.embeddings for prediction in predictions]
+
+    if _options.get('explain'):
+        result['shap_values'] = [
+            json.dumps({str(shap.label): shap.shap_values for shap in prediction.shap_values})
+            if prediction.shap_values else None
+            for prediction in predictions
+        ]
+
+    return result
+
+
+def _score_in_pool(chunks: Iterator[pd.DataFrame], workers: int) -> Iterator[tuple]:
+    """(chunk, predictions) in input order, with at most two chunks per worker read ahead of the writer"""
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        for chunk in chunks:
+            yield chunk, score_chunk(chunk)
+        return
+
+    # Pool.imap would read the whole input up front; a bounded window of pending chunks keeps memory flat
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append((chunk, pool.apply_async(score_chunk, (chunk,))))
+
+            if len(pending) >= 2 * workers:
+                chunk_, result = pending.popleft()
+                yield chunk_, result.get()
+
+        while pending:
+            chunk_, result = pending.popleft()
+            yield chunk_, result.get()
+
+
+def run(app, model_name: str, model_version: str, input_path: str, output_path: str, chunk_size: int, workers: int,
+        embeddings: bool = False, explain: bool = False, persist: bool = False) -> int:
+    """Score input_path into output_path, returns the number of rows scored"""
+    global _model, _options
+
+    from model_serving.gateways.mlflow_gateway import mlflow_gateway
+    from model_serving.controllers.prediction import prediction_controller
+    from model_serving.services.database.database_client import db
+    from model_serving.services.database.prediction_writer import prediction_writer
+
+    with app.app_context():
+        _model = mlflow_gateway.get_model(model_name, model_version)
+        if not _model:
+            raise ModelNotFoundException(model_name, str(model_version))
+
+        # Same preparation as PreforkServer: no pooled connections or GC passes crossing the fork
+        db.engine.dispose()
+
+    _options = {'embeddings': embeddings, 'explain': explain}
+    gc.collect()
+    gc.freeze()
+
+    writer = ResultWriter(output_path)
+    started = time.perf_counter()
+    count = 0
+
+    try:
+        chunks = check_columns(read_chunks(input_path, chunk_size), _model)
+        for chunk, predictions in _score_in_pool(chunks, workers):
+            writer.write(to_frame(chunk, predictions))
+
+            if persist:
+                with app.app_context():
+                    prediction_controller.store_predictions(_model, predictions)
+
+            count += len(predictions)
+            logger.info(f'Scored {count} rows ({count / (time.perf_counter() - started):.0f} rows/s)')
+
+        if persist:
+            prediction_writer.flush()
+
+    finally:
+        writer.close()
+
+    return count
+
+
+def main(argv=None):
+    from model_serving.app_factory import create_app
+    from model_serving.config import environments
+
+    config = environments[os.environ.get('FLASK_ENV', 'development')]
+
+    parser = argparse.ArgumentParser(description='Score a CSV or Parquet file offline with a registered model')
+    parser.add_argument('model', help='Registered model name')
+    parser.add_argument('version', help='Model version')
+    parser.add_argument('input', help='CSV or .parquet file of feature columns')
+    parser.add_argument('output', help='CSV or .parquet file to write the inputs and predictions to')
+    parser.add_argument('--chunk-size', type=int, default=config.BATCH_SCORING_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS)
+    parser.add_argument('--embeddings', action='store_true', help='Add UMAP embeddings')
+    parser.add_argument('--explain', action='store_true', help='Add SHAP values')
+    parser.add_argument('--persist', action='store_true', help='Also store the predictions in the database')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=config.LOG_LEVEL)
+
+    app = create_app(config)
+    try:
+        count = run(
+            app, args.model, args.version, args.input, args.output, args.chunk_size, args.workers,
+            embeddings=args.embeddings, explain=args.explain, persist=args.persist
+        )
+    except ModelServingException as e:
+        errors = e.details.get('validation_errors', {})
+        sys.exit('\n'.join([e.message] + [f'  {field}: {error}' for field, error in errors.items()]))
+
+    logger.info(f'Wrote {count} predictions to {args.output}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,8 +17,109 @@ class Config:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///user_application.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Set on every new SQLite connection. WAL lets readers run alongside the writer instead of queueing on the
+    # rollback journal, and synchronous=NORMAL only syncs the WAL at checkpoints
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000
+    }
+
+    # Store prediction inputs, embeddings and SHAP values as little-endian float arrays ("float64" or "float32")
+    # instead of JSON text. Rows written either way stay readable
+    COMPACT_ENCODING = {
+        "enabled": False,
+        "dtype": "float64"
+    }
+
+    # Pre-fork server (python -m model_serving.server)
+    SERVER_HOST = '127.0.0.1'
+    SERVER_PORT = 5000
+    SERVER_WORKERS = os.cpu_count() or 1
+
+    # ASGI serving (create_asgi_app). Request threads mostly wait on the model pools below, so there can be many;
+    # SHAP/UMAP calls queue on their own pool instead of holding up plain inference. WRITE_BEHIND is always
+    # enabled under ASGI
+    ASGI_MAX_WORKERS = 64
+    ASGI_INFERENCE_WORKERS = os.cpu_count() or 1
+    ASGI_ENRICHMENT_WORKERS = 2
+
+    # Prediction
+    MAX_BATCH_SIZE = 10000
+    MICRO_BATCHING = {
+        "enabled": False,
+        "max_batch_size": 64,
+        "max_latency_ms": 2
+    }
+
+    # Chunked scoring: records per model call on the NDJSON streaming route, and rows per chunk sent to a worker by
+    # the offline scorer (python -m model_serving.batch_scoring)
+    STREAM_CHUNK_SIZE = 1000
+    BATCH_SCORING_CHUNK_SIZE = 10000
+
+    # Keyset-paginated listings (GET /users, GET /predictions): PAGE_SIZE rows unless a limit is given, never more
+    # than MAX_PAGE_SIZE, which is also the page size the /export routes stream with
+    PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 1000
+
+    # Bulk user import (POST /users/bulk): users checked, inserted and committed together
+    USER_IMPORT_CHUNK_SIZE = 1000
+
+    # Compute embeddings and explanations on background workers after the prediction has been returned
+    ASYNC_ENRICHMENT = {
+        "enabled": False,
+        "workers": 1,
+        "max_queue_size": 10000
+    }
+
+    # Queue predictions and insert them in bulk from a background writer instead of committing on every request
+    WRITE_BEHIND = {
+        "enabled": False,
+        "max_queue_size": 10000,
+        "batch_size": 500,
+        "flush_interval_ms": 50,
+        "max_retries": 3,  # Retries of a failed batch, with exponential backoff, before writing it row by row
+        "retry_backoff_ms": 100
+    }
+
+    # Reuse SHAP values and embeddings of identical inputs, per model version
+    RESULT_CACHE = {
+        "enabled": True,
+        "max_size": 10000,
+        "ttl_seconds": 3600
+    }
+
+    # Serve repeated single predictions from earlier results, "memory" (per process) or "sqlite" (shared file)
+    PREDICTION_CACHE = {
+        "enabled": False,
+        "backend": "memory",
+        "max_size": 100000,
+        "ttl_seconds": None,
+        "path": "instance/prediction_cache.db"
+    }
+
+    # Embed new points from an approximate nearest-neighbor index over each fitted UMAP reducer's training data
+    UMAP_NEIGHBOR_INDEX = {
+        "enabled": True,
+        "n_trees": 8,
+        "leaf_size": 32,
+        "n_neighbors": 15
+    }
+
     # MLFlow
     TRACKING_URI = "/Users/troywissenbach/Documents/spring_25_classes" # NEED TO DOUBLE CHECK THIS PATH
+    # Directory for memory-mapped copies of sklearn models and UMAP reducers (decision trees and random/extra forests
+    # are stored as node arrays, other tree models are loaded normally), None to unpickle everything normally
+    MODEL_MMAP_CACHE_DIR = None
+    MODEL_LAZY_LOADING = False  # Load each version on its first request instead of at startup
+    MAX_LOADED_MODELS = None  # Least recently used versions are unloaded beyond this count, None for no limit
+    MODEL_LOAD_WORKERS = 4  # Threads used to load models and explainers at startup
+
+    # Warm-up
+    WARMUP_ITERATIONS = 3  # Synthetic requests per model after load, 0 to skip
+    WARMUP_BATCH_SIZE = 8
+    WARMUP_IN_BACKGROUND = False  # Serve (with /ready returning 503) while warming up; PreforkServer waits for it before forking
+
     MODELS = {
         "breast_cancer_random_forest_model": {
             "1": {
@@ -39,11 +140,34 @@ class Config:
 
 class UnitTest(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLITE_PRAGMAS = {}
+    WARMUP_ITERATIONS = 0
+    RESULT_CACHE = {
+        "enabled": False
+    }
 
     
 class Production(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
 
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,  # 256 MB of the file read through the page cache instead of copied
+        "cache_size": -65536,  # 64 MB page cache per connection
+        "temp_store": "MEMORY"
+    }
+
+    # One pooled connection per request thread. SQLite connections are cheap, but the pool keeps each one's page
+    # cache warm; pools aren't shared across forks (PreforkServer disposes the engine before forking)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": 16,
+        "max_overflow": 16,
+        "pool_timeout": 10,
+        "pool_recycle": 3600
+    }
+
 environments = {
     'development': Config,
     'unittest': UnitTest,
@@ -1,15 +1,31 @@
 import logging
+from itertools import islice
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
-from model_serving.models.prediction import Prediction, Model
+from model_serving.models.prediction import Prediction, Model, Shap
 from model_serving.services.inference_service import inference_service
+from model_serving.services.batching_service import micro_batching_service
 from model_serving.services.umap_service import umap_service
+from model_serving.services.explainer_service import explainer_service
+from model_serving.services.enrichment_service import enrichment_service
+from model_serving.services.memoization_service import memoization_service
+from model_serving.services.offload_service import offload_service, INFERENCE, ENRICHMENT
 from model_serving.gateways.mlflow_gateway import mlflow_gateway
 from model_serving.services.database.database_client import db
-from model_serving.services.database.prediction import ModelSQL, PredictionSQL
+from model_serving.services.database.prediction import ModelSQL, PredictionSQL, ShapSQL
+from model_serving.services.database.prediction_writer import prediction_writer
+from model_serving.services.database.encoding import compact_encoding
 from model_serving.services.validators import input_validator
+from model_serving.services.pagination import encode_cursor, decode_cursor
 from flask import abort
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 from model_serving.domain.exceptions import (
     ModelNotFoundException,
+    PredictionNotFoundException,
+    ExplanationNotFoundException,
     InvalidInputException,
     ModelTypeException,
     InferenceException
@@ -33,24 +49,26 @@ class PredictionController:
             if validation_errors:
                 raise InvalidInputException(validation_errors)
 
-            # Create inference
-            try:
-                prediction = inference_service.create_inference(model, prediction)
-                
-                # Add UMAP embeddings
+            # Identical inputs scored before are served from the prediction cache without touching the model
+            cached = memoization_service.enabled and memoization_service.get(model, prediction)
+
+            if not cached:
+                prediction = self._create_inference(model, prediction)
+
+                if memoization_service.enabled:
+                    memoization_service.set(model, prediction)
+
+            # Add UMAP embeddings, unless the enrichment workers add them after the response
+            if not enrichment_service.enabled:
                 try:
-                    embeddings = umap_service.create_embedding(model, prediction)
-                    prediction.embeddings = embeddings
+                    prediction.embeddings = offload_service.run(
+                        ENRICHMENT, umap_service.create_embedding, model, prediction
+                    )
                 except Exception as e:
                     logger.error(f"Failed to create UMAP embeddings: {str(e)}") # continue prediction if embeddings fail
-                
-            except Exception as e:
-                raise InferenceException(f"Failed to create prediction: {str(e)}")
 
             # Save prediction
-            prediction_sql = PredictionSQL.from_prediction(prediction, model)
-            db.session.add(prediction_sql)
-            db.session.commit()
+            self.store_predictions(model, [prediction])
 
             return prediction
 
@@ -58,10 +76,229 @@ class PredictionController:
             db.session.rollback()
             raise
 
+    @staticmethod
+    def _create_inference(model: Model, prediction: Prediction) -> Prediction:
+        try:
+            if micro_batching_service.enabled:
+                prediction = micro_batching_service.create_inference(model, prediction)
+            else:
+                prediction = offload_service.run(INFERENCE, inference_service.create_inference, model, prediction)
+
+            return prediction
+
+        except Exception as e:
+            raise InferenceException(f"Failed to create prediction: {str(e)}")
+
+    def create_predictions(self, model_name: str, model_version: int, predictions: List[Prediction]) -> List[Prediction]:
+        try:
+            # Get model
+            model = mlflow_gateway.get_model(model_name, model_version)
+            if not model:
+                raise ModelNotFoundException(model_name, str(model_version))
+
+            # Validate input
+            validation_errors = {}
+            for idx, prediction in enumerate(predictions):
+                errors = input_validator.validate_prediction_input(model, prediction.inputs)
+                if errors:
+                    validation_errors[str(idx)] = errors
+            if validation_errors:
+                raise InvalidInputException(validation_errors)
+
+            return self._score_predictions(model, predictions)
+
+        except Exception as e:
+            db.session.rollback()
+            raise
+
+    def _score_predictions(self, model: Model, predictions: List[Prediction]) -> List[Prediction]:
+        """Score, enrich and store predictions of a resolved model whose inputs have already been validated"""
+        # Create inferences with one model call for the whole batch
+        try:
+            predictions = offload_service.run(INFERENCE, inference_service.create_batch_inference, model, predictions)
+
+            # Add UMAP embeddings and SHAP values, unless the enrichment workers add them after the response
+            if not enrichment_service.enabled:
+                embeddings = offload_service.run(ENRICHMENT, umap_service.create_embeddings, model, predictions)
+                if embeddings:
+                    for prediction, embedding in zip(predictions, embeddings):
+                        prediction.embeddings = embedding
+
+                if model._explainer is not None:
+                    predictions = offload_service.run(
+                        ENRICHMENT, explainer_service.create_explanations, model, predictions
+                    )
+
+        except Exception as e:
+            raise InferenceException(f"Failed to create predictions: {str(e)}")
+
+        # Save predictions in a single transaction
+        self.store_predictions(model, predictions)
+
+        return predictions
+
+    def stream_predictions(self, model_name: str, model_version: int, records: Iterable[Tuple[int, Union[Prediction, Exception]]],
+                           chunk_size: int) -> Iterator[Tuple[int, Union[Prediction, Exception]]]:
+        """
+        Score an unbounded stream of (line, prediction) records chunk_size at a time, yielding (line, prediction) or
+        (line, error) for every record in input order. Records that failed to parse are passed in as exceptions. Only
+        one chunk is held in memory, and a failing chunk doesn't stop the ones after it.
+        """
+        # Fail before the response starts streaming when the model doesn't exist
+        model = mlflow_gateway.get_model(model_name, model_version)
+        if not model:
+            raise ModelNotFoundException(model_name, str(model_version))
+
+        def score():
+            records_ = iter(records)
+
+            while chunk := list(islice(records_, chunk_size)):
+                results = dict(chunk)
+                valid = []
+
+                for line, record in chunk:
+                    if isinstance(record, Exception):
+                        continue
+
+                    errors = input_validator.validate_prediction_input(model, record.inputs)
+                    if errors:
+                        results[line] = InvalidInputException(errors)
+                    else:
+                        valid.append((line, record))
+
+                if valid:
+                    try:
+                        predictions = self._score_predictions(model, [p for _, p in valid])
+                        results.update(zip([line for line, _ in valid], predictions))
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f'Failed to score lines {valid[0][0]}-{valid[-1][0]}: {str(e)}')
+                        results.update((line, e) for line, _ in valid)
+
+                yield from results.items()
+
+        return score()
+
+    @staticmethod
+    def store_predictions(model: Model, predictions: List[Prediction]):
+        """Persist scored predictions and their explanations, directly or through the write-behind writer"""
+        # Enrichment updates the stored rows, so with write-behind it is only submitted once they are committed
+        enrich = (lambda: enrichment_service.submit(model, predictions)) if enrichment_service.enabled else None
+        model_sql = PredictionController._get_model_sql(model, predictions)
+
+        # Decoded once for the whole batch. One SHAP row per (prediction, label), stored with the predictions so
+        # explanations never have to be recomputed
+        feature_names = model_sql.get_feature_names() if compact_encoding.enabled else None
+        shap_rows = [
+            ShapSQL.to_row(shap, prediction.id, feature_names)
+            for prediction in predictions for shap in prediction.shap_values
+        ]
+
+        rows = [PredictionSQL.to_row(prediction, model_sql, feature_names) for prediction in predictions]
+
+        if prediction_writer.enabled:
+            prediction_writer.enqueue(rows, enrich, shap_rows)
+            return
+
+        db.session.add_all([PredictionSQL(**row) for row in rows] + [ShapSQL(**row) for row in shap_rows])
+        db.session.commit()
+
+        if enrich:
+            enrich()
+
+    @staticmethod
+    def _get_model_sql(model: Model, predictions: List[Prediction]) -> ModelSQL:
+        # Predictions reference the stored model row, so every version's predictions share one indexed model_id
+        model_sql = ModelSQL.from_model(model)
+
+        if compact_encoding.enabled and model_sql.feature_names is None:
+            # Models without a feature schema store inputs in the order of the first request's features
+            model_sql.feature_names = compact_encoding.encode_header(list(predictions[0].inputs))
+
+        if model_sql in db.session.new or model_sql in db.session.dirty:
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Registered by a concurrent request in the meantime
+                db.session.rollback()
+                model_sql = ModelSQL.from_model(model)
+
+        return model_sql
+
+    @staticmethod
+    def _get_prediction_sql(id) -> PredictionSQL:
+        # The model is joined into the same query and the SHAP values fetched with one more, rather than lazily
+        prediction = db.session.query(PredictionSQL).options(
+            joinedload(PredictionSQL.model), selectinload(PredictionSQL.shaps)
+        ).filter(PredictionSQL.id == id).first()
+
+        if prediction is None:
+            raise PredictionNotFoundException(id)
+
+        return prediction
+
     def get_prediction(self, id) -> Prediction:
-        prediction = db.session.query(PredictionSQL).filter(PredictionSQL.id == id).first()
+        return self._get_prediction_sql(id).to_prediction()
+
+    def list_predictions(self, limit: int, cursor: Optional[str] = None, model_name: Optional[str] = None,
+                         model_version: Optional[str] = None, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> Tuple[List[Prediction], Optional[str]]:
+        """
+        One page of predictions in (created, id) order, optionally of one model (version) and within [start, end), and
+        the cursor of the next page (None on the last one)
+        """
+        query = db.session.query(PredictionSQL).options(
+            joinedload(PredictionSQL.model), selectinload(PredictionSQL.shaps)
+        ).order_by(PredictionSQL.created, PredictionSQL.id)
+
+        if model_name is not None:
+            models = select(ModelSQL.id).where(ModelSQL.model_name == model_name)
+            if model_version is not None:
+                models = models.where(ModelSQL.model_version == model_version)
+            query = query.filter(PredictionSQL.model_id.in_(models))
+
+        if start is not None:
+            query = query.filter(PredictionSQL.created >= start)
+        if end is not None:
+            query = query.filter(PredictionSQL.created < end)
+
+        # Keyset pagination: seek past the last (created, id) through the created indexes instead of an OFFSET scan
+        if cursor:
+            created, id = decode_cursor(cursor, 2)
+            query = query.filter(
+                tuple_(PredictionSQL.created, PredictionSQL.id) > (datetime.fromisoformat(created), id)
+            )
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].created.isoformat(), rows[-1].id])
+
+        return [row.to_prediction() for row in rows], next_cursor
+
+    def iter_predictions(self, page_size: int, **filters) -> Iterator[Prediction]:
+        """Every matching prediction, fetched a page at a time so exports of any size run in constant memory"""
+        cursor = None
+
+        while True:
+            predictions, cursor = self.list_predictions(page_size, cursor, **filters)
+            yield from predictions
+
+            # Rows of a finished page aren't needed again, don't let the session hold on to them
+            db.session.expunge_all()
+
+            if cursor is None:
+                return
+
+    def get_explanation(self, id) -> List[Shap]:
+        """The stored SHAP values of a prediction, one per label"""
+        prediction = self._get_prediction_sql(id)
+        if not prediction.shaps:
+            raise ExplanationNotFoundException(id)
 
-        return prediction.to_prediction()
+        feature_names = prediction.model.get_feature_names() if prediction.model else None
+        return [shap.to_shap(feature_names) for shap in prediction.shaps]
 
 
 prediction_controller = PredictionController()
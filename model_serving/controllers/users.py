@@ -2,10 +2,14 @@ import logging
 import time
 import uuid
 
+from typing import Iterator, List, Optional, Tuple
+
 from model_serving.models.users import User
 from model_serving.services.database.database_client import db
+from model_serving.services.pagination import encode_cursor, decode_cursor
 
-from sqlalchemy import delete
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
 
 
 logger = logging.getLogger(__name__)
@@ -66,5 +70,102 @@ class UserController:
         """Get all users"""
         return db.session.query(User).all()
 
+    def list_users(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+        """One page of users in id order, and the cursor of the next page (None on the last one)"""
+        query = db.session.query(User).order_by(User.id)
+
+        # Keyset pagination: seek past the last id through the primary key instead of counting an OFFSET
+        if cursor:
+            last_id, = decode_cursor(cursor, 1)
+            query = query.filter(User.id > last_id)
+
+        users = query.limit(limit + 1).all()
+        if len(users) <= limit:
+            return users, None
+
+        return users[:limit], encode_cursor([users[limit - 1].id])
+
+    def iter_users(self, page_size: int) -> Iterator[User]:
+        """Every user, fetched a page at a time so exports of any size run in constant memory"""
+        cursor = None
+
+        while True:
+            users, cursor = self.list_users(page_size, cursor)
+            yield from users
+
+            db.session.expunge_all()
+
+            if cursor is None:
+                return
+
+    def create_users(self, users_data: List[dict], chunk_size: int) -> List[dict]:
+        """
+        Create many users at once, returning one result per row in input order. Each chunk is checked against the
+        existing users with one query per unique column and inserted with a single executemany and commit, instead of
+        a query, an insert and a commit per user.
+        """
+        results = [None] * len(users_data)
+        seen_emails, seen_usernames = set(), set()
+        rows = []
+
+        for index, user_data in enumerate(users_data):
+            if not isinstance(user_data, dict) or not isinstance(user_data.get('username'), str) \
+                    or not isinstance(user_data.get('email'), str):
+                results[index] = {'index': index, 'status': 'error', 'message': 'Invalid request data'}
+            elif user_data['email'] in seen_emails:
+                results[index] = {'index': index, 'status': 'error', 'message': 'Email already exists'}
+            elif user_data['username'] in seen_usernames:
+                results[index] = {'index': index, 'status': 'error', 'message': 'Username already exists'}
+            else:
+                seen_emails.add(user_data['email'])
+                seen_usernames.add(user_data['username'])
+                rows.append((index, user_data))
+
+        for start in range(0, len(rows), chunk_size):
+            self._create_chunk(rows[start:start + chunk_size], results)
+
+        return results
+
+    def _create_chunk(self, rows: List[Tuple[int, dict]], results: List[dict]):
+        emails = {user_data['email'] for _, user_data in rows}
+        usernames = {user_data['username'] for _, user_data in rows}
+
+        existing_emails = set(db.session.scalars(db.select(User.email).where(User.email.in_(emails))))
+        existing_usernames = set(db.session.scalars(db.select(User.username).where(User.username.in_(usernames))))
+
+        new_users = []
+        for index, user_data in rows:
+            if user_data['email'] in existing_emails:
+                results[index] = {'index': index, 'status': 'error', 'message': 'Email already exists'}
+            elif user_data['username'] in existing_usernames:
+                results[index] = {'index': index, 'status': 'error', 'message': 'Username already exists'}
+            else:
+                new_users.append((index, {'id': uuid.uuid4().hex, 'username': user_data['username'], 'email': user_data['email']}))
+
+        if not new_users:
+            return
+
+        try:
+            db.session.execute(insert(User), [row for _, row in new_users])
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request created one of the users after the check, retry the chunk one row at a time
+            db.session.rollback()
+            logger.warning('Bulk user insert conflicted, inserting the chunk row by row')
+
+            for index, row in new_users:
+                try:
+                    db.session.execute(insert(User), [row])
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    results[index] = {'index': index, 'status': 'error', 'message': 'User already exists'}
+                else:
+                    results[index] = {'index': index, 'status': 'created', 'id': row['id']}
+            return
+
+        for index, row in new_users:
+            results[index] = {'index': index, 'status': 'created', 'id': row['id']}
+
 
 user_controller: UserController = UserController()
@@ -14,6 +14,18 @@ class ModelNotFoundException(ModelServingException):
         message = f"Model {model_name} version {model_version} not found"
         super().__init__(message=message, status_code=404)
 
+class PredictionNotFoundException(ModelServingException):
+    """Raised when requested prediction is not found"""
+    def __init__(self, prediction_id: str):
+        message = f"Prediction {prediction_id} not found"
+        super().__init__(message=message, status_code=404)
+
+class ExplanationNotFoundException(ModelServingException):
+    """Raised when a prediction has no stored explanation"""
+    def __init__(self, prediction_id: str):
+        message = f"No explanation stored for prediction {prediction_id}"
+        super().__init__(message=message, status_code=404)
+
 class InvalidInputException(ModelServingException):
     """Raised when input validation fails"""
     def __init__(self, validation_errors: Dict[str, str]):
@@ -1,26 +1,189 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import joblib
 import mlflow
+import numpy as np
+import mlflow.client
 from model_serving.models.prediction import Model
+from model_serving.services.mapped_trees import MappedTrees
+from model_serving.services.tree_explainer import TreeExplainer
 from model_serving.domain.common_enums import ModelType
 
 
+logger = logging.getLogger(__name__)
+
+# "explainer" setting that computes TreeSHAP from the loaded model instead of loading a logged explainer artifact
+TREE_EXPLAINER = 'tree'
+
+# Flavors whose artifacts are plain pickled Python objects that joblib can re-dump with memory-mappable arrays. Tree
+# models of these flavors are converted to MappedTrees instead, see _load_mmap_model.
+MMAP_FLAVORS = ('sklearn',)
+
+
 class MLFlowGateway:
 
     models = {}
+    mmap_cache_dir = None
+    lazy_loading = False
+    max_loaded_models = None
+    load_workers = 4
+
+    def __init__(self):
+        self._loaded = OrderedDict()  # (model_name, model_version) of loaded versions, least recently used first
+        self._load_locks = {}
+        self._run_ids = {}
+        self._load_listeners = []
+        self._evict_listeners = []
+        self._lock = threading.Lock()
 
     def init_app(self, app):
         mlflow.set_tracking_uri(app.config['TRACKING_URI'] + '/mlruns')
         self.models = app.config['MODELS']
+        self.mmap_cache_dir = app.config.get('MODEL_MMAP_CACHE_DIR')
+        self.lazy_loading = app.config.get('MODEL_LAZY_LOADING', False)
+        self.max_loaded_models = app.config.get('MAX_LOADED_MODELS')
+        self.load_workers = app.config.get('MODEL_LOAD_WORKERS', self.load_workers)
+        self._loaded = OrderedDict()
+        self._load_locks = {}
+        self._run_ids = {}
+        self._load_listeners = []
+        self._evict_listeners = []
+
+        if self.lazy_loading:
+            return
+
+        self._run_ids = self._get_artifact_run_ids()
+
+        versions = [(model, version) for model in self.models.keys() for version in self.models[model].keys()]
+        started = time.perf_counter()
+
+        # Loading is dominated by artifact I/O and unpickling, so versions load side by side on a thread pool
+        with ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix='model-loader') as executor:
+            for future in [executor.submit(self._load_version, model, version) for model, version in versions]:
+                future.result()
+
+        logger.info(f'Loaded {len(versions)} model versions in {time.perf_counter() - started:.2f}s')
+
+    def _get_artifact_run_ids(self):
+        """Resolve run ids for every version with an explainer or UMAP artifact with one registry search per model"""
+        run_ids = {}
 
         for model in self.models.keys():
-            for version in self.models[model].keys():
-                flavor_ = self.models[model][version].get('mlflow_flavor', 'pyfunc')
-                self.models[model][version]["model"] = self._load_model(self._get_model_uri(model, version), flavor_)
+            if not any(self._has_explainer_artifact(model_) or model_.get('umap', False) for model_ in self.models[model].values()):
+                continue
+
+            for model_version in mlflow.client.MlflowClient().search_model_versions(f"name='{model}'"):
+                run_ids[(model, str(model_version.version))] = model_version.run_id
+
+        return run_ids
+
+    @staticmethod
+    def _has_explainer_artifact(model_) -> bool:
+        return bool(model_.get('explainer', False)) and model_.get('explainer') != TREE_EXPLAINER
+
+    def _get_run_id(self, model_name, model_version):
+        run_id = self._run_ids.get((model_name, str(model_version)))
+
+        if run_id is None:
+            run_id = mlflow.client.MlflowClient().get_model_version(model_name, model_version).run_id
+            self._run_ids[(model_name, str(model_version))] = run_id
+
+        return run_id
+
+    def _load_version(self, model_name, model_version):
+        model_ = self.models[model_name][model_version]
+        started = time.perf_counter()
+
+        flavor_ = model_.get('mlflow_flavor', 'pyfunc')
+        model_["model"] = self._load_model(
+            self._get_model_uri(model_name, model_version), flavor_,
+            mmap_path=self._get_mmap_path(model_name, model_version)
+        )
+        model_["feature_names"] = model_.get('feature_names') or self._get_feature_names(model_["model"])
+
+        if model_.get('explainer') == TREE_EXPLAINER:
+            model_['explainer_model'] = TreeExplainer(model_['model'])
+        elif self._has_explainer_artifact(model_):
+            run_id = self._get_run_id(model_name, model_version)
+            model_['explainer_model'] = self._load_model(self._get_explainer_uri(run_id), 'pyfunc')
+
+        if model_.get('umap', False):
+            # Reducers are fitted offline and logged with the sklearn flavor, so they load (and memory-map) like a model
+            run_id = self._get_run_id(model_name, model_version)
+            model_['umap_model'] = self._load_model(
+                self._get_umap_uri(run_id), 'sklearn',
+                mmap_path=self._get_mmap_path(model_name, model_version, 'umap.joblib')
+            )
+
+        self._mark_loaded(model_name, model_version)
+
+        logger.info(f'Loaded model {model_name} version {model_version} in {time.perf_counter() - started:.2f}s')
+
+        for listener in self._load_listeners:
+            try:
+                listener(self._build_model(model_name, model_version, *self._get_artifacts(model_)))
+            except Exception as e:
+                logger.error(f'Load listener failed for {model_name} version {model_version}: {str(e)}')
+
+    def add_load_listener(self, listener):
+        """Call listener(model) with the freshly loaded Model every time a version is (re)loaded"""
+        self._load_listeners.append(listener)
+
+    def add_evict_listener(self, listener):
+        """Call listener(model_name, model_version) every time a version is evicted to make room for another"""
+        self._evict_listeners.append(listener)
+
+    def get_loaded_versions(self):
+        with self._lock:
+            return list(self._loaded.keys())
+
+    def _mark_loaded(self, model_name, model_version):
+        evicted_versions = []
+
+        with self._lock:
+            self._loaded[(model_name, model_version)] = True
+            self._loaded.move_to_end((model_name, model_version))
+
+            while self.max_loaded_models and len(self._loaded) > self.max_loaded_models:
+                (evicted_name, evicted_version), _ = self._loaded.popitem(last=False)
+                evicted = self.models[evicted_name][evicted_version]
+                evicted['model'] = None
+                evicted.pop('explainer_model', None)
+                evicted.pop('umap_model', None)
+                evicted_versions.append((evicted_name, evicted_version))
 
-                if self.models[model][version].get('explainer', False):
-                    from mlflow.client import MlflowClient
+                logger.info(f'Evicted model {evicted_name} version {evicted_version}')
 
-                    run_id = MlflowClient().get_model_version(model, version).run_id
-                    self.models[model][version]['explainer'] = self._load_model(self._get_explainer_uri(run_id))
+        for evicted_name, evicted_version in evicted_versions:
+            for listener in self._evict_listeners:
+                try:
+                    listener(evicted_name, evicted_version)
+                except Exception as e:
+                    logger.error(f'Evict listener failed for {evicted_name} version {evicted_version}: {str(e)}')
+
+    def _ensure_loaded(self, model_name, model_version):
+        # One lock per version so concurrent requests for a cold model wait on a single load
+        with self._lock:
+            load_lock = self._load_locks.setdefault((model_name, model_version), threading.Lock())
+
+        with load_lock:
+            model_ = self.models[model_name][model_version]
+            if model_.get('model') is None:
+                logger.info(f'Loading model {model_name} version {model_version} on first request')
+                self._load_version(model_name, model_version)
+
+            # Hand back references so a concurrent eviction can't pull the model out from under this request
+            return self._get_artifacts(model_)
+
+    @staticmethod
+    def _get_artifacts(model_):
+        return model_.get('model'), model_.get('explainer_model'), model_.get('umap_model')
 
     def _get_model_uri(self, model_name, model_version):
         return f"models:/{model_name}/{model_version}"
@@ -28,7 +191,20 @@ class MLFlowGateway:
     def _get_explainer_uri(self, run_id):
         return f"runs:/{run_id}/model/explainer"
 
-    def _load_model(self, model_uri, model_flavor):
+    def _get_umap_uri(self, run_id):
+        return f"runs:/{run_id}/model/umap"
+
+    def _get_mmap_path(self, model_name, model_version, file_name='model.joblib'):
+        if not self.mmap_cache_dir:
+            return None
+
+        # Registered model versions are immutable, so name/version is a safe cache key
+        return os.path.join(self.mmap_cache_dir, model_name, str(model_version), file_name)
+
+    def _load_model(self, model_uri, model_flavor, mmap_path=None):
+        if mmap_path and model_flavor in MMAP_FLAVORS:
+            return self._load_mmap_model(model_uri, model_flavor, mmap_path)
+
         if model_flavor == "sklearn":
             return mlflow.sklearn.load_model(model_uri)
         elif model_flavor == "tensorflow":
@@ -42,8 +218,108 @@ class MLFlowGateway:
         else:
             raise ValueError(f"Unsupported model flavor: {model_flavor}")
 
-    def get_model(self, model_name, model_version) -> Model:
+    def _load_mmap_model(self, model_uri, model_flavor, mmap_path):
+        """
+        Load the model from an uncompressed joblib copy with its NumPy arrays memory-mapped read-only, so they are
+        paged in from the OS cache and shared between processes instead of being unpickled into each heap. The copy
+        is written from the MLflow artifact on first use.
+
+        sklearn's Tree copies its node and value arrays into buffers of its own when unpickled, so a mapped copy of a
+        tree model would save no memory. Decision trees and random/extra forests are converted to MappedTrees
+        instead, which predicts from the node arrays themselves; other tree models (gradient boosting, trees inside
+        a pipeline) are loaded normally and get no copy.
+        """
+        trees_path = self._get_trees_path(mmap_path)
+        if os.path.isdir(trees_path):
+            return MappedTrees.load(trees_path)
+
+        if not os.path.exists(mmap_path):
+            loaded_model = self._load_model(model_uri, model_flavor)
+
+            if MappedTrees.supports(loaded_model):
+                logger.info(f'Writing memory-mappable tree arrays of {model_uri} to {trees_path}')
+
+                os.makedirs(os.path.dirname(trees_path), exist_ok=True)
+                MappedTrees.save(loaded_model, trees_path)
+                return MappedTrees.load(trees_path)
+
+            if self._has_trees(loaded_model):
+                logger.info(f'Not memory-mapping {model_uri}: its trees would be copied out of the mapping on load')
+                return loaded_model
+
+            logger.info(f'Writing memory-mappable copy of {model_uri} to {mmap_path}')
+
+            os.makedirs(os.path.dirname(mmap_path), exist_ok=True)
+            temp_path = f'{mmap_path}.{os.getpid()}.tmp'
+            joblib.dump(loaded_model, temp_path)
+            os.replace(temp_path, mmap_path)
+
+        return joblib.load(mmap_path, mmap_mode='r')
+
+    @staticmethod
+    def _get_trees_path(mmap_path):
+        return os.path.splitext(mmap_path)[0] + '.trees'
+
+    @classmethod
+    def _has_trees(cls, obj, depth: int = 0) -> bool:
+        """Whether a fitted estimator holds sklearn Tree objects, looking through ensembles and pipelines"""
+        from sklearn.tree._tree import Tree
+
+        if isinstance(obj, Tree):
+            return True
+
+        # Deep enough for a forest inside a pipeline step
+        if depth > 8:
+            return False
+
+        if isinstance(obj, (list, tuple)):
+            items = obj
+        elif isinstance(obj, dict):
+            items = obj.values()
+        elif isinstance(obj, np.ndarray):
+            # Gradient boosting keeps its trees in an object array
+            items = obj.ravel() if obj.dtype == object else ()
+        elif hasattr(obj, '__dict__'):
+            items = vars(obj).values()
+        else:
+            return False
+
+        return any(cls._has_trees(item, depth + 1) for item in items)
+
+    @staticmethod
+    def _get_feature_names(loaded_model):
+        """Ordered feature names the model was fitted with, or None if the model doesn't expose them"""
+        # sklearn estimators and the xgboost sklearn API
+        feature_names = getattr(loaded_model, 'feature_names_in_', None)
+
+        # pyfunc models with a logged signature
+        if feature_names is None and hasattr(loaded_model, 'metadata'):
+            input_schema = loaded_model.metadata.get_input_schema()
+            feature_names = input_schema.input_names() if input_schema else None
+
+        if feature_names is None:
+            return None
+
+        return [str(name) for name in feature_names] or None
+
+    def get_model(self, model_name, model_version) -> Optional[Model]:
+
+        model_ = self.models.get(model_name, {}).get(model_version)
+        if model_ is None:
+            return None
+
+        loaded_model, explainer, reducer = self._get_artifacts(model_)
+
+        if loaded_model is None:
+            loaded_model, explainer, reducer = self._ensure_loaded(model_name, model_version)
+        elif (model_name, model_version) in self._loaded:
+            with self._lock:
+                if (model_name, model_version) in self._loaded:
+                    self._loaded.move_to_end((model_name, model_version))
+
+        return self._build_model(model_name, model_version, loaded_model, explainer, reducer)
 
+    def _build_model(self, model_name, model_version, loaded_model, explainer, reducer) -> Model:
         model_ = self.models[model_name][model_version]
 
         model = Model(
@@ -51,10 +327,14 @@ class MLFlowGateway:
             model_name=model_name,
             model_version=model_version,
             threshold=model_["threshold"] if model_["model_type"] == ModelType.CLASSIFICATION.value else None,
-            labels=model_["labels"] if model_["model_type"] == ModelType.CLASSIFICATION.value else None
+            labels=model_["labels"] if model_["model_type"] == ModelType.CLASSIFICATION.value else None,
+            mlflow_flavor=model_.get('mlflow_flavor', 'pyfunc'),
+            feature_names=model_.get('feature_names')
         )
 
-        model.model = model_['model']
+        model.model = loaded_model
+        model._explainer = explainer
+        model._umap = reducer
 
         return model
 
@@ -1,6 +1,9 @@
 from typing import Union, List, Optional, Dict
+from operator import itemgetter
+import numpy as np
 import pandas as pd
 import hashlib
+import json
 import uuid
 
 from dataclasses import dataclass, field
@@ -22,8 +25,11 @@ class Model:
     model_type: ModelType = None
     threshold: Union[float, None] = None
     labels: Union[None, List[Labels]] = None
+    mlflow_flavor: Optional[str] = None
+    feature_names: Optional[List[str]] = None
     _model = None
     _explainer = None
+    _umap = None
 
     def __post_init__(self):
         if not self.id:
@@ -53,7 +59,9 @@ class Prediction:
     embeddings: Optional[List[float]] = None
     model: Model = None
     metadata: dict = field(default_factory=dict)
-    _input_key: str = None
+    # Computed on demand and cached per instance; not dataclass fields, so they stay out of to_dict() and responses
+    _input_key = None
+    _input_array = None
 
     def __post_init__(self):
         self._validate_inputs(self.inputs)
@@ -82,9 +90,46 @@ class Prediction:
     def probability(self, val):
         self._probability = val
 
+    @property
+    def input_key(self) -> str:
+        # Independent of key order and of 1 vs 1.0, so identical records always hash the same
+        if self._input_key is None:
+            canonical = json.dumps(
+                {key: float(value) for key, value in self.inputs.items()}, sort_keys=True, separators=(',', ':')
+            )
+            self._input_key = hashlib.md5(canonical.encode()).hexdigest()
+
+        return self._input_key
+
     def get_pandas_frame_of_inputs(self):
         return pd.DataFrame([self.inputs], index=[0])
 
+    def get_numpy_array_of_inputs(self, feature_names: List[str]) -> np.ndarray:
+        # Packed once per prediction so inference and embedding share the same row
+        if self._input_array is None:
+            self._input_array = Prediction.get_numpy_array_of_batch([self], feature_names)
+
+        return self._input_array
+
+    @staticmethod
+    def get_pandas_frame_of_batch(predictions: List['Prediction']) -> pd.DataFrame:
+        # One frame for the whole batch so the model is dispatched once
+        return pd.DataFrame([prediction.inputs for prediction in predictions], index=range(len(predictions)))
+
+    @staticmethod
+    def get_numpy_array_of_batch(predictions: List['Prediction'], feature_names: List[str]) -> np.ndarray:
+        """Pack inputs into a float64 matrix in the model's feature order, skipping pandas entirely"""
+        matrix = np.empty((len(predictions), len(feature_names)), dtype=np.float64)
+        get_features = itemgetter(*feature_names)
+
+        for idx, prediction in enumerate(predictions):
+            try:
+                matrix[idx] = get_features(prediction.inputs)
+            except KeyError as e:
+                raise ValueError(f"Missing input feature {str(e)}")
+
+        return matrix
+
     def __repr__(self):
         return f'Prediction ID: {self.id}'
 
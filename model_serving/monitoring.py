@@ -3,17 +3,30 @@ import time
 from flask import request
 from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
 
+# Collection-only registry: every metric below is written to the multiprocess directory and read back from there,
+# so /metrics reports the sum over all worker processes. Registering them here as well would report this process twice.
 registry = CollectorRegistry()
 multiprocess.MultiProcessCollector(registry=registry)
 
-REQUEST_COUNT = Counter('request_count', 'Total number of requests', ['method', 'endpoint', 'http_status'],
-                        registry=registry)
+REQUEST_COUNT = Counter('request_count', 'Total number of requests', ['method', 'endpoint', 'http_status'])
 REQUEST_LATENCY = Histogram('request_latency_seconds', 'Request latency in seconds',
-                            ['method', 'endpoint', 'http_status'], registry=registry)
+                            ['method', 'endpoint', 'http_status'])
 
 # Create a histogram metric to track the duration of function executions
 FUNCTION_DURATION = Histogram('function_duration_seconds', 'Time spent processing the function', ['function_name'])
 
+# Number of requests scored together by the micro-batcher
+MICRO_BATCH_SIZE = Histogram('micro_batch_size', 'Number of predictions per micro-batch',
+                             buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+# Prediction cache in front of PredictionController.create_prediction
+PREDICTION_CACHE_HITS = Counter('prediction_cache_hits', 'Predictions served from the prediction cache')
+PREDICTION_CACHE_MISSES = Counter('prediction_cache_misses', 'Predictions not found in the prediction cache')
+PREDICTION_CACHE_EVICTIONS = Counter('prediction_cache_evictions', 'Entries evicted from the prediction cache')
+
+# Rows the write-behind PredictionWriter gave up on after retrying
+PREDICTION_WRITES_DROPPED = Counter('prediction_writes_dropped', 'Queued prediction and SHAP rows that could not be written')
+
 
 def before_request():
     request.start_time = time.time()
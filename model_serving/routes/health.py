@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+
+from model_serving.services.warmup_service import warmup_service
+
+
+health = Blueprint('health', __name__)
+
+
+@health.route('/ready', methods=['GET'])
+def ready():
+    if not warmup_service.is_ready():
+        return jsonify({'status': 'warming_up'}), 503
+
+    return jsonify({'status': 'ready'}), 200
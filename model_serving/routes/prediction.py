@@ -1,10 +1,15 @@
+import json
 import logging
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 
 from model_serving.models.prediction import Prediction
 from model_serving.controllers.prediction import prediction_controller
+from model_serving.services.pagination import get_limit, iter_json_array, iter_ndjson
 from model_serving.domain.exceptions import (
     ModelNotFoundException,
+    PredictionNotFoundException,
+    ExplanationNotFoundException,
     InvalidInputException,
     ModelTypeException,
     InferenceException
@@ -56,10 +61,209 @@ def create_prediction(model, version):
         return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
 
 
+@prediction.route('/<model>/version/<version>/predict/batch', methods=['POST'])
+def create_batch_prediction(model, version):
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Invalid Input", "message": "No JSON data provided"}), 400
+
+        if not isinstance(data.get('features'), list) or not data['features']:
+            return jsonify({"error": "Invalid Input", "message": "'features' must be a non-empty list"}), 400
+
+        max_batch_size = current_app.config.get('MAX_BATCH_SIZE')
+        if max_batch_size and len(data['features']) > max_batch_size:
+            return jsonify({"error": "Invalid Input", "message": f"Batch size exceeds {max_batch_size} rows"}), 400
+
+        predictions = [Prediction(inputs=features) for features in data['features']]
+        predictions = prediction_controller.create_predictions(
+            model_name=model,
+            model_version=version,
+            predictions=predictions
+        )
+
+        logger.info(f'Created {len(predictions)} predictions for {model} version {version}')
+        return jsonify({"predictions": [prediction.to_dict(encode_json=True) for prediction in predictions]}), 200
+
+    except ValueError as e:
+        logger.error(f"Invalid input: {str(e)}")
+        return jsonify({"error": "Invalid Input", "message": str(e)}), 400
+
+    except ModelNotFoundException as e:
+        logger.error(f"Model not found: {str(e)}")
+        return jsonify({"error": "Model Not Found", "message": str(e)}), 404
+
+    except (InvalidInputException, ModelTypeException) as e:
+        logger.error(f"Invalid input: {str(e)}")
+        return jsonify({"error": "Invalid Input", "message": str(e), "details": e.details}), 400
+
+    except InferenceException as e:
+        logger.error(f"Inference error: {str(e)}")
+        return jsonify({"error": "Prediction Error", "message": str(e)}), 500
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
+
+
+def _read_records(stream):
+    """(line number, Prediction) for every non-empty NDJSON line, (line number, ValueError) where it doesn't parse"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Each line must be a JSON object")
+
+            # Either the /predict body or a bare feature mapping
+            yield line_number, Prediction(inputs=record.get('features', record))
+
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid record: {str(e)}")
+
+
+def _format_result(line_number, result) -> str:
+    if isinstance(result, Prediction):
+        return json.dumps({"line": line_number, "prediction": result.to_dict(encode_json=True)}) + '\n'
+
+    if isinstance(result, (ValueError, InvalidInputException, ModelTypeException)):
+        error = {"line": line_number, "error": "Invalid Input", "message": str(result)}
+        if getattr(result, 'details', None):
+            error["details"] = result.details
+    else:
+        error = {"line": line_number, "error": "Prediction Error", "message": str(result)}
+
+    return json.dumps(error) + '\n'
+
+
+@prediction.route('/<model>/version/<version>/predict/stream', methods=['POST'])
+def create_stream_prediction(model, version):
+    """
+    Score newline-delimited JSON records as they are uploaded, streaming one NDJSON result line per record back as
+    each chunk of STREAM_CHUNK_SIZE records is scored
+    """
+    try:
+        results = prediction_controller.stream_predictions(
+            model_name=model,
+            model_version=version,
+            records=_read_records(request.stream),
+            chunk_size=current_app.config.get('STREAM_CHUNK_SIZE', 1000)
+        )
+
+        def generate():
+            count = 0
+            for line_number, result in results:
+                count += 1
+                yield _format_result(line_number, result)
+
+            logger.info(f'Streamed {count} predictions for {model} version {version}')
+
+        return Response(stream_with_context(generate()), status=200, mimetype='application/x-ndjson')
+
+    except ModelNotFoundException as e:
+        logger.error(f"Model not found: {str(e)}")
+        return jsonify({"error": "Model Not Found", "message": str(e)}), 404
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
+
+
+def _get_prediction_filters() -> dict:
+    """model, version and the ISO 8601 [start, end) created range of the listing query parameters"""
+    start, end = request.args.get('start'), request.args.get('end')
+
+    return {
+        "model_name": request.args.get('model'),
+        "model_version": request.args.get('version'),
+        "start": datetime.fromisoformat(start) if start else None,
+        "end": datetime.fromisoformat(end) if end else None
+    }
+
+
+@prediction.get('/predictions')
+def get_predictions():
+    """One page of predictions (limit, default PAGE_SIZE), the next page's cursor is returned in X-Next-Cursor"""
+    try:
+        limit = get_limit(
+            request.args.get('limit'), current_app.config.get('PAGE_SIZE', 100), current_app.config.get('MAX_PAGE_SIZE', 1000)
+        )
+        predictions, next_cursor = prediction_controller.list_predictions(
+            limit, request.args.get('cursor'), **_get_prediction_filters()
+        )
+
+    except ValueError as e:
+        logger.error(f"Invalid input: {str(e)}")
+        return jsonify({"error": "Invalid Input", "message": str(e)}), 400
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
+
+    output = (prediction.to_dict(encode_json=True) for prediction in predictions)
+    response = Response(iter_json_array(output), status=200, mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+
+    return response
+
+
+@prediction.get('/predictions/export')
+def export_predictions():
+    """Every matching prediction as NDJSON, streamed a page at a time"""
+    try:
+        filters = _get_prediction_filters()
+
+    except ValueError as e:
+        logger.error(f"Invalid input: {str(e)}")
+        return jsonify({"error": "Invalid Input", "message": str(e)}), 400
+
+    predictions = prediction_controller.iter_predictions(current_app.config.get('MAX_PAGE_SIZE', 1000), **filters)
+    output = (prediction.to_dict(encode_json=True) for prediction in predictions)
+
+    return Response(stream_with_context(iter_ndjson(output)), status=200, mimetype='application/x-ndjson')
+
+
 @prediction.get('/prediction/<id>')
 def get_prediction(id):
-    prediction: Prediction = prediction_controller.get_prediction(id)
+    try:
+        prediction: Prediction = prediction_controller.get_prediction(id)
+
+        logger.info(f'Retrieved prediction {prediction.id}')
 
-    logger.info(f'Retrieved prediction {prediction.id}')
+        return prediction.to_json(), 200
 
-    return prediction.to_json(), 200
+    except PredictionNotFoundException as e:
+        logger.error(f"Prediction not found: {str(e)}")
+        return jsonify({"error": "Prediction Not Found", "message": str(e)}), 404
+
+    except ModelNotFoundException as e:
+        logger.error(f"Model not found: {str(e)}")
+        return jsonify({"error": "Model Not Found", "message": str(e)}), 404
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
+
+
+@prediction.get('/prediction/<id>/explanation')
+def get_explanation(id):
+    try:
+        shaps = prediction_controller.get_explanation(id)
+
+        logger.info(f'Retrieved explanation of prediction {id}')
+
+        return jsonify({
+            "prediction_id": id,
+            "explanations": [{"label": shap.label, "shap_values": shap.shap_values} for shap in shaps]
+        }), 200
+
+    except (PredictionNotFoundException, ExplanationNotFoundException) as e:
+        logger.error(f"Explanation not found: {str(e)}")
+        return jsonify({"error": "Explanation Not Found", "message": str(e)}), 404
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
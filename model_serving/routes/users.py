@@ -1,11 +1,10 @@
 # users.py route
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 import logging
 
-from model_serving.models.users import User
-from model_serving.services.database.database_client import db
 from model_serving.controllers.users import user_controller
+from model_serving.services.pagination import get_limit, iter_json_array, iter_ndjson
 
 
 users = Blueprint('users', __name__)
@@ -30,6 +29,31 @@ def add_user():
 
     return jsonify({'id': data.id, 'user_name': data.username, 'email': data.email}), 201
 
+@users.route('/users/bulk', methods=['POST'])
+def add_users():
+    data = request.json
+
+    if not isinstance(data, list):
+        return jsonify({'message': 'Expected a list of users'}), 400
+
+    try:
+        results = user_controller.create_users(data, current_app.config.get('USER_IMPORT_CHUNK_SIZE', 1000))
+    except Exception as e:
+        logger.exception(f'Encountered Error {str(e)}')
+        return jsonify({'message': 'Server error'}), 500
+
+    created = sum(result['status'] == 'created' for result in results)
+
+    return jsonify({'created': created, 'failed': len(results) - created, 'results': results}), 200
+
+@users.route('/users/export', methods=['GET'])
+def export_users():
+    # Every user as NDJSON, streamed a page at a time
+    users_ = user_controller.iter_users(current_app.config.get('MAX_PAGE_SIZE', 1000))
+    output = ({'id': user.id, 'user_name': user.username, 'email': user.email} for user in users_)
+
+    return Response(stream_with_context(iter_ndjson(output)), status=200, mimetype='application/x-ndjson')
+
 @users.route('/users/<user_id>', methods=['GET'])
 def get_user(user_id):
 
@@ -72,8 +96,19 @@ def delete_user(user_id):
 
 @users.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    output = []
-    for user in users:
-        output.append({'id': user.id, 'user_name': user.username, 'email': user.email})
-    return jsonify(output), 200
\ No newline at end of file
+    # One page per call (limit, default PAGE_SIZE), the next page's cursor is returned in the X-Next-Cursor header
+    try:
+        limit = get_limit(
+            request.args.get('limit'), current_app.config.get('PAGE_SIZE', 100), current_app.config.get('MAX_PAGE_SIZE', 1000)
+        )
+        users, next_cursor = user_controller.list_users(limit, request.args.get('cursor'))
+    except ValueError as e:
+        logger.exception(f'Encountered error {str(e)}')
+        return jsonify({'message': str(e)}), 400
+
+    output = ({'id': user.id, 'user_name': user.username, 'email': user.email} for user in users)
+    response = Response(iter_json_array(output), status=200, mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+
+    return response
\ No newline at end of file
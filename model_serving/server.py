@@ -0,0 +1,147 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+
+from werkzeug.serving import make_server
+
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """
+    Pre-fork launcher. The app (and every model MLFlowGateway.init_app loads) is built once in the parent, then
+    worker processes are forked off a shared listening socket. The model arrays are never written after load, so
+    the workers share the parent's pages copy-on-write instead of each holding its own copy. Metrics are
+    aggregated across workers through the prometheus multiprocess directory set up in app_factory.
+    """
+
+    def __init__(self, app, host: str = '127.0.0.1', port: int = 5000, workers: int = 1):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self._children = set()
+        self._stopping = False
+        self._socket = None
+
+    def run(self):
+        self._socket = socket.create_server((self.host, self.port), backlog=2048)
+        self._socket.set_inheritable(True)
+
+        self._prepare_fork()
+
+        for _ in range(self.workers):
+            self._spawn_worker()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        logger.info(f'Serving on {self.host}:{self.port} with {self.workers} workers')
+        self._monitor()
+
+    def _prepare_fork(self):
+        # A background warm-up thread would be lost in the fork, leaving every worker's /ready at 503 for good
+        from model_serving.services.warmup_service import warmup_service
+        warmup_service.wait()
+
+        # Don't let pooled DB connections be shared between processes
+        from model_serving.services.database.database_client import db
+        with self.app.app_context():
+            db.engine.dispose()
+
+        # Move everything allocated so far (models included) out of the GC's reach; collections in the workers
+        # would otherwise touch every object header and un-share the pages
+        gc.collect()
+        gc.freeze()
+
+    def _spawn_worker(self):
+        pid = os.fork()
+
+        if pid == 0:
+            signal.signal(signal.SIGTERM, self._handle_worker_stop)
+            signal.signal(signal.SIGINT, self._handle_worker_stop)
+
+            try:
+                self._serve()
+            finally:
+                self._shutdown_worker()
+                os._exit(0)
+
+        self._children.add(pid)
+        logger.info(f'Started worker {pid}')
+
+    def _serve(self):
+        server = make_server(self.host, self.port, self.app, threaded=True, fd=self._socket.fileno())
+        server.serve_forever()
+
+    @staticmethod
+    def _handle_worker_stop(signum, frame):
+        # Unwind out of serve_forever so the worker's finally block runs
+        raise SystemExit(0)
+
+    @staticmethod
+    def _shutdown_worker():
+        # os._exit skips atexit, so predictions still queued for the write-behind writer are flushed here
+        from model_serving.services.database.prediction_writer import prediction_writer
+        try:
+            prediction_writer.flush()
+        except Exception as e:
+            logger.error(f'Failed to flush queued predictions: {str(e)}')
+
+    def _monitor(self):
+        # Imported here rather than at the top: prometheus_client picks its value class when first imported, and has to
+        # see the multiprocess directory app_factory sets, or the request metrics never reach it
+        from prometheus_client import multiprocess
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            self._children.discard(pid)
+            multiprocess.mark_process_dead(pid)
+
+            if not self._stopping:
+                logger.warning(f'Worker {pid} exited with status {status}, restarting')
+                self._spawn_worker()
+
+        self._socket.close()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._children.discard(pid)
+
+
+def main(argv=None):
+    from model_serving.app_factory import create_app
+    from model_serving.config import environments
+
+    config = environments[os.environ.get('FLASK_ENV', 'development')]
+
+    parser = argparse.ArgumentParser(description='Run the model serving app with pre-forked workers')
+    parser.add_argument('--host', default=config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=config.LOG_LEVEL)
+
+    app = create_app(config)
+    PreforkServer(app, host=args.host, port=args.port, workers=args.workers).run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
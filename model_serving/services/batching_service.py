@@ -0,0 +1,129 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from model_serving.models.prediction import Model, Prediction
+from model_serving.monitoring import MICRO_BATCH_SIZE
+from model_serving.services.inference_service import inference_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchingService:
+    """
+    Collects concurrent single-row inference requests for the same model/version and runs them through one
+    vectorized model call. Each model/version gets its own queue and worker thread; callers block on a future
+    until their batch has been scored. The worker of a version stops once the gateway evicts it.
+    """
+
+    enabled = False
+    max_batch_size = 64
+    max_latency_ms = 2.0
+
+    def __init__(self):
+        self._queues: Dict[Tuple[str, str], queue.Queue] = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, gateway):
+        config = app.config.get('MICRO_BATCHING', {})
+
+        self.enabled = config.get('enabled', False)
+        self.max_batch_size = config.get('max_batch_size', self.max_batch_size)
+        self.max_latency_ms = config.get('max_latency_ms', self.max_latency_ms)
+
+        gateway.add_evict_listener(self.discard)
+
+    def create_inference(self, model: Model, prediction: Prediction) -> Prediction:
+        future = Future()
+
+        # Queued under the lock so a request can't land on a queue whose worker discard has already told to stop
+        with self._lock:
+            self._get_queue(model).put((model, prediction, future))
+
+        return future.result()
+
+    def discard(self, model_name: str, model_version: str):
+        """Stop the worker of an evicted version once it has scored the requests already queued"""
+        with self._lock:
+            requests = self._queues.pop((model_name, str(model_version)), None)
+            if requests is not None:
+                requests.put(None)
+
+    def _get_queue(self, model: Model) -> queue.Queue:
+        # Threads don't survive a fork, so each pre-forked worker process starts its own queues and workers
+        if self._pid != os.getpid():
+            self._queues = {}
+            self._pid = os.getpid()
+
+        model_key = (model.model_name, str(model.model_version))
+
+        requests = self._queues.get(model_key)
+        if requests is None:
+            requests = queue.Queue()
+            worker = threading.Thread(
+                target=self._run, args=(requests,), name=f'micro-batcher-{model_key[0]}-{model_key[1]}', daemon=True
+            )
+            worker.start()
+            self._queues[model_key] = requests
+
+        return requests
+
+    def _run(self, requests: queue.Queue):
+        last_batch_size = 1
+
+        while True:
+            batch = [requests.get()]
+            if batch[0] is None:
+                return
+
+            # Only hold the batch open when the previous one showed concurrent traffic, so a lone request is
+            # never delayed by the window
+            deadline = time.monotonic() + self.max_latency_ms / 1000 if last_batch_size > 1 else None
+
+            stopped = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    if deadline is None:
+                        request = requests.get_nowait()
+                    else:
+                        request = requests.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    stopped = True
+                    break
+                batch.append(request)
+
+            last_batch_size = len(batch)
+            self._process(batch)
+
+            if stopped:
+                return
+
+    @staticmethod
+    def _process(batch: List[Tuple[Model, Prediction, Future]]):
+        MICRO_BATCH_SIZE.observe(len(batch))
+
+        model = batch[0][0]
+        predictions = [prediction for _, prediction, _ in batch]
+
+        try:
+            predictions = inference_service.create_batch_inference(model, predictions)
+        except Exception as e:
+            logger.error(f"Micro-batch inference failed for {model.model_name} version {model.model_version}: {str(e)}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
+
+
+micro_batching_service: MicroBatchingService = MicroBatchingService()
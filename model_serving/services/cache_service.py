@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+from model_serving.models.prediction import Model, Prediction
+
+
+class ResultCache:
+    """Thread-safe LRU cache with an optional time to live, keyed by (model_name, model_version, input_key)"""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expiry or None, value), least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> int:
+        """Store value under key, returns the number of entries evicted to make room"""
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        evicted = 0
+
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+
+        return evicted
+
+    def invalidate(self, model_name: str, model_version: str):
+        """Drop every entry of one model version"""
+        with self._lock:
+            for key in [key for key in self._entries if key[:2] == (model_name, model_version)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheService:
+    """
+    Caches SHAP explanations and UMAP embeddings of identical inputs, so retries and re-scored records don't
+    recompute them. Entries of a model version are dropped whenever MLFlowGateway (re)loads it.
+    """
+
+    enabled = False
+
+    def __init__(self):
+        self.explanations = ResultCache()
+        self.embeddings = ResultCache()
+
+    def init_app(self, app, gateway):
+        config = app.config.get('RESULT_CACHE', {})
+
+        self.enabled = config.get('enabled', False)
+        self.explanations = ResultCache(config.get('max_size', 10000), config.get('ttl_seconds'))
+        self.embeddings = ResultCache(config.get('max_size', 10000), config.get('ttl_seconds'))
+
+        if self.enabled:
+            gateway.add_load_listener(self.invalidate)
+
+    def invalidate(self, model: Model):
+        self.explanations.invalidate(model.model_name, str(model.model_version))
+        self.embeddings.invalidate(model.model_name, str(model.model_version))
+
+    @staticmethod
+    def get_key(model: Model, prediction: Prediction) -> Tuple[str, str, str]:
+        return model.model_name, str(model.model_version), prediction.input_key
+
+    def get_many(self, cache: ResultCache, model: Model, predictions: List[Prediction]) -> List[Any]:
+        """Cached value of every prediction, None where there is none (or caching is disabled)"""
+        if not self.enabled:
+            return [None] * len(predictions)
+
+        return [cache.get(self.get_key(model, prediction)) for prediction in predictions]
+
+    def set_many(self, cache: ResultCache, model: Model, predictions: List[Prediction], values: List[Any]):
+        if not self.enabled:
+            return
+
+        for prediction, value in zip(predictions, values):
+            if value is not None:
+                cache.set(self.get_key(model, prediction), value)
+
+
+cache_service: CacheService = CacheService()
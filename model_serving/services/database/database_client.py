@@ -1,7 +1,9 @@
 import random
+import re
 import uuid
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -15,7 +17,26 @@ class BaseModel(DeclarativeBase):
     
 
 db = SQLAlchemy(model_class=BaseModel)
-    
+
+
+def set_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """Apply the SQLITE_PRAGMAS profile to every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    for name, value in pragmas.items():
+        if not re.fullmatch(r'\w+', str(name)) or not re.fullmatch(r'-?\w+', str(value)):
+            raise ValueError(f'Invalid SQLite pragma: {name}={value}')
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
 
 # Create a table if it doesn't exist
 def init_db(app, drop_db=False) -> None:
@@ -23,6 +44,10 @@ def init_db(app, drop_db=False) -> None:
     
     db.init_app(app)
 
+    # Pragmas are per connection, so they are set as the pool opens each one
+    with app.app_context():
+        set_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS', {}))
+
     # This will re-create the table everytime it is called during the app_factory. So that we don't have to always
     # Repopulate our database, I am leaving it commented out.
     # Create the database and the User table
@@ -35,4 +60,9 @@ def init_db(app, drop_db=False) -> None:
                 pass
 
             db.create_all()
-            db.session.commit()
\ No newline at end of file
+            db.session.commit()
+
+    # Bring tables created by earlier releases up to the current indexes and constraints
+    from model_serving.services.database.migrations import run_migrations
+    with app.app_context():
+        run_migrations(db.engine)
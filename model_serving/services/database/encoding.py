@@ -0,0 +1,74 @@
+import json
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# The first byte of every blob is the item size, so rows written with either precision decode the same way
+DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8')
+}
+ITEM_SIZES = {dtype.itemsize: dtype for dtype in DTYPES.values()}
+
+
+class CompactEncoding:
+    """
+    Opt-in binary storage of prediction inputs, embeddings and SHAP values: little-endian float arrays instead of
+    JSON text. Mappings are stored as values only, in the feature order kept once per model on ModelSQL.feature_names.
+    Rows that can't be encoded (nested embeddings, inputs that don't match the header) fall back to JSON, and
+    decoding never depends on whether encoding is currently enabled.
+    """
+
+    enabled = False
+    dtype = DTYPES['float64']
+
+    def init_app(self, app):
+        config = app.config.get('COMPACT_ENCODING', {})
+
+        self.enabled = config.get('enabled', False)
+
+        dtype = config.get('dtype', 'float64')
+        if dtype not in DTYPES:
+            raise ValueError(f'Unsupported compact encoding dtype: {dtype}')
+        self.dtype = DTYPES[dtype]
+
+    def encode(self, values: Sequence[float]) -> Optional[bytes]:
+        """Encode a flat sequence of numbers, None if it isn't one"""
+        try:
+            array = np.asarray(values, dtype=self.dtype)
+        except (TypeError, ValueError):
+            return None
+
+        if array.ndim != 1:
+            return None
+
+        return bytes([self.dtype.itemsize]) + array.tobytes()
+
+    @staticmethod
+    def decode(blob: bytes) -> List[float]:
+        return np.frombuffer(blob, dtype=ITEM_SIZES[blob[0]], offset=1).tolist()
+
+    def encode_mapping(self, mapping: Dict[str, float], feature_names: Optional[List[str]]) -> Optional[bytes]:
+        """Encode the values of a feature -> value mapping in header order, None if the features differ"""
+        if not feature_names or len(mapping) != len(feature_names):
+            return None
+
+        try:
+            return self.encode([mapping[name] for name in feature_names])
+        except KeyError:
+            return None
+
+    def decode_mapping(self, blob: bytes, feature_names: List[str]) -> Dict[str, float]:
+        return dict(zip(feature_names, self.decode(blob)))
+
+    @staticmethod
+    def encode_header(feature_names: Optional[List[str]]) -> Optional[str]:
+        return json.dumps(list(feature_names)) if feature_names else None
+
+    @staticmethod
+    def decode_header(header: Optional[str]) -> Optional[List[str]]:
+        return json.loads(header) if header else None
+
+
+compact_encoding: CompactEncoding = CompactEncoding()
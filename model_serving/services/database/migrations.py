@@ -0,0 +1,109 @@
+import logging
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateTable
+
+from model_serving.services.database.prediction import PredictionSQL, ModelSQL, ShapSQL
+
+
+logger = logging.getLogger(__name__)
+
+MODELS = (ModelSQL, PredictionSQL, ShapSQL)
+
+
+def _rebuild_table(connection, model) -> None:
+    """
+    Recreate a table with its current definition, copying the rows of the columns it shares with the old one. SQLite
+    can't alter or drop constraints any other way. The new table is built under another name and swapped in, so
+    foreign keys referencing it keep their target; its indexes are recreated by add_indexes.
+    """
+    table = model.__table__
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+
+    logger.info(f'Rebuilding table {table.name}')
+
+    # The copy needs the tables its foreign keys refer to alongside it
+    metadata = MetaData()
+    for other in table.metadata.sorted_tables:
+        if other is not table:
+            other.to_metadata(metadata)
+
+    connection.execute(CreateTable(table.to_metadata(metadata, name=f'{table.name}_new')))
+    connection.execute(text(f'INSERT INTO {table.name}_new ({columns}) SELECT {columns} FROM {table.name}'))
+    connection.execute(text(f'DROP TABLE {table.name}'))
+    connection.execute(text(f'ALTER TABLE {table.name}_new RENAME TO {table.name}'))
+
+
+def replace_model_unique_constraints(connection) -> None:
+    """
+    models used to have separate unique constraints on model_name and model_version, which allowed a single version
+    per model; they are replaced by the composite one.
+    """
+    inspector = inspect(connection)
+    if ModelSQL.__tablename__ not in inspector.get_table_names() or connection.dialect.name != 'sqlite':
+        return
+
+    unique_columns = [constraint['column_names'] for constraint in inspector.get_unique_constraints('models')]
+    if ['model_name'] in unique_columns or ['model_version'] in unique_columns:
+        _rebuild_table(connection, ModelSQL)
+
+
+def relax_not_null(connection) -> None:
+    """predictions.inputs and shaps.shap_values became nullable when their compactly encoded columns were added"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+
+    for model in MODELS:
+        if model.__tablename__ not in tables:
+            continue
+
+        nullable = {column['name']: column['nullable'] for column in inspector.get_columns(model.__tablename__)}
+        if any(column.nullable and not nullable.get(column.name, True) for column in model.__table__.columns):
+            _rebuild_table(connection, model)
+
+
+def add_columns(connection) -> None:
+    """Add the nullable columns of the current schema that tables created before them lack"""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+
+    for model in MODELS:
+        if model.__tablename__ not in tables:
+            continue
+
+        existing = {column['name'] for column in inspector.get_columns(model.__tablename__)}
+        for column in model.__table__.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {model.__tablename__} ADD COLUMN {column.name} {column_type}'))
+
+
+def add_indexes(connection) -> None:
+    """Create the indexes of the current schema on tables created before they were declared"""
+    tables = set(inspect(connection).get_table_names())
+
+    for model in MODELS:
+        if model.__tablename__ not in tables:
+            continue
+
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+
+# Every migration checks the schema before changing it, so they are all safe to run on every start
+MIGRATIONS = [
+    replace_model_unique_constraints,
+    relax_not_null,
+    add_columns,
+    add_indexes
+]
+
+
+def run_migrations(engine) -> None:
+    with engine.begin() as connection:
+        for migration in MIGRATIONS:
+            migration(connection)
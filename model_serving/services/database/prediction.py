@@ -1,66 +1,139 @@
-from sqlalchemy import CLOB, Numeric, ForeignKey, DateTime
+from sqlalchemy import CLOB, Numeric, ForeignKey, DateTime, Index, UniqueConstraint, LargeBinary
 from datetime import datetime
 import json
-from typing import List
+from typing import List, Optional, Tuple
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from model_serving.services.database.database_client import db
-from model_serving.models.prediction import Prediction, Model
+from model_serving.services.database.encoding import compact_encoding
+from model_serving.models.prediction import Prediction, Model, Shap
 from model_serving.domain.common_enums import ModelType
 from model_serving.domain.common_enums import Labels
 
 class PredictionSQL(db.Model):
     __tablename__ = 'predictions'
+    __table_args__ = (
+        # Lookups by id use the primary key; a model's predictions are read in time order
+        Index('ix_predictions_model_id_created', 'model_id', 'created'),
+        Index('ix_predictions_created', 'created'),
+    )
 
     id: Mapped[str] = mapped_column(db.String(120), primary_key=True)
-    inputs: Mapped[str] = mapped_column(CLOB, nullable=False)
+    # With COMPACT_ENCODING the *_blob column is written instead of its JSON counterpart
+    inputs: Mapped[str] = mapped_column(CLOB, nullable=True)
+    inputs_blob: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
     value: Mapped[str] = mapped_column(db.String(120), nullable=True)
     probability: Mapped[float] = mapped_column(Numeric, nullable=True)
     actual: Mapped[float] = mapped_column(Numeric, nullable=True)
     embeddings: Mapped[str] = mapped_column(CLOB, nullable=True)
+    embeddings_blob: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
     updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     created: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     model_id: Mapped[str] = mapped_column(db.String(120), ForeignKey("models.id"), nullable=False)
     model: Mapped["ModelSQL"] = relationship("ModelSQL", back_populates="predictions")
+    shaps: Mapped[List["ShapSQL"]] = relationship("ShapSQL", back_populates="prediction")
 
     @classmethod
-    def from_prediction(cls, prediction: Prediction, model: 'ModelSQL') -> 'PredictionSQL':
-        return cls(
+    def from_prediction(cls, prediction: Prediction, model: 'ModelSQL',
+                        feature_names: Optional[List[str]] = None) -> 'PredictionSQL':
+        return cls(**cls.to_row(prediction, model, feature_names))
+
+    @staticmethod
+    def to_row(prediction: Prediction, model: 'ModelSQL', feature_names: Optional[List[str]] = None) -> dict:
+        """
+        Column values of a prediction, as used for bulk inserts. feature_names is the model's decoded header, passed in
+        by the caller so a batch decodes it once rather than once per row.
+        """
+        model_type = (prediction.model or model).model_type
+        inputs, inputs_blob = PredictionSQL.encode_inputs(prediction.inputs, feature_names)
+        embeddings, embeddings_blob = PredictionSQL.encode_embeddings(prediction.embeddings)
+
+        return dict(
             id=prediction.id
-            , inputs=json.dumps(prediction.inputs)
-            , value=str(prediction.value.value) if prediction.model.model_type == ModelType.CLASSIFICATION.value else str(prediction.value)
+            , inputs=inputs
+            , inputs_blob=inputs_blob
+            , value=str(prediction.value.value) if model_type == ModelType.CLASSIFICATION.value else str(prediction.value)
             , probability=prediction.probability
             , actual=float(prediction.actual) if prediction.actual else None
-            , embeddings=json.dumps(prediction.embeddings) if prediction.embeddings else None
+            , embeddings=embeddings
+            , embeddings_blob=embeddings_blob
             , model_id=model.id
         )
 
+    @staticmethod
+    def encode_inputs(inputs: dict, feature_names: Optional[List[str]]) -> Tuple[Optional[str], Optional[bytes]]:
+        """(inputs, inputs_blob) column values"""
+        if compact_encoding.enabled:
+            blob = compact_encoding.encode_mapping(inputs, feature_names)
+            if blob is not None:
+                return None, blob
+
+        return json.dumps(inputs), None
+
+    @staticmethod
+    def encode_embeddings(embeddings) -> Tuple[Optional[str], Optional[bytes]]:
+        """(embeddings, embeddings_blob) column values"""
+        if not embeddings:
+            return None, None
+
+        if compact_encoding.enabled:
+            blob = compact_encoding.encode(embeddings)
+            if blob is not None:
+                return None, blob
+
+        return json.dumps(embeddings), None
+
+    def set_embeddings(self, embeddings):
+        self.embeddings, self.embeddings_blob = self.encode_embeddings(embeddings)
+
     def to_prediction(self) -> Prediction:
-        embeddings_data = json.loads(self.embeddings) if self.embeddings else None
+        model = self.model
+        # Only compactly encoded rows need the header
+        if self.inputs_blob is not None or any(shap.shap_values_blob is not None for shap in self.shaps):
+            feature_names = model.get_feature_names()
+        else:
+            feature_names = None
+
+        if self.inputs_blob is not None:
+            inputs = compact_encoding.decode_mapping(self.inputs_blob, feature_names)
+        else:
+            inputs = json.loads(self.inputs)
+
+        if self.embeddings_blob is not None:
+            embeddings_data = compact_encoding.decode(self.embeddings_blob)
+        else:
+            embeddings_data = json.loads(self.embeddings) if self.embeddings else None
         
         return Prediction(
             id=self.id,
-            inputs=json.loads(self.inputs),
-            value=float(self.value) if self.model.model_type == ModelType.REGRESSION.value else Labels(self.value),
-            probability=float(self.probability) if self.probability else None,
+            inputs=inputs,
+            _value=float(self.value) if model.model_type == ModelType.REGRESSION.value else Labels(self.value),
+            _probability=float(self.probability) if self.probability else None,
             actual=float(self.actual) if self.actual else None,
             embeddings=embeddings_data,
+            shap_values=[shap.to_shap(feature_names) for shap in self.shaps],
             model=Model(
                 id=self.model_id,
-                model_type=ModelType(self.model.model_type),
-                model_name=self.model.model_name,
-                model_version=self.model.model_version
+                model_type=ModelType(model.model_type),
+                model_name=model.model_name,
+                model_version=model.model_version
             )
         )
 
 class ModelSQL(db.Model):
     __tablename__ = 'models'
+    __table_args__ = (
+        # Versions are unique per model, and from_model looks rows up by exactly this pair
+        UniqueConstraint('model_name', 'model_version', name='uq_models_name_version'),
+    )
 
     id: Mapped[str] = mapped_column(db.String(120), primary_key=True)
     model_type: Mapped[str] = mapped_column(db.String(250), nullable=False)
-    model_name: Mapped[str] = mapped_column(db.String(240), unique=True, nullable=False)
-    model_version: Mapped[str] = mapped_column(db.INTEGER, unique=True, nullable=True)
+    model_name: Mapped[str] = mapped_column(db.String(240), nullable=False)
+    model_version: Mapped[str] = mapped_column(db.INTEGER, nullable=True)
+    # JSON list, the order in which compactly encoded inputs and SHAP values are stored. Never changed once set
+    feature_names: Mapped[str] = mapped_column(CLOB, nullable=True)
     updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     created: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
@@ -80,26 +153,71 @@ class ModelSQL(db.Model):
                 , model_type=model.model_type
                 , model_name=model.model_name
                 , model_version=model.model_version
+                , feature_names=compact_encoding.encode_header(model.feature_names) if isinstance(model.feature_names, list) else None
             )
 
             db.session.add(model_)
 
         return model_
 
+    def get_feature_names(self) -> Optional[List[str]]:
+        # Decoded once per instance, so the rows of a page, which share their model row, don't each parse the header
+        cached = self.__dict__.get('_decoded_feature_names')
+        if cached is None or cached[0] != self.feature_names:
+            cached = (self.feature_names, compact_encoding.decode_header(self.feature_names))
+            self._decoded_feature_names = cached
+
+        return cached[1]
+
     def __repr__(self):
         return f'Model Name {self.model_name}, Model Version {self.model_version}'
     
 class ShapSQL(db.Model):
 
     __tablename__ = 'shaps'
+    __table_args__ = (
+        Index('ix_shaps_prediction_id', 'prediction_id'),
+    )
 
     id: Mapped[str] = mapped_column(db.String(120), primary_key=True)
     type: Mapped[str] = mapped_column(db.String(120), primary_key=True)
-    shap_values: Mapped[dict] = mapped_column(CLOB)
+    shap_values: Mapped[dict] = mapped_column(CLOB, nullable=True)
+    shap_values_blob: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
 
 
     updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     created: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     prediction_id: Mapped['PredictionSQL'] = mapped_column(db.String(120), ForeignKey("predictions.id"), nullable=False)
+    prediction: Mapped["PredictionSQL"] = relationship("PredictionSQL", back_populates="shaps")
+
+    @classmethod
+    def from_shap(cls, shap: Shap, prediction_id: str, feature_names: Optional[List[str]] = None) -> 'ShapSQL':
+        return cls(**cls.to_row(shap, prediction_id, feature_names))
+
+    @staticmethod
+    def to_row(shap: Shap, prediction_id: str, feature_names: Optional[List[str]] = None) -> dict:
+        """Column values of one label's SHAP values, as used for bulk inserts"""
+        # SHAP values are keyed by the same features as the inputs, so they share the model's header
+        blob = compact_encoding.encode_mapping(shap.shap_values, feature_names) if compact_encoding.enabled else None
+
+        return dict(
+            id=shap.id
+            , type=str(getattr(shap.label, 'value', shap.label))
+            , shap_values=json.dumps(shap.shap_values) if blob is None else None
+            , shap_values_blob=blob
+            , prediction_id=prediction_id
+        )
+
+    def to_shap(self, feature_names: Optional[List[str]] = None) -> Shap:
+        if self.shap_values_blob is not None:
+            shap_values = compact_encoding.decode_mapping(self.shap_values_blob, feature_names)
+        else:
+            shap_values = json.loads(self.shap_values)
+
+        return Shap(
+            id=self.id,
+            label=None if self.type == 'None' else self.type,
+            shap_values=shap_values
+        )
     
\ No newline at end of file
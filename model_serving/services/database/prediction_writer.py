@@ -0,0 +1,167 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from model_serving.monitoring import PREDICTION_WRITES_DROPPED
+from model_serving.services.database.database_client import db
+from model_serving.services.database.prediction import PredictionSQL, ShapSQL
+
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWriter:
+    """
+    Write-behind persistence for predictions. Requests put their rows on a bounded queue and return; a background
+    thread inserts whatever has accumulated with one executemany and one commit, once batch_size rows are waiting
+    or flush_interval_ms after the first of them arrived. A full queue blocks the caller (backpressure) instead of
+    growing without bound, and the queue is drained before the process exits. A failed batch is retried with
+    backoff, then written row by row so one bad row doesn't take the others with it; only the rows that still fail
+    are dropped, counted in prediction_writes_dropped.
+    """
+
+    enabled = False
+    max_queue_size = 10000
+    batch_size = 500
+    flush_interval_ms = 50
+    max_retries = 3
+    retry_backoff_ms = 100
+
+    def __init__(self):
+        self._app = None
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config.get('WRITE_BEHIND', {})
+
+        self.enabled = config.get('enabled', False)
+        self.max_queue_size = config.get('max_queue_size', self.max_queue_size)
+        self.batch_size = config.get('batch_size', self.batch_size)
+        self.flush_interval_ms = config.get('flush_interval_ms', self.flush_interval_ms)
+        self.max_retries = config.get('max_retries', self.max_retries)
+        self.retry_backoff_ms = config.get('retry_backoff_ms', self.retry_backoff_ms)
+        self._app = app
+        self._queue = None
+
+        if self.enabled:
+            atexit.register(self.flush)
+
+    def enqueue(self, rows: List[dict], on_written: Optional[Callable[[], None]] = None, shap_rows: List[dict] = ()):
+        """Queue PredictionSQL rows and their ShapSQL rows for insertion, on_written is called once all are committed"""
+        items = [(PredictionSQL, row) for row in rows] + [(ShapSQL, row) for row in shap_rows]
+        if not items:
+            # Nothing to write, so nothing to wait for
+            if on_written is not None:
+                on_written()
+            return
+
+        requests = self._get_queue()
+        for table, row in items[:-1]:
+            requests.put((table, row, None))
+        requests.put((*items[-1], on_written))
+
+    def flush(self):
+        """Block until every queued row has been committed"""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def _get_queue(self) -> queue.Queue:
+        # The writer is started on first use, and again in each pre-forked worker process since threads don't
+        # survive a fork
+        if self._queue is None or self._pid != os.getpid():
+            with self._lock:
+                if self._queue is None or self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self.max_queue_size)
+                    self._pid = os.getpid()
+
+                    threading.Thread(
+                        target=self._run, args=(self._queue,), name='prediction-writer', daemon=True
+                    ).start()
+
+        return self._queue
+
+    def _run(self, requests: queue.Queue):
+        while True:
+            batch = [requests.get()]
+            deadline = time.monotonic() + self.flush_interval_ms / 1000
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(requests.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            written = self._write_batch([(table, row) for table, row, _ in batch])
+
+            for (_, _, on_written), is_written in zip(batch, written):
+                try:
+                    if on_written is not None and is_written:
+                        on_written()
+                except Exception as e:
+                    logger.error(f'Prediction write callback failed: {str(e)}')
+                finally:
+                    requests.task_done()
+
+    def _write_batch(self, items: List[tuple]) -> List[bool]:
+        """Write items, retrying and then falling back to one row at a time; returns whether each was committed"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._write(items)
+                return [True] * len(items)
+            except Exception as e:
+                logger.warning(f'Failed to write {len(items)} rows (attempt {attempt + 1}): {str(e)}')
+
+            if attempt < self.max_retries:
+                time.sleep(self.retry_backoff_ms / 1000 * 2 ** attempt)
+
+        written = []
+        for idx, item in enumerate(items):
+            try:
+                self._write([item])
+                written.append(True)
+            except OperationalError as e:
+                # The database itself is unavailable, the remaining rows would fail the same way
+                logger.error(f'Database unavailable, dropping {len(items) - idx} rows: {str(e)}')
+                written += [False] * (len(items) - idx)
+                break
+            except Exception as e:
+                logger.error(f"Failed to write {item[0].__tablename__} row {item[1].get('id')}: {str(e)}")
+                written.append(False)
+
+        dropped = written.count(False)
+        if dropped:
+            PREDICTION_WRITES_DROPPED.inc(dropped)
+            logger.error(f'Dropped {dropped} of {len(items)} queued rows')
+
+        return written
+
+    def _write(self, items: List[tuple]):
+        # One executemany per table, predictions before the SHAP rows that reference them, in a single transaction
+        rows = {PredictionSQL: [], ShapSQL: []}
+        for table, row in items:
+            rows[table].append(row)
+
+        with self._app.app_context():
+            try:
+                for table, table_rows in rows.items():
+                    if table_rows:
+                        db.session.execute(insert(table), table_rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+
+prediction_writer: PredictionWriter = PredictionWriter()
@@ -0,0 +1,134 @@
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import List
+
+from model_serving.models.prediction import Model, Prediction
+from model_serving.services.database.database_client import db
+from model_serving.services.database.prediction import PredictionSQL, ShapSQL
+from model_serving.services.database.encoding import compact_encoding
+from model_serving.services.explainer_service import explainer_service
+from model_serving.services.umap_service import umap_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentService:
+    """
+    Computes UMAP embeddings and SHAP explanations off the request path. The controller stores the prediction with
+    its label and probability, queues it here and returns; worker threads fill in the embeddings and explanations
+    on the stored rows, where GET /prediction/<id> picks them up.
+    """
+
+    enabled = False
+    workers = 1
+    max_queue_size = 10000
+
+    def __init__(self):
+        self._app = None
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config.get('ASYNC_ENRICHMENT', {})
+
+        self.enabled = config.get('enabled', False)
+        self.workers = config.get('workers', self.workers)
+        self.max_queue_size = config.get('max_queue_size', self.max_queue_size)
+        self._app = app
+        self._queue = None
+
+    def submit(self, model: Model, predictions: List[Prediction]):
+        """Queue stored predictions for enrichment. When the workers can't keep up they are enriched inline instead."""
+        try:
+            self._get_queue().put_nowait((model, predictions))
+        except queue.Full:
+            logger.warning(f'Enrichment queue is full, enriching {len(predictions)} predictions inline')
+            self.enrich(model, predictions)
+            self.save(predictions)
+
+    def join(self):
+        """Block until everything queued so far has been written"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def _get_queue(self) -> queue.Queue:
+        # Workers are started on first use, and again in each pre-forked worker process since threads don't
+        # survive a fork
+        if self._queue is None or self._pid != os.getpid():
+            with self._lock:
+                if self._queue is None or self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self.max_queue_size)
+                    self._pid = os.getpid()
+
+                    for number in range(self.workers):
+                        threading.Thread(
+                            target=self._run, args=(self._queue,), name=f'enrichment-{number}', daemon=True
+                        ).start()
+
+        return self._queue
+
+    def _run(self, requests: queue.Queue):
+        while True:
+            model, predictions = requests.get()
+
+            try:
+                with self._app.app_context():
+                    self.enrich(model, predictions)
+                    self.save(predictions)
+            except Exception as e:
+                logger.error(f'Failed to enrich {len(predictions)} predictions: {str(e)}')
+            finally:
+                requests.task_done()
+
+    @staticmethod
+    def enrich(model: Model, predictions: List[Prediction]) -> List[Prediction]:
+        if len(predictions) == 1:
+            embeddings = [umap_service.create_embedding(model, predictions[0])]
+        else:
+            embeddings = umap_service.create_embeddings(model, predictions)
+
+        if embeddings:
+            for prediction, embedding in zip(predictions, embeddings):
+                prediction.embeddings = embedding
+
+        if model._explainer is not None:
+            explainer_service.create_explanations(model, predictions)
+
+        return predictions
+
+    @staticmethod
+    def save(predictions: List[Prediction]):
+        """Write embeddings and explanations onto the already stored prediction rows"""
+        try:
+            rows = {
+                row.id: row for row in
+                db.session.query(PredictionSQL).filter(PredictionSQL.id.in_([p.id for p in predictions]))
+            }
+
+            for prediction in predictions:
+                row = rows.get(prediction.id)
+                if row is None:
+                    logger.warning(f'Prediction {prediction.id} was not stored, skipping enrichment')
+                    continue
+
+                row.set_embeddings(prediction.embeddings)
+                row.updated = datetime.now()
+
+                feature_names = row.model.get_feature_names() if compact_encoding.enabled and row.model else None
+                db.session.add_all([
+                    ShapSQL.from_shap(shap, prediction.id, feature_names) for shap in prediction.shap_values
+                ])
+
+            db.session.commit()
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+enrichment_service: EnrichmentService = EnrichmentService()
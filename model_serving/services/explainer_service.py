@@ -1,8 +1,12 @@
 import logging
+from typing import List
+
+import numpy as np
 
 from model_serving.models.prediction import Model, Prediction
 from model_serving.monitoring import FUNCTION_DURATION
 from model_serving.models.prediction import Shap
+from model_serving.services.cache_service import cache_service
 
 
 logger = logging.getLogger(__name__)
@@ -14,54 +18,101 @@ class ExplainerService:
     @FUNCTION_DURATION.labels('create_explanation').time()
     def create_explanation(model: Model, prediction: Prediction) -> Prediction:
         try:
-            # Get SHAP values from model explainer
-            shap_values_ = model._explainer.predict(prediction.inputs) or []
-            
-            # Get feature names from the prediction inputs
-            feature_names = list(prediction.inputs.keys())
-            
-            shap_values = []
-            if model.labels:
-                for this_label in model.labels:
-                    idx = model.labels.index(this_label)
-                    # Create a dictionary mapping feature names to SHAP values
-                    shap_dict = {}
-                    
-                    # Extract the SHAP values for this label
-                    label_shap_values = shap_values_[:,:,idx]
-                    
-                    # Map each feature name to its SHAP value
-                    for i, feature in enumerate(feature_names):
-                        if i < label_shap_values.shape[1]:  # Ensure we don't go out of bounds
-                            shap_dict[feature] = float(label_shap_values[0, i])
-                    
-                    shap_values.append(
-                        Shap(
-                            label=this_label.value,
-                            shap_values=shap_dict
-                        )
-                    )
-            else:
-                # For regression or single-output models
-                shap_dict = {}
-                shap_array = shap_values_[:,:,0]  # Use the first (and likely only) output
-                
-                # Map each feature name to its SHAP value
-                for i, feature in enumerate(feature_names):
-                    if i < shap_array.shape[1]:  # Ensure we don't go out of bounds
-                        shap_dict[feature] = float(shap_array[0, i])
-                
-                shap_values.append(Shap(
-                    label=None,
-                    shap_values=shap_dict
-                ))
-            
-            prediction.shap_values = shap_values
+            ExplainerService._explain(model, [prediction])
             return prediction
-            
+
         except Exception as e:
             # Log the error but don't fail the prediction
             logger.error(f"Error calculating SHAP values: {str(e)}")
             return prediction
 
-explainer_service = ExplainerService()
\ No newline at end of file
+    @staticmethod
+    @FUNCTION_DURATION.labels('create_batch_explanation').time()
+    def create_explanations(model: Model, predictions: List[Prediction]) -> List[Prediction]:
+        """Explain a whole batch with a single explainer call"""
+        try:
+            ExplainerService._explain(model, predictions)
+            return predictions
+
+        except Exception as e:
+            # Log the error but don't fail the predictions
+            logger.error(f"Error calculating SHAP values: {str(e)}")
+            return predictions
+
+    @staticmethod
+    def _explain(model: Model, predictions: List[Prediction]):
+        cached = cache_service.get_many(cache_service.explanations, model, predictions)
+        misses = []
+
+        for prediction, explanation in zip(predictions, cached):
+            if explanation is None:
+                misses.append(prediction)
+            else:
+                # Fresh Shap objects, each one is stored under its own id
+                prediction.shap_values = [Shap(label=label, shap_values=dict(values)) for label, values in explanation]
+
+        if misses:
+            ExplainerService._explain_uncached(model, misses)
+            cache_service.set_many(cache_service.explanations, model, misses, [
+                tuple((shap.label, shap.shap_values) for shap in prediction.shap_values) or None
+                for prediction in misses
+            ])
+
+    @staticmethod
+    def _explain_uncached(model: Model, predictions: List[Prediction]):
+        if isinstance(model.feature_names, list):
+            feature_names = model.feature_names
+            inputs = Prediction.get_numpy_array_of_batch(predictions, feature_names)
+        else:
+            feature_names = list(predictions[0].inputs.keys())
+            inputs = Prediction.get_pandas_frame_of_batch(predictions)
+
+        shap_values_ = ExplainerService._get_shap_values(model._explainer, inputs)
+        if shap_values_ is None:
+            return
+
+        # Explainers may return fewer columns than there are features, never map past the end
+        feature_names = feature_names[:shap_values_.shape[1]]
+        labels = [getattr(label, 'value', label) for label in model.labels] if model.labels else [None]
+
+        per_label_rows = [
+            # One tolist per label converts the whole (rows, features) matrix to Python floats at C speed
+            shap_values_[:, :len(feature_names), idx].tolist() for idx in range(len(labels))
+        ]
+
+        for row, prediction in enumerate(predictions):
+            prediction.shap_values = [
+                Shap(label=label, shap_values=dict(zip(feature_names, rows[row])))
+                for label, rows in zip(labels, per_label_rows)
+            ]
+
+    @staticmethod
+    def _get_shap_values(explainer, inputs):
+        """
+        SHAP values as a (rows, features, outputs) array, or None if the explainer returned nothing. Logged pyfunc
+        explainers are evaluated through predict, TreeSHAP-style explainers natively through shap_values.
+        """
+        if hasattr(explainer, 'predict'):
+            shap_values_ = explainer.predict(inputs)
+        else:
+            shap_values_ = explainer.shap_values(inputs)
+
+        if shap_values_ is None or len(shap_values_) == 0:
+            return None
+
+        # Older shap releases return one (rows, features) matrix per class
+        if isinstance(shap_values_, list) and isinstance(shap_values_[0], np.ndarray) and shap_values_[0].ndim == 2:
+            shap_values_ = np.stack(shap_values_, axis=-1)
+
+        shap_values_ = np.asarray(shap_values_, dtype=np.float64)
+
+        if shap_values_.ndim == 2:
+            shap_values_ = shap_values_[:, :, np.newaxis]
+
+        if shap_values_.ndim != 3:
+            raise ValueError(f"Unexpected SHAP values shape {shap_values_.shape}")
+
+        return shap_values_
+
+
+explainer_service = ExplainerService()
@@ -1,5 +1,8 @@
 import logging
-from typing import Optional, Dict, Any
+import threading
+import warnings
+from contextlib import contextmanager, nullcontext
+from typing import Optional, Dict, Any, List
 import numpy as np
 from model_serving.models.prediction import Model, Prediction
 from model_serving.monitoring import FUNCTION_DURATION
@@ -8,6 +11,37 @@ from model_serving.domain.common_enums import ModelType
 
 logger = logging.getLogger(__name__)
 
+# Flavors whose models accept a plain ndarray in place of a DataFrame
+NDARRAY_FLAVORS = ('sklearn', 'xgboost')
+
+_unnamed_inputs_lock = threading.Lock()
+_unnamed_inputs_calls = 0
+_unnamed_inputs_filter = None
+
+
+@contextmanager
+def _allow_unnamed_inputs():
+    """
+    Ignore sklearn's missing feature names warning for the duration of a model call on the ndarray path, whose inputs
+    are already in the fitted column order. warnings.catch_warnings swaps the global filter list and isn't safe across
+    request threads, so the filter is shared instead: added by the first call in progress, removed by the last.
+    """
+    global _unnamed_inputs_calls, _unnamed_inputs_filter
+
+    with _unnamed_inputs_lock:
+        if _unnamed_inputs_calls == 0:
+            warnings.filterwarnings('ignore', message='X does not have valid feature names', category=UserWarning)
+            _unnamed_inputs_filter = warnings.filters[0]
+        _unnamed_inputs_calls += 1
+
+    try:
+        yield
+    finally:
+        with _unnamed_inputs_lock:
+            _unnamed_inputs_calls -= 1
+            if _unnamed_inputs_calls == 0 and _unnamed_inputs_filter in warnings.filters:
+                warnings.filters.remove(_unnamed_inputs_filter)
+
 
 class InferenceService:
 
@@ -15,29 +49,71 @@ class InferenceService:
     @FUNCTION_DURATION.labels('create_prediction').time()
     def create_inference(model: Any, prediction: Prediction) -> Prediction:
         """Create inference based on model type"""
-        if model.model_type == ModelType.CLASSIFICATION.value:
-            return InferenceService._create_classification_inference(model, prediction)
+        with InferenceService._allow_unnamed_inputs(model):
+            if model.model_type == ModelType.CLASSIFICATION.value:
+                return InferenceService._create_classification_inference(model, prediction)
+            else:
+                return InferenceService._create_regression_inference(model, prediction)
+
+    @staticmethod
+    @FUNCTION_DURATION.labels('create_batch_prediction').time()
+    def create_batch_inference(model: Any, predictions: List[Prediction]) -> List[Prediction]:
+        """Create inferences for a batch of predictions with a single model call"""
+        if not predictions:
+            return predictions
+
+        if InferenceService._accepts_ndarray(model):
+            inputs = Prediction.get_numpy_array_of_batch(predictions, model.feature_names)
         else:
-            return InferenceService._create_regression_inference(model, prediction)
+            inputs = Prediction.get_pandas_frame_of_batch(predictions)
+
+        with InferenceService._allow_unnamed_inputs(model):
+            if model.model_type == ModelType.CLASSIFICATION.value:
+                return InferenceService._create_batch_classification_inference(model, predictions, inputs)
+            else:
+                return InferenceService._create_batch_regression_inference(model, predictions, inputs)
+
+    @staticmethod
+    def _accepts_ndarray(model: Any) -> bool:
+        return model.mlflow_flavor in NDARRAY_FLAVORS and isinstance(model.feature_names, list)
+
+    @staticmethod
+    def _allow_unnamed_inputs(model: Any):
+        if InferenceService._accepts_ndarray(model):
+            return _allow_unnamed_inputs()
+
+        return nullcontext()
+
+    @staticmethod
+    def _get_model_inputs(model: Any, prediction: Prediction):
+        if InferenceService._accepts_ndarray(model):
+            return prediction.get_numpy_array_of_inputs(model.feature_names)
+
+        return prediction.get_pandas_frame_of_inputs()
+
+    @staticmethod
+    def _apply_threshold(model: Any, probability: float):
+        if model.threshold['value'] > probability:
+            return model.threshold['above']
+        elif model.threshold['value'] == probability:
+            return model.threshold['equal']
+        else:
+            return model.threshold['below']
 
     @staticmethod
     def _create_classification_inference(model: Any, prediction: Prediction) -> Prediction:
         if hasattr(model.model, 'predict_proba'):
             # This will change in the future
-            probability = model.model.predict_proba(prediction.get_pandas_frame_of_inputs())[:,1][0]
+            probability = model.model.predict_proba(InferenceService._get_model_inputs(model, prediction))[:,1][0]
 
-            if model.threshold['value'] > probability:
-                label = model.threshold['above']
-            elif model.threshold['value'] == probability:
-                label = model.threshold['equal']
-            else:
-                label = model.threshold['below']
+            label = InferenceService._apply_threshold(model, probability)
 
         else:
             label = model._model.predict(prediction.inputs)
 
         prediction.probability = probability
         prediction.threshold = model.threshold['value']
+        prediction.value = label
         prediction.label = label
 
         return prediction
@@ -45,11 +121,39 @@ class InferenceService:
     @staticmethod
     def _create_regression_inference(model: Any, prediction: Prediction) -> Prediction:
         # New regression logic
-        result = model.model.predict(prediction.inputs)
+        result = model.model.predict(InferenceService._get_model_inputs(model, prediction))
         prediction.value = float(result[0])  # Direct numeric prediction
         prediction.probability = None  # Regression doesn't use probability
         return prediction
 
+    @staticmethod
+    def _create_batch_classification_inference(model: Any, predictions: List[Prediction], inputs) -> List[Prediction]:
+        if hasattr(model.model, 'predict_proba'):
+            probabilities = model.model.predict_proba(inputs)[:, 1]
+
+            for prediction, probability in zip(predictions, probabilities.tolist()):
+                prediction.value = InferenceService._apply_threshold(model, probability)
+                prediction.probability = probability
+                prediction.threshold = model.threshold['value']
+        else:
+            labels = model.model.predict(inputs)
+
+            for prediction, label in zip(predictions, labels):
+                prediction.value = label
+                prediction.probability = None
+
+        return predictions
+
+    @staticmethod
+    def _create_batch_regression_inference(model: Any, predictions: List[Prediction], inputs) -> List[Prediction]:
+        results = model.model.predict(inputs)
+
+        for prediction, result in zip(predictions, np.asarray(results).tolist()):
+            prediction.value = float(result)
+            prediction.probability = None
+
+        return predictions
+
     def _prepare_inputs(self, inputs: Dict) -> np.ndarray:
         """Prepare inputs for model prediction"""
         # Convert inputs to the format expected by the model
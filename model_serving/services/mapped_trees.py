@@ -0,0 +1,157 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+class MappedTrees:
+    """
+    A fitted sklearn decision tree, random forest or extra trees model served from its node arrays, saved once with
+    np.save and loaded memory-mapped read-only. The nodes are then paged in from the OS cache and shared by every
+    worker process, where unpickling the estimator would copy them into each heap: sklearn's Tree keeps its nodes in
+    buffers of its own.
+
+    predict and predict_proba walk all the trees at once, one level per step, and give the same results as the
+    estimator. estimators_[i].tree_ exposes each tree's arrays under the names sklearn's Tree uses, so TreeExplainer
+    builds from a mapped model as it does from the original.
+    """
+
+    ARRAYS = ('children_left', 'children_right', 'feature', 'threshold', 'value', 'weighted_n_node_samples',
+              'missing_go_to_left')
+
+    def __init__(self, arrays: dict, metadata: dict):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+        self.offsets = metadata['offsets']
+        self.max_depth = metadata['max_depth']
+        self.n_features_in_ = metadata['n_features_in_']
+        self.feature_names_in_ = metadata['feature_names_in_']
+        if metadata['classes_'] is not None:
+            self.classes_ = metadata['classes_']
+
+        self.estimators_ = [
+            _MappedEstimator(_MappedTree(self, start, stop)) for start, stop in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+
+    @staticmethod
+    def supports(model) -> bool:
+        """Single output trees, and forests whose prediction is the mean of their trees'"""
+        from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+        from sklearn.tree import BaseDecisionTree
+
+        forests = (RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor)
+        return isinstance(model, (BaseDecisionTree,) + forests) and getattr(model, 'n_outputs_', None) == 1
+
+    @classmethod
+    def save(cls, model, path: str):
+        """Write the model's node arrays to the directory path, atomically"""
+        estimators = getattr(model, 'estimators_', [model])
+        trees = [estimator.tree_ for estimator in estimators]
+        is_classifier = hasattr(model, 'classes_')
+
+        arrays = {name: [] for name in cls.ARRAYS}
+        for tree in trees:
+            value = np.asarray(tree.value)[:, 0, :]
+            if is_classifier:
+                # Older sklearn stores class counts, newer class fractions; predict_proba wants fractions
+                totals = value.sum(axis=1, keepdims=True)
+                value = value / np.where(totals == 0, 1.0, totals)
+
+            arrays['children_left'].append(np.asarray(tree.children_left))
+            arrays['children_right'].append(np.asarray(tree.children_right))
+            arrays['feature'].append(np.asarray(tree.feature))
+            arrays['threshold'].append(np.asarray(tree.threshold))
+            arrays['value'].append(value[:, np.newaxis, :])
+            arrays['weighted_n_node_samples'].append(np.asarray(tree.weighted_n_node_samples, dtype=np.float64))
+            arrays['missing_go_to_left'].append(
+                np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool)
+            )
+
+        metadata = {
+            'offsets': np.cumsum([0] + [tree.node_count for tree in trees]),
+            'max_depth': max(tree.max_depth for tree in trees),
+            'n_features_in_': model.n_features_in_,
+            'feature_names_in_': getattr(model, 'feature_names_in_', None),
+            'classes_': getattr(model, 'classes_', None)
+        }
+
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        os.makedirs(temp_path, exist_ok=True)
+
+        for name, parts in arrays.items():
+            np.save(os.path.join(temp_path, f'{name}.npy'), np.concatenate(parts))
+        joblib.dump(metadata, os.path.join(temp_path, 'metadata.joblib'))
+
+        try:
+            os.rename(temp_path, path)
+        except OSError:
+            # Another process converted the same version first
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> 'MappedTrees':
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in cls.ARRAYS}
+        return cls(arrays, joblib.load(os.path.join(path, 'metadata.joblib')))
+
+    def predict_proba(self, X) -> np.ndarray:
+        # Each tree's class fractions at the leaf the row reaches, averaged over the trees
+        return self.value[self.apply(X), 0, :].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        averaged = self.predict_proba(X)
+
+        if hasattr(self, 'classes_'):
+            return self.classes_.take(np.argmax(averaged, axis=1))
+
+        return averaged[:, 0]
+
+    def apply(self, X) -> np.ndarray:
+        """(rows, trees) global index of the leaf each row reaches in each tree"""
+        X = self._validate(X)
+        tree_offsets = self.offsets[:-1]
+
+        nodes = np.repeat(tree_offsets[np.newaxis, :], len(X), axis=0)
+        rows = np.arange(len(X))[:, np.newaxis]
+
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left != -1
+            if not internal.any():
+                break
+
+            # Leaves have no feature (-2), they just keep their node below
+            values = X[rows, np.maximum(self.feature[nodes], 0)]
+            goes_left = (values <= self.threshold[nodes]) | (np.isnan(values) & self.missing_go_to_left[nodes])
+
+            children = np.where(goes_left, left, self.children_right[nodes]) + tree_offsets
+            nodes = np.where(internal, children, nodes)
+
+        return nodes
+
+    def _validate(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+
+        # sklearn compares float32 inputs against its float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        return X
+
+
+class _MappedTree:
+    """One tree's slice of the mapped arrays, with sklearn Tree's attribute names"""
+
+    def __init__(self, trees: MappedTrees, start: int, stop: int):
+        self.node_count = stop - start
+        for name in MappedTrees.ARRAYS:
+            setattr(self, name, getattr(trees, name)[start:stop])
+
+
+class _MappedEstimator:
+    def __init__(self, tree: _MappedTree):
+        self.tree_ = tree
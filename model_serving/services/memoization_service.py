@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from model_serving.models.prediction import Model, Prediction
+from model_serving.monitoring import PREDICTION_CACHE_HITS, PREDICTION_CACHE_MISSES, PREDICTION_CACHE_EVICTIONS
+from model_serving.services.cache_service import ResultCache
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+logger = logging.getLogger(__name__)
+
+LABEL_VALUES = {label.value for label in Labels}
+
+
+class MemoryBackend:
+    """In-process LRU, private to each worker process"""
+
+    name = 'memory'
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: Optional[float] = None, **kwargs):
+        self._cache = ResultCache(max_size, ttl_seconds)
+
+    def get(self, key) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def set(self, key, value: dict) -> int:
+        return self._cache.set(key, value)
+
+    def invalidate(self, model_name: str, model_version: str):
+        self._cache.invalidate(model_name, model_version)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class SQLiteBackend:
+    """
+    LRU in a SQLite file shared by every worker process on the host. Each thread opens its own connection; WAL
+    mode lets readers proceed while another process writes.
+    """
+
+    name = 'sqlite'
+
+    # Trimming back to max_size is a full index scan, so it only runs every this many writes
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, path: str, max_size: int = 10000, ttl_seconds: Optional[float] = None, **kwargs):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS predictions ('
+                'key TEXT PRIMARY KEY, model_name TEXT, model_version TEXT, value TEXT, expires REAL, accessed REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_predictions_accessed ON predictions (accessed)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections can't cross threads, nor survive a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection, self._local.pid = connection, os.getpid()
+
+        return connection
+
+    @staticmethod
+    def _get_key(key) -> str:
+        return '/'.join(key)
+
+    def get(self, key) -> Optional[dict]:
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT value, expires FROM predictions WHERE key = ?', (self._get_key(key),)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        value, expires = row
+        now = time.time()
+        if expires is not None and expires < now:
+            connection.execute('DELETE FROM predictions WHERE key = ?', (self._get_key(key),))
+            return None
+
+        connection.execute('UPDATE predictions SET accessed = ? WHERE key = ?', (now, self._get_key(key)))
+        return json.loads(value)
+
+    def set(self, key, value: dict) -> int:
+        now = time.time()
+        connection = self._connect()
+        connection.execute(
+            'INSERT OR REPLACE INTO predictions (key, model_name, model_version, value, expires, accessed) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (self._get_key(key), key[0], key[1], json.dumps(value), now + self.ttl_seconds if self.ttl_seconds else None, now)
+        )
+
+        self._writes += 1
+        if self._writes % self.EVICTION_INTERVAL:
+            return 0
+
+        return self._evict(connection)
+
+    def _evict(self, connection) -> int:
+        expired = connection.execute('DELETE FROM predictions WHERE expires < ?', (time.time(),)).rowcount
+        evicted = connection.execute(
+            'DELETE FROM predictions WHERE key IN '
+            '(SELECT key FROM predictions ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (self.max_size,)
+        ).rowcount
+
+        return expired + evicted
+
+    def invalidate(self, model_name: str, model_version: str):
+        self._connect().execute(
+            'DELETE FROM predictions WHERE model_name = ? AND model_version = ?', (model_name, model_version)
+        )
+
+    def clear(self):
+        self._connect().execute('DELETE FROM predictions')
+
+
+BACKENDS = {
+    MemoryBackend.name: MemoryBackend,
+    SQLiteBackend.name: SQLiteBackend
+}
+
+
+class MemoizationService:
+    """
+    Serves repeated requests (same model version and canonical inputs) from a cache of earlier inference results:
+    label, probability and threshold. Models are deterministic, so the stored result is what the model would return
+    again. Embeddings aren't part of it; they are added after the lookup either way, from the RESULT_CACHE when
+    enabled. A version's entries are dropped whenever MLFlowGateway (re)loads it, and at start-up for every version
+    already loaded, since the SQLite file outlives restarts that may change a version's threshold or labels.
+    """
+
+    enabled = False
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app, gateway):
+        config = dict(app.config.get('PREDICTION_CACHE', {}))
+
+        self.enabled = config.pop('enabled', False)
+        if not self.enabled:
+            self.backend = None
+            return
+
+        backend = config.pop('backend', MemoryBackend.name)
+        if backend not in BACKENDS:
+            raise ValueError(f'Unsupported prediction cache backend: {backend}')
+
+        self.backend = BACKENDS[backend](**config)
+        gateway.add_load_listener(self.invalidate)
+
+        # The gateway loaded these before the listener was registered
+        for model_name, model_version in gateway.get_loaded_versions():
+            self.backend.invalidate(model_name, str(model_version))
+
+    def invalidate(self, model: Model):
+        self.backend.invalidate(model.model_name, str(model.model_version))
+
+    @staticmethod
+    def _get_key(model: Model, prediction: Prediction):
+        return model.model_name, str(model.model_version), prediction.input_key
+
+    def get(self, model: Model, prediction: Prediction) -> bool:
+        """Fill in the prediction from the cache, False on a miss"""
+        try:
+            result = self.backend.get(self._get_key(model, prediction))
+        except Exception as e:
+            logger.error(f'Prediction cache lookup failed: {str(e)}')
+            result = None
+
+        if result is None:
+            PREDICTION_CACHE_MISSES.inc()
+            return False
+
+        PREDICTION_CACHE_HITS.inc()
+
+        value = result['value']
+        if model.model_type == ModelType.CLASSIFICATION.value and value in LABEL_VALUES:
+            value = Labels(value)
+
+        prediction.value = value
+        prediction.probability = result['probability']
+        prediction.threshold = result['threshold']
+
+        return True
+
+    def set(self, model: Model, prediction: Prediction):
+        result = {
+            'value': getattr(prediction.value, 'value', prediction.value),
+            'probability': prediction.probability,
+            'threshold': prediction.threshold
+        }
+
+        try:
+            evicted = self.backend.set(self._get_key(model, prediction), result)
+            if evicted:
+                PREDICTION_CACHE_EVICTIONS.inc(evicted)
+        except Exception as e:
+            # The cache is an optimisation, never fail the prediction over it
+            logger.error(f'Prediction cache write failed: {str(e)}')
+
+
+memoization_service: MemoizationService = MemoizationService()
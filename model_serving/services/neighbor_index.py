@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class NeighborIndex:
+    """
+    Approximate nearest-neighbor index over a fitted UMAP reducer's training data, built as a forest of random
+    projection trees in plain NumPy. New points are embedded by interpolating the training embeddings of their
+    nearest neighbors, the same initialisation umap-learn's transform starts its optimisation from, without running
+    the optimisation itself.
+    """
+
+    def __init__(self, data: np.ndarray, embedding: np.ndarray, n_trees: int = 8, leaf_size: int = 32,
+                 n_neighbors: int = 15, random_state: int = 42):
+        self.data = np.ascontiguousarray(data, dtype=np.float64)
+        self.embedding = np.ascontiguousarray(embedding, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.n_neighbors = min(n_neighbors, len(self.data))
+
+        random = np.random.RandomState(random_state)
+        self.trees = [self._build_tree(random) for _ in range(n_trees)]
+
+    @classmethod
+    def from_reducer(cls, reducer, **params) -> 'NeighborIndex':
+        return cls(reducer._raw_data, reducer.embedding_, **params)
+
+    @staticmethod
+    def supports(reducer) -> bool:
+        """Only fitted reducers over dense data with a euclidean metric can be served from the index"""
+        return (
+            isinstance(getattr(reducer, '_raw_data', None), np.ndarray)
+            and isinstance(getattr(reducer, 'embedding_', None), np.ndarray)
+            and getattr(reducer, 'metric', 'euclidean') == 'euclidean'
+        )
+
+    def _build_tree(self, random):
+        # Flat arrays: internal nodes hold a hyperplane, leaves hold a slice of leaf_indices
+        hyperplanes, offsets, children, leaves = [], [], [], []
+
+        def split(indices):
+            node = len(children)
+            hyperplanes.append(None)
+            offsets.append(0.0)
+            children.append((-1, -1))
+
+            if len(indices) <= self.leaf_size:
+                children[node] = (-1, len(leaves))
+                leaves.append(indices)
+                return node
+
+            left_point, right_point = self.data[random.choice(indices, 2, replace=False)]
+            normal = left_point - right_point
+            offset = normal @ (left_point + right_point) / 2
+            side = self.data[indices] @ normal > offset
+
+            # Duplicate points can't be separated by a hyperplane, fall back to a random split
+            if side.all() or not side.any():
+                side = random.rand(len(indices)) > 0.5
+
+            hyperplanes[node], offsets[node] = normal, offset
+            left = split(indices[~side])
+            right = split(indices[side])
+            children[node] = (left, right)
+
+            return node
+
+        split(np.arange(len(self.data)))
+
+        dimensions = self.data.shape[1]
+        hyperplanes = np.array([np.zeros(dimensions) if plane is None else plane for plane in hyperplanes])
+
+        return hyperplanes, np.array(offsets), np.array(children), leaves
+
+    @staticmethod
+    def _search_tree(tree, points: np.ndarray) -> np.ndarray:
+        """Leaf number each point falls into, all points descending the tree together"""
+        hyperplanes, offsets, children, _ = tree
+        nodes = np.zeros(len(points), dtype=np.int64)
+        internal = children[nodes, 0] >= 0
+
+        while internal.any():
+            current = nodes[internal]
+            side = np.einsum('ij,ij->i', points[internal], hyperplanes[current]) > offsets[current]
+            nodes[internal] = children[current, side.astype(np.int64)]
+            internal = children[nodes, 0] >= 0
+
+        return children[nodes, 1]
+
+    def query(self, points: np.ndarray):
+        """Approximate n_neighbors nearest training points, as (indices, distances) arrays sorted by distance"""
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        leaves_per_tree = [(tree[3], self._search_tree(tree, points)) for tree in self.trees]
+
+        indices = np.empty((len(points), self.n_neighbors), dtype=np.int64)
+        distances = np.empty((len(points), self.n_neighbors))
+
+        for row, point in enumerate(points):
+            candidates = np.unique(np.concatenate([leaves[leaf_ids[row]] for leaves, leaf_ids in leaves_per_tree]))
+
+            # Leaves can hold fewer than n_neighbors points when the data is tiny
+            if len(candidates) < self.n_neighbors:
+                candidates = np.arange(len(self.data))
+
+            candidate_distances = np.sqrt(((self.data[candidates] - point) ** 2).sum(axis=1))
+            nearest = np.argpartition(candidate_distances, self.n_neighbors - 1)[:self.n_neighbors]
+            nearest = nearest[np.argsort(candidate_distances[nearest])]
+
+            indices[row] = candidates[nearest]
+            distances[row] = candidate_distances[nearest]
+
+        return indices, distances
+
+    def transform(self, points: np.ndarray) -> np.ndarray:
+        """Embed points as a weighted average of their neighbors' training embeddings"""
+        indices, distances = self.query(points)
+
+        # UMAP-style membership weights: the nearest neighbor gets weight 1, the rest decay with their distance
+        # beyond it relative to the average spread of the neighborhood
+        relative = distances - distances[:, :1]
+        sigma = np.maximum(relative.mean(axis=1, keepdims=True), 1e-12)
+        weights = np.exp(-relative / sigma)
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        return np.einsum('ij,ijk->ik', weights, self.embedding[indices])
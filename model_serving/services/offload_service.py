@@ -0,0 +1,67 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+
+logger = logging.getLogger(__name__)
+
+INFERENCE = 'inference'
+ENRICHMENT = 'enrichment'
+
+
+class OffloadService:
+    """
+    Runs the CPU-bound model calls on bounded thread pools of their own instead of the thread serving the request.
+    Plain inference and the slower SHAP/UMAP enrichment get separate pools, so a backlog of explanations only queues
+    behind itself and cheap predictions keep being scored. Off unless create_asgi_app initializes it: under the
+    WSGI servers every call runs inline on the request thread, as before.
+    """
+
+    enabled = False
+    inference_workers = os.cpu_count() or 1
+    enrichment_workers = 2
+
+    def __init__(self):
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.shutdown()
+
+        self.enabled = True
+        self.inference_workers = app.config.get('ASGI_INFERENCE_WORKERS', self.inference_workers)
+        self.enrichment_workers = app.config.get('ASGI_ENRICHMENT_WORKERS', self.enrichment_workers)
+
+    def run(self, pool: str, function: Callable, *args):
+        """Call function(*args) on the given pool and wait for its result"""
+        if not self.enabled:
+            return function(*args)
+
+        return self._get_pools()[pool].submit(function, *args).result()
+
+    def _get_pools(self) -> Dict[str, ThreadPoolExecutor]:
+        # Pools are started on first use, and again in each pre-forked worker process since threads don't survive a fork
+        if not self._pools or self._pid != os.getpid():
+            with self._lock:
+                if not self._pools or self._pid != os.getpid():
+                    self._pools = {
+                        INFERENCE: ThreadPoolExecutor(self.inference_workers, thread_name_prefix='offload-inference'),
+                        ENRICHMENT: ThreadPoolExecutor(self.enrichment_workers, thread_name_prefix='offload-enrichment')
+                    }
+                    self._pid = os.getpid()
+
+        return self._pools
+
+    def shutdown(self):
+        """Wait for the calls in progress and stop the pools"""
+        pools, self._pools = self._pools, {}
+
+        if self._pid == os.getpid():
+            for executor in pools.values():
+                executor.shutdown(wait=True)
+
+
+offload_service: OffloadService = OffloadService()
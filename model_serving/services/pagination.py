@@ -0,0 +1,43 @@
+import base64
+import json
+from typing import Any, Iterable, Iterator, List
+
+
+def encode_cursor(values: List[str]) -> str:
+    """Opaque keyset cursor holding the sort key of the last row of a page, as strings"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """The size sort key values of a cursor, ValueError for anything encode_cursor couldn't have produced"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(value, str) for value in values):
+        raise ValueError('Invalid cursor')
+
+    return values
+
+
+def get_limit(requested, default: int, maximum: int) -> int:
+    """Page size from a query parameter, capped so no page can grow unbounded"""
+    limit = default if requested is None else int(requested)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+
+    return min(limit, maximum)
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    """Serialize items as a JSON array one element at a time, for generator responses"""
+    yield '['
+    for idx, item in enumerate(items):
+        yield (',' if idx else '') + json.dumps(item)
+    yield ']'
+
+
+def iter_ndjson(items: Iterable[Any]) -> Iterator[str]:
+    for item in items:
+        yield json.dumps(item) + '\n'
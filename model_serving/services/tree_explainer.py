@@ -0,0 +1,177 @@
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+
+class TreeExplainer:
+    """
+    Exact path-dependent TreeSHAP (Lundberg et al.) computed straight from the arrays of a fitted sklearn tree or
+    tree ensemble, so no separate explainer artifact has to be logged and loaded. The trees are only walked once, when
+    the explainer is built: every leaf keeps the unique features on its path with their zero fractions z (the share
+    of the training cover that follows the path at that feature's splits) and the interval a row has to fall in to
+    follow them, which makes its one fraction o either 0 or 1.
+
+    A leaf with value v then gives feature i on its path the Shapley value
+
+        v * (o_i - z_i) * integral over t in [0, 1] of prod_{j != i} ((1 - t) * z_j + t * o_j)
+
+    since the integral of t^k (1 - t)^(n - k - 1) is exactly the Shapley weight k! (n - k - 1)! / n!. The integrand
+    is a polynomial of degree below the path length, so Gauss-Legendre quadrature on half as many nodes evaluates it
+    exactly. All leaves with the same path length are computed together in NumPy arrays, so the Python work per
+    batch depends on the depth of the trees and not on their number of nodes.
+
+    shap_values returns a (rows, features, outputs) array with one output per class for classifiers.
+    """
+
+    _BLOCK_LEAVES = 2 ** 12
+    # Caps the (leaves, length, rows) arrays of a step at about this many elements
+    _BLOCK_ELEMENTS = 2 ** 20
+
+    def __init__(self, model):
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None:
+            estimators = [model]
+
+        estimators = np.ravel(estimators)
+        if len(estimators) == 0 or not all(hasattr(estimator, 'tree_') for estimator in estimators):
+            raise ValueError(f'{type(model).__name__} is not a fitted sklearn tree model')
+
+        self.is_classifier = hasattr(model, 'classes_')
+        self.n_features = model.n_features_in_
+        self.trees = [self._get_tree(estimator.tree_) for estimator in estimators]
+        self.expected_value = np.mean([self._expected_value(tree) for tree in self.trees], axis=0)
+        self.paths = self._get_paths(self.trees)
+
+    def _get_tree(self, tree) -> dict:
+        values = np.asarray(tree.value)[:, 0, :]
+
+        if self.is_classifier:
+            # Older sklearn stores class counts, newer class fractions; both normalise to probabilities
+            values = values / values.sum(axis=1, keepdims=True)
+
+        return {
+            'children_left': np.asarray(tree.children_left),
+            'children_right': np.asarray(tree.children_right),
+            'feature': np.asarray(tree.feature),
+            'threshold': np.asarray(tree.threshold),
+            'cover': np.asarray(tree.weighted_n_node_samples, dtype=np.float64),
+            'value': values
+        }
+
+    @staticmethod
+    def _expected_value(tree) -> np.ndarray:
+        leaves = tree['children_left'] == -1
+        return (tree['value'][leaves] * tree['cover'][leaves, None]).sum(axis=0) / tree['cover'][0]
+
+    def _get_paths(self, trees) -> list:
+        """Leaf paths of all trees, grouped by their number of unique features and split into blocks of leaves"""
+        groups = defaultdict(list)
+
+        for tree in trees:
+            children_left, children_right = tree['children_left'].tolist(), tree['children_right'].tolist()
+            features, thresholds, cover = tree['feature'].tolist(), tree['threshold'].tolist(), tree['cover'].tolist()
+
+            # Every feature on the path maps to (zero fraction, lower bound, upper bound): a row follows the path
+            # when lower < x <= upper for all of them
+            stack = [(0, {})]
+            while stack:
+                node, conditions = stack.pop()
+
+                left = children_left[node]
+                if left == -1:
+                    if conditions:
+                        groups[len(conditions)].append((conditions, tree['value'][node]))
+                    continue
+
+                right, feature, threshold = children_right[node], features[node], thresholds[node]
+                zero_fraction, lower, upper = conditions.get(feature, (1.0, -np.inf, np.inf))
+
+                left_fraction = zero_fraction * cover[left] / cover[node]
+                right_fraction = zero_fraction * cover[right] / cover[node]
+                stack.append((left, {**conditions, feature: (left_fraction, lower, min(upper, threshold))}))
+                stack.append((right, {**conditions, feature: (right_fraction, max(lower, threshold), upper)}))
+
+        paths = []
+        for length, leaves in sorted(groups.items()):
+            nodes, node_weights = np.polynomial.legendre.leggauss((length + 1) // 2)
+            nodes, node_weights = (nodes + 1) / 2, node_weights / 2
+
+            for start in range(0, len(leaves), self._BLOCK_LEAVES):
+                block = leaves[start:start + self._BLOCK_LEAVES]
+                features = np.array([list(conditions) for conditions, _ in block])
+                bounds = np.array([list(conditions.values()) for conditions, _ in block])
+                zero_fractions = bounds[:, :, 0]
+
+                # (leaves, length, nodes) factors of the integrand for a row that doesn't or does follow a feature.
+                # Zero fractions of 0 only come from zero weight nodes, whose values are undefined anyway
+                factor_zero = np.maximum(zero_fractions[:, :, np.newaxis] * (1 - nodes), np.finfo(np.float64).tiny)
+                factor_one = zero_fractions[:, :, np.newaxis] * (1 - nodes) + nodes
+
+                # Sums the (leaves * length) path elements into their features, weighted by each output's leaf value
+                values = np.array([value for _, value in block])
+                elements = np.arange(features.size)
+                to_features = [
+                    sparse.csr_matrix(
+                        (np.repeat(values[:, output], length), (features.ravel(), elements)),
+                        shape=(self.n_features, features.size)
+                    )
+                    for output in range(values.shape[1])
+                ]
+
+                paths.append({
+                    'features': features,
+                    'zero_fractions': zero_fractions[:, :, np.newaxis],
+                    'lower': bounds[:, :, 1, np.newaxis],
+                    'upper': bounds[:, :, 2, np.newaxis],
+                    'log_factor_zero': np.log(factor_zero).sum(axis=1)[:, :, np.newaxis],
+                    'log_factor_ratios': np.log(factor_one / factor_zero).transpose(0, 2, 1),
+                    'inverse_factors': np.concatenate(
+                        [node_weights / factor_zero, node_weights / factor_one - node_weights / factor_zero], axis=1
+                    ),
+                    'to_features': to_features
+                })
+
+        return paths
+
+    def shap_values(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        # The trees send missing values right at every split, the same as positive infinity, and -inf has to pass
+        # the lower bound of paths without a right split. Rows go last so the gathers below are contiguous
+        features_by_row = np.ascontiguousarray(
+            np.nan_to_num(X.T, nan=np.inf, posinf=np.inf, neginf=np.finfo(np.float64).min)
+        )
+        phi = np.zeros((self.n_features, self.trees[0]['value'].shape[1], X.shape[0]))
+
+        for path in self.paths:
+            leaves, length = path['features'].shape
+            rows_per_step = max(1, self._BLOCK_ELEMENTS // (leaves * length))
+
+            for start in range(0, X.shape[0], rows_per_step):
+                stop = start + rows_per_step
+                phi[:, :, start:stop] += self._path_shap(path, features_by_row[:, start:stop])
+
+        return phi.transpose(2, 0, 1) / len(self.trees)
+
+    @staticmethod
+    def _path_shap(path, features_by_row) -> np.ndarray:
+        """(features, outputs, rows) contributions of a block of leaves sharing the same path length"""
+        # (leaves, length, rows) one fractions: whether each row follows each leaf's path at each of its features
+        x = features_by_row[path['features']]
+        one_fractions = ((x > path['lower']) & (x <= path['upper'])).astype(np.float64)
+
+        # (leaves, nodes, rows) integrand of the whole path at every quadrature node, as a sum of logs
+        products = np.exp(path['log_factor_zero'] + np.matmul(path['log_factor_ratios'], one_fractions))
+
+        # Dividing a feature's own factor back out and summing over the nodes gives its integral
+        length = one_fractions.shape[1]
+        integrals = np.matmul(path['inverse_factors'], products)
+        integrals = integrals[:, :length] + one_fractions * integrals[:, length:]
+
+        contributions = (one_fractions - path['zero_fractions']) * integrals
+        contributions = contributions.reshape(-1, x.shape[2])
+
+        return np.stack([to_features.dot(contributions) for to_features in path['to_features']], axis=1)
@@ -1,17 +1,69 @@
 import logging
 import numpy as np
 import umap
+import mlflow
+import mlflow.sklearn
 from tempfile import TemporaryDirectory
 import pickle
 import os
+import time
+from typing import List, Optional
 
 from model_serving.models.prediction import Model, Prediction
 from model_serving.monitoring import FUNCTION_DURATION
+from model_serving.services.cache_service import cache_service
+from model_serving.services.neighbor_index import NeighborIndex
 
 logger = logging.getLogger(__name__)
 
 class UMAPService:
-    _umap_models = {}  # Store UMAP models by model_name/version for persistence
+    _unfitted_models = set()  # model_name/version already warned about having no fitted reducer
+    _neighbor_indexes = {}  # model_name/version -> (reducer, NeighborIndex built from it)
+    neighbor_index_params = None  # NeighborIndex parameters, None when the index is disabled
+
+    def init_app(self, app, gateway):
+        config = dict(app.config.get('UMAP_NEIGHBOR_INDEX', {}))
+
+        UMAPService._neighbor_indexes = {}
+        UMAPService.neighbor_index_params = config if config.pop('enabled', False) else None
+
+        if UMAPService.neighbor_index_params is None:
+            return
+
+        # Reducers loaded later (lazy loading, reloads) get their index as they come in
+        gateway.add_load_listener(self.build_neighbor_index)
+
+        for model_name, model_version in gateway.get_loaded_versions():
+            self.build_neighbor_index(gateway.get_model(model_name, model_version))
+
+    @staticmethod
+    def build_neighbor_index(model: Model):
+        """Index the training points of the model's fitted reducer so new points skip umap-learn's transform"""
+        if UMAPService.neighbor_index_params is None or model is None or not NeighborIndex.supports(model._umap):
+            return
+
+        try:
+            started = time.perf_counter()
+            index = NeighborIndex.from_reducer(model._umap, **UMAPService.neighbor_index_params)
+            UMAPService._neighbor_indexes[f"{model.model_name}/{model.model_version}"] = (model._umap, index)
+
+            logger.info(
+                f"Built UMAP neighbor index for {model.model_name} version {model.model_version} "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+
+        except Exception as e:
+            logger.error(f"Error building UMAP neighbor index: {str(e)}")
+
+    @staticmethod
+    def _transform(model: Model, umap_model, inputs_array):
+        index_entry = UMAPService._neighbor_indexes.get(f"{model.model_name}/{model.model_version}")
+
+        # Only trust an index built from this exact reducer, a reloaded version may carry a different one
+        if index_entry is not None and index_entry[0] is umap_model:
+            return index_entry[1].transform(np.asarray(inputs_array, dtype=np.float64))
+
+        return umap_model.transform(inputs_array)
     
     @staticmethod
     def _get_default_umap_params():
@@ -22,26 +74,88 @@ class UMAPService:
             "random_state": 42
         }
     
+    @staticmethod
+    def fit_reducer(training_inputs, umap_params=None) -> umap.UMAP:
+        """Fit a reducer offline on the model's training inputs"""
+        params = umap_params or UMAPService._get_default_umap_params()
+        return umap.UMAP(**params).fit(training_inputs)
+
+    @staticmethod
+    def log_reducer(reducer: umap.UMAP, artifact_path: str = "model/umap"):
+        """Log a fitted reducer to the active MLflow run, next to the model, where MLFlowGateway loads it from"""
+        mlflow.sklearn.log_model(reducer, artifact_path)
+
+    @staticmethod
+    def _get_fitted_umap_model(model: Model):
+        """The reducer fitted offline and loaded by MLFlowGateway, or None if the model has no fitted one"""
+        umap_model = model._umap
+        if umap_model is None:
+            return None
+
+        # A reducer logged before it was fitted would only raise on transform
+        if not hasattr(umap_model, "embedding_"):
+            model_key = f"{model.model_name}/{model.model_version}"
+            if model_key not in UMAPService._unfitted_models:
+                UMAPService._unfitted_models.add(model_key)
+                logger.warning(f"No fitted UMAP reducer for {model_key}, embeddings are disabled")
+            return None
+
+        return umap_model
+
+    @staticmethod
+    @FUNCTION_DURATION.labels('create_umap_embeddings').time()
+    def create_embeddings(model: Model, predictions: List[Prediction]) -> Optional[List[List[float]]]:
+        """Embed a whole batch with a single transform call over the inputs that aren't cached"""
+        try:
+            umap_model = UMAPService._get_fitted_umap_model(model)
+            if umap_model is None:
+                return None
+
+            embeddings = cache_service.get_many(cache_service.embeddings, model, predictions)
+            misses = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+
+            if misses:
+                missed = [predictions[idx] for idx in misses]
+                if model.feature_names:
+                    inputs_array = Prediction.get_numpy_array_of_batch(missed, model.feature_names)
+                else:
+                    inputs_array = Prediction.get_pandas_frame_of_batch(missed)
+                computed = UMAPService._transform(model, umap_model, inputs_array).tolist()
+
+                cache_service.set_many(cache_service.embeddings, model, missed, computed)
+                for idx, embedding in zip(misses, computed):
+                    embeddings[idx] = embedding
+
+            return embeddings
+
+        except Exception as e:
+            # Log error but don't fail the predictions
+            logger.error(f"Error calculating UMAP embeddings: {str(e)}")
+            return None
+
     @staticmethod
     @FUNCTION_DURATION.labels('create_umap_embedding').time()
-    def create_embedding(model: Model, prediction: Prediction, umap_params=None) -> np.ndarray:
+    def create_embedding(model: Model, prediction: Prediction) -> np.ndarray:
         try:
-            model_key = f"{model.model_name}/{model.model_version}"
-            inputs_array = prediction.get_pandas_frame_of_inputs()
-            
-            # Use provided params or defaults
-            params = umap_params or UMAPService._get_default_umap_params()
-            
-            # Use existing UMAP model or create a new one
-            if model_key not in UMAPService._umap_models:
-                UMAPService._umap_models[model_key] = umap.UMAP(**params)
-                # Note: For actual training, you would need historical data
-                # This is just a placeholder for the transform-only case
-            
+            umap_model = UMAPService._get_fitted_umap_model(model)
+            if umap_model is None:
+                return None
+
+            embedding = cache_service.get_many(cache_service.embeddings, model, [prediction])[0]
+            if embedding is not None:
+                return embedding
+
+            if model.feature_names:
+                inputs_array = prediction.get_numpy_array_of_inputs(model.feature_names)
+            else:
+                inputs_array = prediction.get_pandas_frame_of_inputs()
+
             # Calculate embeddings
-            embeddings = UMAPService._umap_models[model_key].transform(inputs_array)
-            
-            return embeddings.tolist()[0]  # Return as list for JSON serialization
+            embeddings = UMAPService._transform(model, umap_model, inputs_array)
+            embedding = embeddings.tolist()[0]  # Return as list for JSON serialization
+
+            cache_service.set_many(cache_service.embeddings, model, [prediction], [embedding])
+            return embedding
             
         except Exception as e:
             # Log error but don't fail the prediction
@@ -16,6 +16,12 @@ class InputValidator:
             errors["features"] = "Input features cannot be empty"
             return errors
 
+        # Check the features against the schema captured when the model was loaded
+        if isinstance(model.feature_names, list):
+            missing = set(model.feature_names).difference(features)
+            for feature_name in missing:
+                errors[feature_name] = f"Feature {feature_name} is required"
+
         # Validate numeric types for all features
         for feature_name, value in features.items():
             if not isinstance(value, (int, float)):
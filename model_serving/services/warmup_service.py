@@ -0,0 +1,95 @@
+import logging
+import threading
+import time
+
+from model_serving.models.prediction import Model, Prediction
+from model_serving.services.inference_service import inference_service
+from model_serving.services.explainer_service import explainer_service
+from model_serving.services.umap_service import umap_service
+from model_serving.services.cache_service import cache_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """
+    Runs synthetic requests through inference, UMAP and SHAP right after a model is loaded so lazy allocations,
+    numba compilation in umap-learn and first-call caches are paid before real traffic arrives.
+    """
+
+    iterations = 0
+    batch_size = 8
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self._thread = None
+
+    def init_app(self, app, gateway):
+        self.iterations = app.config.get('WARMUP_ITERATIONS', 0)
+        self.batch_size = app.config.get('WARMUP_BATCH_SIZE', self.batch_size)
+        self.ready.clear()
+
+        # Versions loaded later (lazy loading, reloads) are warmed as they come in
+        gateway.add_load_listener(self.warm_up)
+
+        if app.config.get('WARMUP_IN_BACKGROUND', False):
+            self._thread = threading.Thread(target=self._warm_up_all, args=(gateway,), name='model-warmup', daemon=True)
+            self._thread.start()
+        else:
+            self._warm_up_all(gateway)
+
+    def is_ready(self) -> bool:
+        return self.ready.is_set()
+
+    def wait(self):
+        """
+        Block until a background warm-up has finished. Threads don't survive fork(), so a pre-fork server has to call
+        this before forking; its workers then inherit the warmed-up models and a ready event that is already set.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _warm_up_all(self, gateway):
+        try:
+            for model_name, model_version in gateway.get_loaded_versions():
+                self.warm_up(gateway.get_model(model_name, model_version))
+        finally:
+            self.ready.set()
+
+    def warm_up(self, model: Model):
+        if not self.iterations or model is None or getattr(model, 'model', None) is None:
+            return
+
+        if not model.feature_names:
+            logger.warning(f'Skipping warm-up for {model.model_name} version {model.model_version}: no feature schema')
+            return
+
+        started = time.perf_counter()
+
+        try:
+            for iteration in range(self.iterations):
+                # Different inputs on every iteration, or the embedding and explanation caches would answer all but
+                # the first one without running anything
+                inputs = {feature_name: float(iteration) for feature_name in model.feature_names}
+
+                prediction = inference_service.create_inference(model, Prediction(inputs=dict(inputs)))
+                umap_service.create_embedding(model, prediction)
+                if model._explainer is not None:
+                    explainer_service.create_explanation(model, prediction)
+
+                inference_service.create_batch_inference(
+                    model, [Prediction(inputs=dict(inputs)) for _ in range(self.batch_size)]
+                )
+        except Exception as e:
+            logger.warning(f'Warm-up failed for {model.model_name} version {model.model_version}: {str(e)}')
+            return
+        finally:
+            # Don't leave the synthetic inputs' results in the caches real requests use
+            cache_service.invalidate(model)
+
+        logger.info(f'Warmed up {model.model_name} version {model.model_version} in {time.perf_counter() - started:.2f}s')
+
+
+warmup_service: WarmupService = WarmupService()
@@ -12,8 +12,10 @@ create_metrics_dir()
 from model_serving.controllers.prediction import prediction_controller
 from model_serving.models.prediction import Prediction
 from model_serving.domain.common_enums import Labels, ModelType
-from model_serving.services.database.prediction import ModelSQL
-from model_serving.domain.exceptions import ModelNotFoundException, InvalidInputException, InferenceException
+from model_serving.services.database.database_client import db
+from model_serving.services.database.prediction import ModelSQL, PredictionSQL
+from model_serving.services.database.encoding import compact_encoding
+from model_serving.domain.exceptions import ModelNotFoundException, InvalidInputException, InferenceException, PredictionNotFoundException
 
 
 class TestPredictionController(BaseTestCase):
@@ -114,6 +116,90 @@ class TestPredictionController(BaseTestCase):
             self.assertEqual(result.value, Labels.MALIGNANT)
             self.assertEqual(result.probability, 0.7)
 
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    @patch('model_serving.controllers.prediction.db.session')
+    def test_create_predictions_batch(self, mock_session, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model.predict_proba.return_value = np.array([[0.3, 0.7], [0.9, 0.1]])
+        mock_gateway_model.model_type = ModelType.CLASSIFICATION.value
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway_model.threshold = {
+            'value': 0.5,
+            'above': Labels.BENIGN,
+            'below': Labels.MALIGNANT,
+            'equal': Labels.BENIGN
+        }
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = [[0.1, 0.2], [0.3, 0.4]]
+
+        with self.app.app_context():
+            result = prediction_controller.create_predictions(
+                model_name="test_model",
+                model_version=1,
+                predictions=[Prediction(inputs={"feature1": 1.0}), Prediction(inputs={"feature1": 2.0})]
+            )
+
+        mock_gateway_model.model.predict_proba.assert_called_once()
+        self.assertEqual([p.value for p in result], [Labels.MALIGNANT, Labels.BENIGN])
+        self.assertEqual(result[1].embeddings, [0.3, 0.4])
+        self.assertEqual(len(mock_session.add_all.call_args[0][0]), 2)
+        mock_session.commit.assert_called_once()
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    @patch('model_serving.controllers.prediction.explainer_service')
+    @patch('model_serving.controllers.prediction.db.session')
+    def test_create_predictions_batch_explanations(self, mock_session, mock_explainer, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model_type = ModelType.REGRESSION.value
+        mock_gateway_model.feature_names = None
+        mock_gateway_model.model.predict.return_value = np.array([1.0, 2.0])
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = None
+        mock_explainer.create_explanations.side_effect = lambda model, predictions: predictions
+
+        with self.app.app_context():
+            prediction_controller.create_predictions(
+                model_name="test_model",
+                model_version=1,
+                predictions=[Prediction(inputs={"feature1": 1.0}), Prediction(inputs={"feature1": 2.0})]
+            )
+
+        mock_explainer.create_explanations.assert_called_once()
+        self.assertEqual(len(mock_explainer.create_explanations.call_args[0][1]), 2)
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.memoization_service')
+    @patch('model_serving.controllers.prediction.inference_service')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_create_prediction_from_cache(self, mock_umap, mock_inference, mock_memoization, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model_type = ModelType.REGRESSION.value
+        mock_gateway_model.model_name = "test_model"
+        mock_gateway_model.model_version = 1
+        mock_gateway_model.feature_names = None
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_memoization.enabled = True
+
+        def fill_from_cache(model, prediction):
+            prediction.value = 2.5
+            return True
+
+        mock_memoization.get.side_effect = fill_from_cache
+        mock_umap.create_embedding.return_value = [0.1, 0.2]
+
+        with self.app.app_context():
+            result = prediction_controller.create_prediction("test_model", 1, Prediction(inputs={"feature1": 1.0}))
+
+        self.assertEqual(result.value, 2.5)
+        mock_inference.create_inference.assert_not_called()
+        mock_memoization.set.assert_not_called()
+
+        # Embeddings aren't memoized, a hit gets them the same way a miss does
+        self.assertEqual(result.embeddings, [0.1, 0.2])
+
     @patch('model_serving.controllers.prediction.mlflow_gateway')
     def test_create_prediction_invalid_input(self, mock_gateway):
         with self.app.app_context():
@@ -217,6 +303,248 @@ class TestPredictionController(BaseTestCase):
             with self.assertRaises(Exception):
                 prediction_controller.get_prediction("nonexistent_id")
 
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_get_prediction_round_trip(self, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model.predict_proba.return_value = np.array([[0.3, 0.7], [0.9, 0.1]])
+        mock_gateway_model.model_type = ModelType.CLASSIFICATION.value
+        mock_gateway_model.model_name = "test_model"
+        mock_gateway_model.model_version = 1
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway_model._explainer = None
+        mock_gateway_model.threshold = {
+            'value': 0.5,
+            'above': Labels.BENIGN,
+            'below': Labels.MALIGNANT,
+            'equal': Labels.BENIGN
+        }
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = None
+
+        with self.app.app_context():
+            predictions = prediction_controller.create_predictions(
+                model_name="test_model",
+                model_version=1,
+                predictions=[Prediction(inputs={"feature1": 1.0}), Prediction(inputs={"feature1": 2.0})]
+            )
+            # Both predictions reference the single stored model row
+            self.assertEqual(db.session.query(ModelSQL).count(), 1)
+
+            result = prediction_controller.get_prediction(predictions[0].id)
+
+        self.assertEqual(result.inputs, {"feature1": 1.0})
+        self.assertEqual(result.value, Labels.MALIGNANT)
+        self.assertEqual(result.probability, 0.7)
+        self.assertEqual(result.model.model_name, "test_model")
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_explanations_are_stored_with_predictions(self, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model.predict.return_value = np.array([1.5, 2.5])
+        mock_gateway_model.model_type = ModelType.REGRESSION.value
+        mock_gateway_model.model_name = "test_model"
+        mock_gateway_model.model_version = 1
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway_model.feature_names = ["feature1", "feature2"]
+        mock_gateway_model.labels = None
+        mock_gateway_model._explainer.predict.return_value = np.array([[0.1, -0.1], [0.2, -0.2]])
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = None
+
+        for compact in (False, True):
+            with patch.object(compact_encoding, 'enabled', compact), self.app.app_context():
+                predictions = prediction_controller.create_predictions(
+                    model_name="test_model",
+                    model_version=1,
+                    predictions=[
+                        Prediction(inputs={"feature1": 1.0, "feature2": 2.0}),
+                        Prediction(inputs={"feature1": 3.0, "feature2": 4.0})
+                    ]
+                )
+
+                # Read back without the explainer
+                mock_gateway_model._explainer.predict.reset_mock()
+                shaps = prediction_controller.get_explanation(predictions[1].id)
+
+            mock_gateway_model._explainer.predict.assert_not_called()
+            self.assertEqual([shap.shap_values for shap in shaps], [{"feature1": 0.2, "feature2": -0.2}])
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_stream_predictions_scores_in_chunks(self, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model.predict.side_effect = lambda inputs: np.asarray(inputs)[:, 0] * 2
+        mock_gateway_model.model_type = ModelType.REGRESSION.value
+        mock_gateway_model.model_name = "test_model"
+        mock_gateway_model.model_version = 1
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway_model.feature_names = ["feature1"]
+        mock_gateway_model.mlflow_flavor = "sklearn"
+        mock_gateway_model._explainer = None
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = None
+
+        records = [(line, Prediction(inputs={"feature1": float(line)})) for line in range(1, 6)]
+        records.insert(2, (99, ValueError("Invalid record")))
+
+        validate = 'model_serving.controllers.prediction.input_validator.validate_prediction_input'
+        with self.app.app_context(), patch(validate, return_value=None) as mock_validate:
+            results = list(prediction_controller.stream_predictions("test_model", 1, iter(records), chunk_size=2))
+
+        # The model is resolved and each record validated once, not again per chunk
+        mock_gateway.get_model.assert_called_once()
+        self.assertEqual(mock_validate.call_count, 5)
+
+        self.assertEqual([line for line, _ in results], [1, 2, 99, 3, 4, 5])
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertEqual([result.value for line, result in results if line != 99], [2.0, 4.0, 6.0, 8.0, 10.0])
+        self.assertEqual(mock_gateway_model.model.predict.call_count, 3)
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_list_predictions_keyset_pages(self, mock_umap, mock_gateway):
+        models = {}
+        for name in ("model_a", "model_b"):
+            gateway_model = MagicMock()
+            gateway_model.model.predict.side_effect = lambda inputs: np.ones(len(inputs))
+            gateway_model.model_type = ModelType.REGRESSION.value
+            gateway_model.model_name = name
+            gateway_model.model_version = 1
+            gateway_model.id = f"{name}_id"
+            gateway_model.feature_names = None
+            gateway_model._explainer = None
+            models[name] = gateway_model
+
+        mock_gateway.get_model.side_effect = lambda model_name, model_version: models[model_name]
+        mock_umap.create_embeddings.return_value = None
+
+        with self.app.app_context():
+            created = []
+            for idx in range(5):
+                created += prediction_controller.create_predictions(
+                    "model_a" if idx % 2 == 0 else "model_b", 1, [Prediction(inputs={"feature1": float(idx)})]
+                )
+
+            pages, cursor = [], None
+            while True:
+                page, cursor = prediction_controller.list_predictions(2, cursor)
+                pages.append([prediction.id for prediction in page])
+                if cursor is None:
+                    break
+
+            model_a, _ = prediction_controller.list_predictions(10, model_name="model_a", model_version="1")
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sorted(sum(pages, [])), sorted(prediction.id for prediction in created))
+        self.assertEqual([prediction.inputs["feature1"] for prediction in model_a], [0.0, 2.0, 4.0])
+
+    def test_list_predictions_invalid_cursor(self):
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                prediction_controller.list_predictions(10, "not a cursor")
+
+    def test_get_explanation_not_stored(self):
+        with self.app.app_context():
+            with self.assertRaises(PredictionNotFoundException):
+                prediction_controller.get_explanation("nonexistent_id")
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_get_prediction_round_trip_compact_encoding(self, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model.predict.return_value = np.array([1.5])
+        mock_gateway_model.model_type = ModelType.REGRESSION.value
+        mock_gateway_model.model_name = "test_model"
+        mock_gateway_model.model_version = 1
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway_model.feature_names = None
+        mock_gateway_model._explainer = None
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = [[0.25, -0.5]]
+
+        with patch.object(compact_encoding, 'enabled', True), self.app.app_context():
+            predictions = prediction_controller.create_predictions(
+                model_name="test_model",
+                model_version=1,
+                predictions=[Prediction(inputs={"feature2": 2.0, "feature1": 1.0})]
+            )
+
+            row = db.session.get(PredictionSQL, predictions[0].id)
+            self.assertIsNone(row.inputs)
+            self.assertIsNotNone(row.inputs_blob)
+            self.assertIsNone(row.embeddings)
+
+            result = prediction_controller.get_prediction(predictions[0].id)
+
+        self.assertEqual(result.inputs, {"feature2": 2.0, "feature1": 1.0})
+        self.assertEqual(result.embeddings, [0.25, -0.5])
+        self.assertEqual(result.value, 1.5)
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_compact_header_decoded_once_per_batch(self, mock_umap, mock_gateway):
+        mock_gateway_model = MagicMock()
+        mock_gateway_model.model.predict.return_value = np.array([1.5, 2.5, 3.5])
+        mock_gateway_model.model_type = ModelType.REGRESSION.value
+        mock_gateway_model.model_name = "test_model"
+        mock_gateway_model.model_version = 1
+        mock_gateway_model.id = "test_model_id"
+        mock_gateway_model.feature_names = None
+        mock_gateway_model._explainer = None
+        mock_gateway.get_model.return_value = mock_gateway_model
+        mock_umap.create_embeddings.return_value = None
+
+        with patch.object(compact_encoding, 'enabled', True), self.app.app_context():
+            with patch.object(compact_encoding, 'decode_header', wraps=compact_encoding.decode_header) as mock_decode:
+                predictions = prediction_controller.create_predictions(
+                    model_name="test_model",
+                    model_version=1,
+                    predictions=[Prediction(inputs={"feature1": float(i)}) for i in range(3)]
+                )
+
+            self.assertEqual(mock_decode.call_count, 1)
+            self.assertTrue(all(db.session.get(PredictionSQL, prediction.id).inputs_blob for prediction in predictions))
+
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    @patch('model_serving.controllers.prediction.umap_service')
+    def test_compact_header_decoded_once_per_page(self, mock_umap, mock_gateway):
+        models = {}
+        for name in ("compact_model", "json_model"):
+            gateway_model = MagicMock()
+            gateway_model.model.predict.side_effect = lambda inputs: np.ones(len(inputs))
+            gateway_model.model_type = ModelType.REGRESSION.value
+            gateway_model.model_name = name
+            gateway_model.model_version = 1
+            gateway_model.id = f"{name}_id"
+            gateway_model.feature_names = None
+            gateway_model._explainer = None
+            models[name] = gateway_model
+
+        mock_gateway.get_model.side_effect = lambda model_name, model_version: models[model_name]
+        mock_umap.create_embeddings.return_value = None
+
+        with self.app.app_context():
+            with patch.object(compact_encoding, 'enabled', True):
+                prediction_controller.create_predictions(
+                    "compact_model", 1, [Prediction(inputs={"feature1": float(i)}) for i in range(3)]
+                )
+            prediction_controller.create_predictions(
+                "json_model", 1, [Prediction(inputs={"feature1": float(i)}) for i in range(3)]
+            )
+            db.session.expunge_all()
+
+            with patch.object(compact_encoding, 'decode_header', wraps=compact_encoding.decode_header) as mock_decode:
+                compact_page, _ = prediction_controller.list_predictions(10, model_name="compact_model", model_version="1")
+                self.assertEqual(mock_decode.call_count, 1)
+
+                json_page, _ = prediction_controller.list_predictions(10, model_name="json_model", model_version="1")
+                self.assertEqual(mock_decode.call_count, 1)
+
+        self.assertEqual([prediction.inputs["feature1"] for prediction in compact_page], [0.0, 1.0, 2.0])
+        self.assertEqual([prediction.inputs["feature1"] for prediction in json_page], [0.0, 1.0, 2.0])
+
 class TestPredictionValidation(unittest.TestCase):
     """Test input validation and data processing"""
     
@@ -1,4 +1,9 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
+import numpy as np
 from unittest.mock import patch, MagicMock
 from model_serving.gateways.mlflow_gateway import MLFlowGateway
 from model_serving.domain.common_enums import ModelType
@@ -156,3 +161,266 @@ class TestMLFlowGateway(unittest.TestCase):
         self.assertEqual(model.model_type, ModelType.REGRESSION.value)
         self.assertIsNone(model.threshold)
         self.assertIsNone(model.labels)
+
+
+    def test_get_feature_names_from_sklearn(self):
+        mock_model = MagicMock(spec=['feature_names_in_'])
+        mock_model.feature_names_in_ = np.array(['mean radius', 'mean texture'], dtype=object)
+
+        self.assertEqual(MLFlowGateway._get_feature_names(mock_model), ['mean radius', 'mean texture'])
+
+    def test_get_feature_names_unavailable(self):
+        self.assertIsNone(MLFlowGateway._get_feature_names(object()))
+
+    def test_get_model_feature_schema(self):
+        self.gateway.models = {
+            'test_model': {
+                '1': {
+                    'model_type': ModelType.REGRESSION.value,
+                    'mlflow_flavor': 'sklearn',
+                    'feature_names': ['feature1', 'feature2'],
+                    'model': MagicMock(),
+                }
+            }
+        }
+
+        model = self.gateway.get_model('test_model', '1')
+
+        self.assertEqual(model.mlflow_flavor, 'sklearn')
+        self.assertEqual(model.feature_names, ['feature1', 'feature2'])
+
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_load_model_mmap(self, mock_mlflow):
+        from sklearn.linear_model import LogisticRegression
+
+        fitted = LogisticRegression().fit(np.random.rand(20, 3), [0, 1] * 10)
+        mock_mlflow.sklearn.load_model.return_value = fitted
+
+        mmap_path = os.path.join(tempfile.mkdtemp(), 'test_model', '1', 'model.joblib')
+
+        first = self.gateway._load_model('test_uri', 'sklearn', mmap_path=mmap_path)
+        second = self.gateway._load_model('test_uri', 'sklearn', mmap_path=mmap_path)
+
+        # The MLflow artifact is only read to build the cache
+        mock_mlflow.sklearn.load_model.assert_called_once_with('test_uri')
+        self.assertTrue(os.path.exists(mmap_path))
+        self.assertIsInstance(second.coef_, np.memmap)
+        np.testing.assert_array_equal(first.coef_, fitted.coef_)
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_load_model_mmap_converts_forests(self, mock_mlflow):
+        from sklearn.ensemble import RandomForestClassifier
+        from model_serving.services.mapped_trees import MappedTrees
+
+        X = np.random.rand(20, 3)
+        fitted = RandomForestClassifier(n_estimators=3).fit(X, [0, 1] * 10)
+        mock_mlflow.sklearn.load_model.return_value = fitted
+
+        mmap_path = os.path.join(tempfile.mkdtemp(), 'test_model', '1', 'model.joblib')
+
+        self.gateway._load_model('test_uri', 'sklearn', mmap_path=mmap_path)
+        loaded = self.gateway._load_model('test_uri', 'sklearn', mmap_path=mmap_path)
+
+        mock_mlflow.sklearn.load_model.assert_called_once_with('test_uri')
+        self.assertIsInstance(loaded, MappedTrees)
+        self.assertTrue(os.path.isdir(os.path.join(os.path.dirname(mmap_path), 'model.trees')))
+        np.testing.assert_allclose(loaded.predict_proba(X), fitted.predict_proba(X))
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_load_model_mmap_skips_tree_models(self, mock_mlflow):
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        fitted = make_pipeline(StandardScaler(), RandomForestClassifier(n_estimators=3)).fit(np.random.rand(20, 3), [0, 1] * 10)
+        mock_mlflow.sklearn.load_model.return_value = fitted
+
+        mmap_path = os.path.join(tempfile.mkdtemp(), 'test_model', '1', 'model.joblib')
+
+        loaded = self.gateway._load_model('test_uri', 'sklearn', mmap_path=mmap_path)
+
+        self.assertIs(loaded, fitted)
+        self.assertFalse(os.path.exists(mmap_path))
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_load_model_mmap_unsupported_flavor(self, mock_mlflow):
+        self.gateway._load_model('test_uri', 'pytorch', mmap_path='/unused/model.joblib')
+
+        mock_mlflow.pytorch.load_model.assert_called_once_with('test_uri')
+
+    def test_get_mmap_path(self):
+        self.assertIsNone(self.gateway._get_mmap_path('test_model', '1'))
+
+        self.gateway.mmap_cache_dir = '/cache'
+        self.assertEqual(self.gateway._get_mmap_path('test_model', '1'), os.path.join('/cache', 'test_model', '1', 'model.joblib'))
+
+
+    def _lazy_app(self, max_loaded_models=None):
+        mock_app = MagicMock()
+        mock_app.config = {
+            'TRACKING_URI': 'http://test-mlflow-server',
+            'MODEL_LAZY_LOADING': True,
+            'MAX_LOADED_MODELS': max_loaded_models,
+            'MODELS': {
+                'test_model': {
+                    version: {'model_type': ModelType.REGRESSION.value, 'mlflow_flavor': 'sklearn'}
+                    for version in ['1', '2']
+                }
+            }
+        }
+        return mock_app
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_lazy_loading_on_first_request(self, mock_mlflow):
+        self.gateway.init_app(self._lazy_app())
+
+        mock_mlflow.sklearn.load_model.assert_not_called()
+
+        model = self.gateway.get_model('test_model', '1')
+        self.gateway.get_model('test_model', '1')
+
+        mock_mlflow.sklearn.load_model.assert_called_once_with('models:/test_model/1')
+        self.assertIs(model.model, mock_mlflow.sklearn.load_model.return_value)
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_lazy_loading_deduplicates_concurrent_loads(self, mock_mlflow):
+        def slow_load(uri):
+            time.sleep(0.1)
+            return MagicMock()
+
+        mock_mlflow.sklearn.load_model.side_effect = slow_load
+        self.gateway.init_app(self._lazy_app())
+
+        threads = [threading.Thread(target=self.gateway.get_model, args=('test_model', '1')) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(mock_mlflow.sklearn.load_model.call_count, 1)
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_lru_eviction(self, mock_mlflow):
+        mock_mlflow.sklearn.load_model.side_effect = lambda uri: MagicMock()
+        self.gateway.init_app(self._lazy_app(max_loaded_models=1))
+
+        first = self.gateway.get_model('test_model', '1')
+        self.gateway.get_model('test_model', '2')
+
+        self.assertIsNone(self.gateway.models['test_model']['1']['model'])
+        self.assertIsNotNone(self.gateway.models['test_model']['2']['model'])
+        # Requests already holding the evicted model keep working
+        self.assertIsNotNone(first.model)
+
+        self.gateway.get_model('test_model', '1')
+        self.assertEqual(mock_mlflow.sklearn.load_model.call_count, 3)
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_evict_listener_receives_evicted_version(self, mock_mlflow):
+        mock_mlflow.sklearn.load_model.side_effect = lambda uri: MagicMock()
+        self.gateway.init_app(self._lazy_app(max_loaded_models=1))
+        evicted = []
+        self.gateway.add_evict_listener(lambda model_name, model_version: evicted.append((model_name, model_version)))
+
+        self.gateway.get_model('test_model', '1')
+        self.assertEqual(evicted, [])
+
+        self.gateway.get_model('test_model', '2')
+        self.assertEqual(evicted, [('test_model', '1')])
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_load_listener_receives_loaded_model(self, mock_mlflow):
+        self.gateway.init_app(self._lazy_app())
+        loaded = []
+        self.gateway.add_load_listener(loaded.append)
+
+        self.gateway.get_model('test_model', '1')
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].model_version, '1')
+        self.assertIs(loaded[0].model, mock_mlflow.sklearn.load_model.return_value)
+        self.assertEqual(self.gateway.get_loaded_versions(), [('test_model', '1')])
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_load_umap_reducer(self, mock_mlflow):
+        mock_app = MagicMock()
+        mock_app.config = {
+            'TRACKING_URI': 'http://test-mlflow-server',
+            'MODELS': {
+                'test_model': {'1': {'model_type': ModelType.REGRESSION.value, 'mlflow_flavor': 'pyfunc', 'umap': True}}
+            }
+        }
+        mock_mlflow.client.MlflowClient.return_value.search_model_versions.return_value = [
+            MagicMock(version='1', run_id='run_1')
+        ]
+        reducer = MagicMock()
+        mock_mlflow.sklearn.load_model.return_value = reducer
+
+        self.gateway.init_app(mock_app)
+        model = self.gateway.get_model('test_model', '1')
+
+        mock_mlflow.sklearn.load_model.assert_called_once_with('runs:/run_1/model/umap')
+        self.assertIs(model._umap, reducer)
+        self.assertIsNone(model._explainer)
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_tree_explainer_built_from_model(self, mock_mlflow):
+        from sklearn.ensemble import RandomForestClassifier
+
+        mock_app = MagicMock()
+        mock_app.config = {
+            'TRACKING_URI': 'http://test-mlflow-server',
+            'MODELS': {
+                'test_model': {'1': {
+                    'model_type': ModelType.CLASSIFICATION.value, 'mlflow_flavor': 'sklearn', 'explainer': 'tree',
+                    'labels': ['BENIGN', 'MALIGNANT'], 'threshold': {'value': 0.5}
+                }}
+            }
+        }
+        mock_mlflow.sklearn.load_model.return_value = RandomForestClassifier(n_estimators=2).fit(
+            np.random.rand(20, 3), [0, 1] * 10
+        )
+
+        self.gateway.init_app(mock_app)
+        model = self.gateway.get_model('test_model', '1')
+
+        self.assertEqual(model._explainer.shap_values(np.random.rand(2, 3)).shape, (2, 3, 2))
+        mock_mlflow.client.MlflowClient.assert_not_called()
+        mock_mlflow.pyfunc.load_model.assert_not_called()
+
+    def test_get_model_unknown(self):
+        self.gateway.models = {'test_model': {'1': {'model_type': ModelType.REGRESSION.value, 'model': MagicMock()}}}
+
+        self.assertIsNone(self.gateway.get_model('test_model', '2'))
+        self.assertIsNone(self.gateway.get_model('other_model', '1'))
+
+
+    @patch('model_serving.gateways.mlflow_gateway.mlflow')
+    def test_init_app_batches_run_id_lookups(self, mock_mlflow):
+        mock_app = MagicMock()
+        mock_app.config = {
+            'TRACKING_URI': 'http://test-mlflow-server',
+            'MODEL_LOAD_WORKERS': 2,
+            'MODELS': {
+                'test_model': {
+                    version: {'model_type': ModelType.REGRESSION.value, 'mlflow_flavor': 'pyfunc', 'explainer': True}
+                    for version in ['1', '2']
+                }
+            }
+        }
+        mock_client = mock_mlflow.client.MlflowClient.return_value
+        mock_client.search_model_versions.return_value = [
+            MagicMock(version='1', run_id='run_1'),
+            MagicMock(version='2', run_id='run_2')
+        ]
+
+        self.gateway.init_app(mock_app)
+
+        mock_client.search_model_versions.assert_called_once_with("name='test_model'")
+        mock_client.get_model_version.assert_not_called()
+        loaded_uris = {call.args[0] for call in mock_mlflow.pyfunc.load_model.call_args_list}
+        self.assertEqual(loaded_uris, {
+            'models:/test_model/1', 'models:/test_model/2',
+            'runs:/run_1/model/explainer', 'runs:/run_2/model/explainer'
+        })
@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from model_serving.models.prediction import Model, Prediction
 from model_serving.domain.common_enums import ModelType, Labels
 
@@ -70,4 +71,39 @@ class TestPrediction(unittest.TestCase):
             Prediction(inputs={"feature1": "not_a_number"})
         
         with self.assertRaises(ValueError):
-            Prediction(inputs="not_a_dict")
\ No newline at end of file
+            Prediction(inputs="not_a_dict")
+
+    def test_numpy_array_of_batch_uses_feature_order(self):
+        predictions = [
+            Prediction(inputs={"feature2": 2.0, "feature1": 1.0}),
+            Prediction(inputs={"feature1": 3.0, "feature2": 4})
+        ]
+
+        matrix = Prediction.get_numpy_array_of_batch(predictions, ["feature1", "feature2"])
+
+        self.assertEqual(matrix.dtype, np.float64)
+        np.testing.assert_array_equal(matrix, np.array([[1.0, 2.0], [3.0, 4.0]]))
+
+    def test_numpy_array_of_inputs_is_cached(self):
+        prediction = Prediction(inputs={"feature1": 1.0})
+
+        first = prediction.get_numpy_array_of_inputs(["feature1"])
+
+        self.assertIs(prediction.get_numpy_array_of_inputs(["feature1"]), first)
+        np.testing.assert_array_equal(first, np.array([[1.0]]))
+
+    def test_numpy_array_missing_feature(self):
+        with self.assertRaises(ValueError):
+            Prediction.get_numpy_array_of_batch([Prediction(inputs={"feature1": 1.0})], ["feature1", "feature2"])
+
+    def test_input_key_is_canonical(self):
+        key = Prediction(inputs={"feature1": 1, "feature2": 2.5}).input_key
+
+        self.assertEqual(Prediction(inputs={"feature2": 2.5, "feature1": 1.0}).input_key, key)
+        self.assertNotEqual(Prediction(inputs={"feature1": 1.0, "feature2": 2.6}).input_key, key)
+
+    def test_input_key_is_not_serialized(self):
+        prediction = Prediction(inputs={"feature1": 1.0})
+        prediction.input_key
+
+        self.assertNotIn('_input_key', prediction.to_dict(encode_json=True))
@@ -0,0 +1,25 @@
+from unittest.mock import patch, MagicMock
+from ..base import BaseTestCase
+from model_serving.services.warmup_service import warmup_service
+
+
+class TestHealthRoutes(BaseTestCase):
+    @patch('model_serving.gateways.mlflow_gateway.MLFlowGateway._load_model')
+    def setUp(self, mock_load_model):
+        mock_load_model.return_value = MagicMock()
+        super().setUp()
+        self.client = self.app.test_client()
+
+    def test_ready_after_warm_up(self):
+        response = self.client.get('/ready')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['status'], 'ready')
+
+    def test_not_ready_during_warm_up(self):
+        warmup_service.ready.clear()
+
+        response = self.client.get('/ready')
+
+        self.assertEqual(response.status_code, 503)
+        warmup_service.ready.set()
@@ -1,10 +1,12 @@
 from unittest.mock import patch, MagicMock
 import json
 from ..base import BaseTestCase
-from model_serving.models.prediction import Prediction
+from model_serving.models.prediction import Prediction, Shap
 from model_serving.domain.common_enums import Labels, ModelType
+from model_serving.services.pagination import encode_cursor
 from model_serving.domain.exceptions import (
     ModelNotFoundException,
+    ExplanationNotFoundException,
     InvalidInputException,
     ModelTypeException,
     InferenceException
@@ -81,6 +83,37 @@ class TestPredictionRoutes(BaseTestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("error", response.json)
 
+    def test_create_batch_prediction_success(self):
+        with patch('model_serving.controllers.prediction.prediction_controller.create_predictions') as mock_create:
+            mock_predictions = []
+            for probability in [0.9, 0.2]:
+                mock_prediction = Prediction(inputs={"feature1": 1.0})
+                mock_prediction.value = Labels.MALIGNANT
+                mock_prediction.probability = probability
+                mock_predictions.append(mock_prediction)
+            mock_create.return_value = mock_predictions
+
+            response = self.client.post(
+                '/test_model/version/1/predict/batch',
+                json={'features': [{"feature1": 1.0}, {"feature1": 2.0}]}
+            )
+
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            self.assertEqual(len(data['predictions']), 2)
+            self.assertEqual(data['predictions'][0]['_value'], Labels.MALIGNANT.value)
+            self.assertEqual(data['predictions'][1]['_probability'], 0.2)
+            self.assertEqual(len(mock_create.call_args[1]['predictions']), 2)
+
+    def test_create_batch_prediction_requires_list(self):
+        response = self.client.post(
+            '/test_model/version/1/predict/batch',
+            json={'features': {"feature1": 1.0}}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json)
+
     def test_get_prediction_success(self):
         with patch('model_serving.controllers.prediction.prediction_controller.get_prediction') as mock_get:
             mock_prediction = Prediction(inputs={"feature1": 1.0})
@@ -104,3 +137,91 @@ class TestPredictionRoutes(BaseTestCase):
             
             self.assertEqual(response.status_code, 404)
             self.assertIn("Model Not Found", response.json['error'])
+
+    def test_get_explanation_success(self):
+        with patch('model_serving.controllers.prediction.prediction_controller.get_explanation') as mock_get:
+            mock_get.return_value = [Shap(label=Labels.BENIGN.value, shap_values={"feature1": 0.25})]
+
+            response = self.client.get('/prediction/test_id/explanation')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json['prediction_id'], 'test_id')
+            self.assertEqual(
+                response.json['explanations'], [{"label": Labels.BENIGN.value, "shap_values": {"feature1": 0.25}}]
+            )
+
+    def test_get_explanation_not_found(self):
+        with patch('model_serving.controllers.prediction.prediction_controller.get_explanation') as mock_get:
+            mock_get.side_effect = ExplanationNotFoundException("test_id")
+
+            response = self.client.get('/prediction/test_id/explanation')
+
+            self.assertEqual(response.status_code, 404)
+            self.assertIn("Explanation Not Found", response.json['error'])
+
+    def test_create_stream_prediction(self):
+        def score(model_name, model_version, records, chunk_size):
+            for line_number, record in records:
+                if isinstance(record, Prediction):
+                    record.value = 1.5
+                yield line_number, record
+
+        with patch('model_serving.controllers.prediction.prediction_controller.stream_predictions') as mock_stream:
+            mock_stream.side_effect = score
+
+            response = self.client.post(
+                '/test_model/version/1/predict/stream',
+                data='{"features": {"feature1": 1.0}}\n\n{"feature1": 2.0}\nnot json\n',
+                content_type='application/x-ndjson'
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'application/x-ndjson')
+
+            lines = [json.loads(line) for line in response.data.decode().splitlines()]
+            self.assertEqual([line['line'] for line in lines], [1, 3, 4])
+            self.assertEqual(lines[0]['prediction']['inputs'], {"feature1": 1.0})
+            self.assertEqual(lines[1]['prediction']['inputs'], {"feature1": 2.0})
+            self.assertEqual(lines[2]['error'], "Invalid Input")
+
+    def test_create_stream_prediction_model_not_found(self):
+        with patch('model_serving.controllers.prediction.prediction_controller.stream_predictions') as mock_stream:
+            mock_stream.side_effect = ModelNotFoundException(model_name="test_model", model_version="1")
+
+            response = self.client.post('/test_model/version/1/predict/stream', data='{"feature1": 1.0}\n')
+
+            self.assertEqual(response.status_code, 404)
+
+    def test_get_predictions_page(self):
+        with patch('model_serving.controllers.prediction.prediction_controller.list_predictions') as mock_list:
+            mock_list.return_value = ([Prediction(inputs={"feature1": 1.0})], "next")
+
+            response = self.client.get('/predictions?model=test_model&version=1&start=2024-01-01T00:00:00&limit=1')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json), 1)
+            self.assertEqual(response.headers['X-Next-Cursor'], "next")
+            self.assertEqual(mock_list.call_args.kwargs['model_name'], "test_model")
+            self.assertEqual(mock_list.call_args.kwargs['start'].year, 2024)
+
+    def test_get_predictions_invalid_time_range(self):
+        response = self.client.get('/predictions?start=yesterday')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_predictions_cursor_of_wrong_type(self):
+        cursor = encode_cursor([20240101, "id"])
+
+        response = self.client.get(f'/predictions?cursor={cursor}')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_predictions(self):
+        with patch('model_serving.controllers.prediction.prediction_controller.iter_predictions') as mock_iter:
+            mock_iter.return_value = iter([Prediction(inputs={"feature1": 1.0}), Prediction(inputs={"feature1": 2.0})])
+
+            response = self.client.get('/predictions/export?model=test_model')
+
+            self.assertEqual(response.status_code, 200)
+            lines = [json.loads(line) for line in response.data.decode().splitlines()]
+            self.assertEqual([line['inputs'] for line in lines], [{"feature1": 1.0}, {"feature1": 2.0}])
@@ -160,6 +160,69 @@ class TestUserRoutes(BaseTestCase):
         self.assertEqual(data[0]['user_name'], 'user1')
         self.assertEqual(data[1]['user_name'], 'user2')
 
+    def test_get_users_paginated(self):
+        for idx in range(3):
+            self.client.post('/users', json={'username': f'user{idx}', 'email': f'user{idx}@example.com'})
+
+        response = self.client.get('/users?limit=2')
+
+        self.assertEqual(response.status_code, 200)
+        first_page = json.loads(response.data)
+        self.assertEqual(len(first_page), 2)
+        self.assertIn('X-Next-Cursor', response.headers)
+
+        response = self.client.get(f"/users?limit=2&cursor={response.headers['X-Next-Cursor']}")
+
+        last_page = json.loads(response.data)
+        self.assertEqual(len(last_page), 1)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+        self.assertEqual(
+            sorted(user['user_name'] for user in first_page + last_page), ['user0', 'user1', 'user2']
+        )
+
+    def test_get_users_invalid_limit(self):
+        response = self.client.get('/users?limit=0')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_add_users_bulk(self):
+        self.client.post('/users', json={'username': 'existing', 'email': 'existing@example.com'})
+        self.app.config['USER_IMPORT_CHUNK_SIZE'] = 2
+
+        response = self.client.post('/users/bulk', json=[
+            {'username': 'user0', 'email': 'user0@example.com'},
+            {'username': 'user1', 'email': 'existing@example.com'},
+            {'username': 'user2', 'email': 'user0@example.com'},
+            {'email': 'user3@example.com'},
+            {'username': 'existing', 'email': 'user4@example.com'},
+            {'username': 'user5', 'email': 'user5@example.com'},
+            {'username': 'user6', 'email': 'user6@example.com'}
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual((data['created'], data['failed']), (3, 4))
+        self.assertEqual(
+            [result['status'] for result in data['results']],
+            ['created', 'error', 'error', 'error', 'error', 'created', 'created']
+        )
+        self.assertEqual(data['results'][1]['message'], 'Email already exists')
+        self.assertEqual(data['results'][3]['message'], 'Invalid request data')
+
+        response = self.client.get('/users/export')
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        exported = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(
+            sorted(user['user_name'] for user in exported), ['existing', 'user0', 'user5', 'user6']
+        )
+        self.assertIn(data['results'][0]['id'], [user['id'] for user in exported])
+
+    def test_add_users_bulk_requires_list(self):
+        response = self.client.post('/users/bulk', json={'username': 'user0', 'email': 'user0@example.com'})
+
+        self.assertEqual(response.status_code, 400)
+
     def test_get_all_users_empty(self):
         response = self.client.get('/users')
         
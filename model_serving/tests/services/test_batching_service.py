@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from model_serving.tests.base import create_metrics_dir
+
+create_metrics_dir()
+
+from model_serving.services.batching_service import MicroBatchingService
+from model_serving.models.prediction import Prediction, Model
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+class TestMicroBatchingService(unittest.TestCase):
+    def setUp(self):
+        self.service = MicroBatchingService()
+        self.service.enabled = True
+        self.service.max_latency_ms = 50
+
+        self.model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.CLASSIFICATION.value,
+            threshold={'value': 0.5, 'above': Labels.BENIGN, 'below': Labels.MALIGNANT, 'equal': Labels.BENIGN}
+        )
+        self.model.model = MagicMock()
+
+    def test_single_request(self):
+        self.model.model.predict_proba.return_value = np.array([[0.2, 0.8]])
+
+        prediction = self.service.create_inference(self.model, Prediction(inputs={"feature1": 1.0}))
+
+        self.assertEqual(prediction.value, Labels.MALIGNANT)
+        self.assertEqual(prediction.probability, 0.8)
+
+    def test_concurrent_requests_are_batched(self):
+        release = threading.Event()
+        in_flight = []
+        batch_sizes = []
+
+        def predict_proba(frame):
+            # Hold the first call so the remaining requests queue up behind it
+            in_flight.append(len(frame))
+            release.wait(timeout=5)
+            batch_sizes.append(len(frame))
+            return np.column_stack([1 - frame['feature1'].to_numpy(), frame['feature1'].to_numpy()])
+
+        self.model.model.predict_proba.side_effect = predict_proba
+
+        results = {}
+
+        def submit(value):
+            results[value] = self.service.create_inference(self.model, Prediction(inputs={"feature1": value}))
+
+        threads = [threading.Thread(target=submit, args=(value,)) for value in [0.1, 0.2, 0.7, 0.9]]
+        threads[0].start()
+        while not self.service._queues:
+            pass
+        for thread in threads[1:]:
+            thread.start()
+        requests = self.service._queues[("test_model", "1")]
+        while requests.qsize() + sum(in_flight) < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(sum(batch_sizes), 4)
+        self.assertLess(len(batch_sizes), 4)
+        self.assertEqual(results[0.9].probability, 0.9)
+        self.assertEqual(results[0.9].value, Labels.MALIGNANT)
+        self.assertEqual(results[0.1].value, Labels.BENIGN)
+
+    def test_errors_are_propagated(self):
+        self.model.model.predict_proba.side_effect = Exception("Inference failed")
+
+        with self.assertRaises(Exception):
+            self.service.create_inference(self.model, Prediction(inputs={"feature1": 1.0}))
+
+    def test_init_app(self):
+        app = MagicMock()
+        app.config = {'MICRO_BATCHING': {'enabled': True, 'max_batch_size': 8, 'max_latency_ms': 5}}
+
+        gateway = MagicMock()
+
+        service = MicroBatchingService()
+        service.init_app(app, gateway)
+
+        self.assertTrue(service.enabled)
+        self.assertEqual(service.max_batch_size, 8)
+        self.assertEqual(service.max_latency_ms, 5)
+        gateway.add_evict_listener.assert_called_once_with(service.discard)
+
+    def test_discard_stops_worker(self):
+        self.model.model.predict_proba.return_value = np.array([[0.2, 0.8]])
+        running = set(threading.enumerate())
+        self.service.create_inference(self.model, Prediction(inputs={"feature1": 1.0}))
+        worker, = set(threading.enumerate()) - running
+
+        self.service.discard("test_model", "1")
+        worker.join(timeout=5)
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(self.service._queues, {})
+
+        # The version is served again by a fresh worker once it's reloaded
+        prediction = self.service.create_inference(self.model, Prediction(inputs={"feature1": 1.0}))
+        self.assertEqual(prediction.probability, 0.8)
+
+    def test_queues_recreated_after_fork(self):
+        self.model.model.predict_proba.return_value = np.array([[0.2, 0.8]])
+        self.service.create_inference(self.model, Prediction(inputs={"feature1": 1.0}))
+        inherited = self.service._queues[("test_model", "1")]
+
+        # As seen from a forked child, whose copy of the worker thread doesn't exist
+        self.service._pid = -1
+        prediction = self.service.create_inference(self.model, Prediction(inputs={"feature1": 1.0}))
+
+        self.assertEqual(prediction.probability, 0.8)
+        self.assertIsNot(self.service._queues[("test_model", "1")], inherited)
@@ -0,0 +1,112 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from model_serving.tests.base import create_metrics_dir
+
+create_metrics_dir()
+
+from model_serving.services.cache_service import CacheService, ResultCache, cache_service
+from model_serving.services.explainer_service import ExplainerService
+from model_serving.services.umap_service import umap_service
+from model_serving.models.prediction import Model, Prediction
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResultCache(max_size=2)
+        cache.set(("model", "1", "a"), 1)
+        cache.set(("model", "1", "b"), 2)
+        cache.get(("model", "1", "a"))
+        cache.set(("model", "1", "c"), 3)
+
+        self.assertEqual(cache.get(("model", "1", "a")), 1)
+        self.assertIsNone(cache.get(("model", "1", "b")))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        cache = ResultCache(ttl_seconds=0.01)
+        cache.set(("model", "1", "a"), 1)
+
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get(("model", "1", "a")))
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate_model_version(self):
+        cache = ResultCache()
+        cache.set(("model", "1", "a"), 1)
+        cache.set(("model", "2", "a"), 2)
+
+        cache.invalidate("model", "1")
+
+        self.assertIsNone(cache.get(("model", "1", "a")))
+        self.assertEqual(cache.get(("model", "2", "a")), 2)
+
+
+class TestCachedResults(unittest.TestCase):
+    def setUp(self):
+        app = MagicMock()
+        app.config = {'RESULT_CACHE': {'enabled': True, 'max_size': 100}}
+        self.gateway = MagicMock()
+        cache_service.init_app(app, self.gateway)
+
+        self.model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.CLASSIFICATION.value,
+            labels=[Labels.BENIGN, Labels.MALIGNANT]
+        )
+
+    def tearDown(self):
+        cache_service.enabled = False
+        cache_service.explanations.clear()
+        cache_service.embeddings.clear()
+
+    def test_init_app_invalidates_on_reload(self):
+        self.gateway.add_load_listener.assert_called_once_with(cache_service.invalidate)
+
+        cache_service.embeddings.set(("test_model", "1", "a"), [0.1, 0.2])
+        cache_service.invalidate(self.model)
+
+        self.assertEqual(len(cache_service.embeddings), 0)
+
+    def test_disabled_by_config(self):
+        service = CacheService()
+        app = MagicMock()
+        app.config = {}
+        service.init_app(app, MagicMock())
+
+        self.assertEqual(service.get_many(service.embeddings, self.model, [Prediction(inputs={"f": 1.0})]), [None])
+
+    def test_explanations_are_cached(self):
+        self.model._explainer = MagicMock(spec=['predict'])
+        self.model._explainer.predict.side_effect = lambda inputs: np.ones((len(inputs), 1, 2))
+
+        first = ExplainerService.create_explanation(self.model, Prediction(inputs={"feature1": 1.0}))
+        batch = ExplainerService.create_explanations(
+            self.model, [Prediction(inputs={"feature1": 1}), Prediction(inputs={"feature1": 2.0})]
+        )
+
+        # Only the new input reached the explainer
+        self.assertEqual(self.model._explainer.predict.call_count, 2)
+        self.assertEqual(len(self.model._explainer.predict.call_args[0][0]), 1)
+        self.assertEqual(batch[0].shap_values[1].shap_values, first.shap_values[1].shap_values)
+        self.assertNotEqual(batch[0].shap_values[1].id, first.shap_values[1].id)
+
+    def test_embeddings_are_cached(self):
+        self.model._umap = MagicMock()
+        self.model._umap.transform.side_effect = lambda inputs: np.full((len(inputs), 2), 0.5)
+        prediction = Prediction(inputs={"feature1": 1.0})
+
+        umap_service.create_embedding(self.model, prediction)
+        embeddings = umap_service.create_embeddings(
+            self.model, [Prediction(inputs={"feature1": 1.0}), Prediction(inputs={"feature1": 3.0})]
+        )
+
+        self.assertEqual(embeddings, [[0.5, 0.5], [0.5, 0.5]])
+        self.assertEqual(self.model._umap.transform.call_count, 2)
+        self.assertEqual(len(self.model._umap.transform.call_args[0][0]), 1)
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from model_serving.tests.base import create_metrics_dir
+create_metrics_dir()
+
+from model_serving.services.database.database_client import set_sqlite_pragmas
+
+
+class TestSQLitePragmas(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory, 'test.db')}")
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_pragmas_are_set_on_new_connections(self):
+        set_sqlite_pragmas(self.engine, {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -2000})
+
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+            self.assertEqual(connection.execute(text('PRAGMA synchronous')).scalar(), 1)
+            self.assertEqual(connection.execute(text('PRAGMA cache_size')).scalar(), -2000)
+
+    def test_invalid_pragma_is_rejected(self):
+        with self.assertRaises(ValueError):
+            set_sqlite_pragmas(self.engine, {"journal_mode": "WAL; DROP TABLE users"})
+
+    def test_no_pragmas_keeps_defaults(self):
+        set_sqlite_pragmas(self.engine, {})
+
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('PRAGMA journal_mode')).scalar(), 'delete')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from model_serving.services.database.encoding import CompactEncoding, DTYPES
+
+
+class TestCompactEncoding(unittest.TestCase):
+    def setUp(self):
+        self.encoding = CompactEncoding()
+
+    def test_round_trip_is_exact_in_float64(self):
+        values = [9.029, -0.1, 1e-12, 250.5]
+
+        blob = self.encoding.encode(values)
+
+        self.assertEqual(len(blob), 1 + 8 * len(values))
+        self.assertEqual(self.encoding.decode(blob), values)
+
+    def test_float32_blobs_decode_without_configuration(self):
+        float32 = CompactEncoding()
+        float32.dtype = DTYPES['float32']
+
+        blob = float32.encode([0.5, 1.25])
+
+        self.assertEqual(len(blob), 1 + 4 * 2)
+        self.assertEqual(self.encoding.decode(blob), [0.5, 1.25])
+
+    def test_mapping_is_stored_in_header_order(self):
+        feature_names = ["b", "a"]
+
+        blob = self.encoding.encode_mapping({"a": 1.0, "b": 2.0}, feature_names)
+
+        self.assertEqual(self.encoding.decode(blob), [2.0, 1.0])
+        self.assertEqual(self.encoding.decode_mapping(blob, feature_names), {"b": 2.0, "a": 1.0})
+
+    def test_mapping_not_matching_header_is_not_encoded(self):
+        self.assertIsNone(self.encoding.encode_mapping({"a": 1.0, "c": 2.0}, ["a", "b"]))
+        self.assertIsNone(self.encoding.encode_mapping({"a": 1.0}, ["a", "b"]))
+        self.assertIsNone(self.encoding.encode_mapping({"a": 1.0}, None))
+
+    def test_nested_values_are_not_encoded(self):
+        self.assertIsNone(self.encoding.encode([[0.1, 0.2], [0.3, 0.4]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import queue
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from model_serving.tests.base import BaseTestCase
+from model_serving.services.database.database_client import db
+from model_serving.services.database.prediction import PredictionSQL
+from model_serving.services.enrichment_service import EnrichmentService
+from model_serving.controllers.prediction import prediction_controller
+from model_serving.models.prediction import Prediction, Model
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+class TestEnrichmentService(BaseTestCase):
+    @patch('model_serving.gateways.mlflow_gateway.MLFlowGateway._load_model')
+    def setUp(self, mock_load_model):
+        mock_load_model.return_value = MagicMock()
+        super().setUp()
+
+        self.service = EnrichmentService()
+        self.app.config['ASYNC_ENRICHMENT'] = {'enabled': True, 'workers': 1}
+        self.service.init_app(self.app)
+
+        self.model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.CLASSIFICATION.value,
+            labels=[Labels.BENIGN, Labels.MALIGNANT]
+        )
+        self.model._explainer = MagicMock()
+        self.model._explainer.predict.return_value = np.array([[[0.1, -0.1], [0.2, -0.2]]])
+
+        self.prediction = Prediction(inputs={"feature1": 1.0, "feature2": 2.0})
+        with self.app.app_context():
+            db.session.add(PredictionSQL(
+                id=self.prediction.id, inputs='{"feature1": 1.0, "feature2": 2.0}', value=Labels.BENIGN.value,
+                model_id=self.model.id
+            ))
+            db.session.commit()
+
+    @patch('model_serving.services.enrichment_service.umap_service')
+    def test_enrichment_is_written_to_stored_prediction(self, mock_umap):
+        mock_umap.create_embedding.return_value = [0.1, 0.2]
+
+        self.service.submit(self.model, [self.prediction])
+        self.service.join()
+
+        with self.app.app_context():
+            row = db.session.get(PredictionSQL, self.prediction.id)
+            self.assertEqual(row.embeddings, '[0.1, 0.2]')
+
+            shaps = {shap.type: shap.to_shap().shap_values for shap in row.shaps}
+            self.assertEqual(shaps[Labels.BENIGN.value], {"feature1": 0.1, "feature2": 0.2})
+            self.assertEqual(shaps[Labels.MALIGNANT.value], {"feature1": -0.1, "feature2": -0.2})
+
+    @patch('model_serving.services.enrichment_service.umap_service')
+    def test_enrichment_failure_does_not_stop_worker(self, mock_umap):
+        mock_umap.create_embedding.side_effect = [Exception("UMAP failed"), [0.3, 0.4]]
+
+        with self.assertLogs(level='ERROR'):
+            self.service.submit(self.model, [self.prediction])
+            self.service.join()
+
+        self.service.submit(self.model, [self.prediction])
+        self.service.join()
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(PredictionSQL, self.prediction.id).embeddings, '[0.3, 0.4]')
+
+    @patch('model_serving.services.enrichment_service.umap_service')
+    def test_full_queue_enriches_inline(self, mock_umap):
+        mock_umap.create_embedding.return_value = [0.5, 0.6]
+
+        with self.app.app_context():
+            with patch.object(self.service, '_get_queue') as mock_queue:
+                mock_queue.return_value.put_nowait.side_effect = queue.Full
+                self.service.submit(self.model, [self.prediction])
+
+            self.assertEqual(db.session.get(PredictionSQL, self.prediction.id).embeddings, '[0.5, 0.6]')
+
+    @patch('model_serving.controllers.prediction.enrichment_service')
+    @patch('model_serving.controllers.prediction.umap_service')
+    @patch('model_serving.controllers.prediction.mlflow_gateway')
+    def test_controller_defers_enrichment(self, mock_gateway, mock_umap, mock_enrichment):
+        mock_enrichment.enabled = True
+        model = MagicMock()
+        model.model_type = ModelType.REGRESSION.value
+        model.model_name = "test_model"
+        model.model_version = "1"
+        model.id = self.model.id
+        model.feature_names = None
+        model.model.predict.return_value = np.array([1.5])
+        mock_gateway.get_model.return_value = model
+
+        with self.app.app_context():
+            prediction = prediction_controller.create_prediction("test_model", "1", Prediction(inputs={"feature1": 1.0}))
+
+        self.assertEqual(prediction.value, 1.5)
+        mock_umap.create_embedding.assert_not_called()
+        mock_enrichment.submit.assert_called_once_with(model, [prediction])
@@ -199,6 +199,45 @@ class TestExplainerService:
         assert isinstance(result["label"], float)
         assert result["shap_values"] == shap_dict
 
+    def test_create_explanations_batch(self, mock_model):
+        """A batch is explained with one explainer call and split back per row and label"""
+        predictions = [Prediction(inputs={"feature_1": float(i), "feature_2": 0.0}) for i in range(4)]
+        mock_model.labels = [Labels.MALIGNANT, Labels.BENIGN]
+        mock_model.feature_names = ["feature_1", "feature_2"]
+
+        shap_values = np.arange(16, dtype=float).reshape(4, 2, 2)
+        mock_model._explainer.predict.return_value = shap_values
+
+        result = ExplainerService.create_explanations(mock_model, predictions)
+
+        mock_model._explainer.predict.assert_called_once()
+        assert mock_model._explainer.predict.call_args[0][0].shape == (4, 2)
+        assert result[2].shap_values[0].label == Labels.MALIGNANT.value
+        assert result[2].shap_values[0].shap_values == {"feature_1": 8.0, "feature_2": 10.0}
+        assert result[2].shap_values[1].shap_values == {"feature_1": 9.0, "feature_2": 11.0}
+        assert all(isinstance(value, float) for value in result[3].shap_values[1].shap_values.values())
+
+    def test_create_explanations_native_shap_values(self, mock_model):
+        """TreeSHAP-style explainers returning one matrix per class are evaluated natively"""
+        predictions = [Prediction(inputs={"feature_1": 1.0}), Prediction(inputs={"feature_1": 2.0})]
+        mock_model.labels = [Labels.MALIGNANT, Labels.BENIGN]
+        mock_model._explainer = Mock(spec=['shap_values'])
+        mock_model._explainer.shap_values.return_value = [np.array([[0.1], [0.2]]), np.array([[-0.1], [-0.2]])]
+
+        result = ExplainerService.create_explanations(mock_model, predictions)
+
+        assert result[1].shap_values[0].shap_values == {"feature_1": 0.2}
+        assert result[1].shap_values[1].shap_values == {"feature_1": -0.2}
+
+    def test_create_explanations_error_handling(self, mock_model):
+        predictions = [Prediction(inputs={"feature_1": 1.0})]
+        mock_model._explainer.predict.side_effect = Exception("SHAP calculation failed")
+
+        result = ExplainerService.create_explanations(mock_model, predictions)
+
+        assert result == predictions
+        assert len(result[0].shap_values) == 0
+
     @pytest.mark.parametrize("invalid_shape", [
         np.array([0.1]),  # 1D array
         np.array([[[[0.1]]]]),  # 4D array
@@ -1,4 +1,5 @@
 import unittest
+import warnings
 from unittest.mock import MagicMock, patch
 import numpy as np
 import pandas as pd
@@ -66,6 +67,108 @@ class TestInferenceService(unittest.TestCase):
         self.assertEqual(prediction.value, 42.0)
         self.assertIsNone(prediction.probability)
 
+    def test_batch_classification_single_model_call(self):
+        mock_model = MagicMock()
+        mock_model.model_type = ModelType.CLASSIFICATION.value
+        mock_model.model.predict_proba.return_value = np.array([[0.2, 0.8], [0.7, 0.3], [0.5, 0.5]])
+        mock_model.threshold = {
+            'value': 0.5,
+            'above': Labels.BENIGN,
+            'below': Labels.MALIGNANT,
+            'equal': Labels.BENIGN
+        }
+        predictions = [Prediction(inputs={"feature1": float(i), "feature2": 2.0}) for i in range(3)]
+
+        result = inference_service.create_batch_inference(mock_model, predictions)
+
+        mock_model.model.predict_proba.assert_called_once()
+        frame = mock_model.model.predict_proba.call_args[0][0]
+        self.assertEqual(frame.shape, (3, 2))
+        self.assertEqual([p.value for p in result], [Labels.MALIGNANT, Labels.BENIGN, Labels.BENIGN])
+        self.assertEqual([p.probability for p in result], [0.8, 0.3, 0.5])
+
+    def test_batch_regression_single_model_call(self):
+        mock_model = MagicMock()
+        mock_model.model_type = ModelType.REGRESSION.value
+        mock_model.model.predict.return_value = np.array([1.5, 2.5])
+        predictions = [Prediction(inputs=self.sample_inputs), Prediction(inputs=self.sample_inputs)]
+
+        result = inference_service.create_batch_inference(mock_model, predictions)
+
+        mock_model.model.predict.assert_called_once()
+        self.assertEqual([p.value for p in result], [1.5, 2.5])
+        self.assertIsNone(result[0].probability)
+
+    def test_classification_ndarray_fast_path(self):
+        mock_model = MagicMock()
+        mock_model.model_type = ModelType.CLASSIFICATION.value
+        mock_model.mlflow_flavor = 'sklearn'
+        mock_model.feature_names = ["feature2", "feature1"]
+        mock_model.model.predict_proba.return_value = np.array([[0.3, 0.8]])
+        mock_model.threshold = {
+            'value': 0.5,
+            'above': Labels.BENIGN.value,
+            'below': Labels.MALIGNANT.value,
+            'equal': Labels.BENIGN.value
+        }
+
+        prediction = inference_service.create_inference(mock_model, Prediction(inputs=self.sample_inputs))
+
+        model_inputs = mock_model.model.predict_proba.call_args[0][0]
+        self.assertIsInstance(model_inputs, np.ndarray)
+        np.testing.assert_array_equal(model_inputs, np.array([[2.0, 1.0]]))
+        self.assertEqual(prediction.probability, 0.8)
+
+    def test_regression_ndarray_fast_path(self):
+        mock_model = MagicMock()
+        mock_model.model_type = ModelType.REGRESSION.value
+        mock_model.mlflow_flavor = 'sklearn'
+        mock_model.feature_names = ["feature2", "feature1"]
+        mock_model.model.predict.return_value = np.array([4.2])
+
+        prediction = inference_service.create_inference(mock_model, Prediction(inputs=self.sample_inputs))
+
+        model_inputs = mock_model.model.predict.call_args[0][0]
+        self.assertIsInstance(model_inputs, np.ndarray)
+        np.testing.assert_array_equal(model_inputs, np.array([[2.0, 1.0]]))
+        self.assertEqual(prediction.value, 4.2)
+
+    def test_feature_names_warning_only_ignored_during_ndarray_calls(self):
+        from sklearn.linear_model import LinearRegression
+
+        model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.REGRESSION.value,
+            mlflow_flavor="sklearn",
+            feature_names=["feature1", "feature2"]
+        )
+        fitted_inputs = pd.DataFrame({"feature1": [0.0, 1.0, 2.0], "feature2": [1.0, 0.0, 1.0]})
+        model.model = LinearRegression().fit(fitted_inputs, [0.0, 1.0, 2.0])
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+
+            inference_service.create_inference(model, Prediction(inputs=self.sample_inputs))
+            inference_service.create_batch_inference(model, [Prediction(inputs=self.sample_inputs)])
+            self.assertEqual(caught, [])
+
+            # Outside the model call the warning is sklearn's to raise as usual
+            model.model.predict(np.array([[1.0, 2.0]]))
+            self.assertIn('feature names', str(caught[0].message))
+
+    def test_pyfunc_keeps_pandas_path(self):
+        mock_model = MagicMock()
+        mock_model.model_type = ModelType.CLASSIFICATION.value
+        mock_model.mlflow_flavor = 'pyfunc'
+        mock_model.feature_names = ["feature1", "feature2"]
+        mock_model.model.predict_proba.return_value = np.array([[0.3, 0.8]])
+        mock_model.threshold = {'value': 0.5, 'above': Labels.BENIGN, 'below': Labels.MALIGNANT, 'equal': Labels.BENIGN}
+
+        inference_service.create_batch_inference(mock_model, [Prediction(inputs=self.sample_inputs)])
+
+        self.assertIsInstance(mock_model.model.predict_proba.call_args[0][0], pd.DataFrame)
+
     def test_prepare_inputs(self):
         # Test input preparation
         inputs = {"feature1": 1.0, "feature2": 2.0}
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from model_serving.services.mapped_trees import MappedTrees
+from model_serving.services.tree_explainer import TreeExplainer
+
+
+class TestMappedTrees(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(200, 4))
+        self.y = (self.X[:, 0] + self.X[:, 1] * self.X[:, 2] > 0).astype(int)
+
+    def _map(self, model):
+        path = os.path.join(tempfile.mkdtemp(), 'model.trees')
+        MappedTrees.save(model, path)
+        return MappedTrees.load(path)
+
+    def test_forest_classifier_matches_sklearn(self):
+        model = RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, np.array(['a', 'b'])[self.y])
+        mapped = self._map(model)
+
+        np.testing.assert_allclose(mapped.predict_proba(self.X), model.predict_proba(self.X))
+        np.testing.assert_array_equal(mapped.predict(self.X), model.predict(self.X))
+        self.assertIsInstance(mapped.value, np.memmap)
+        self.assertIsInstance(mapped.estimators_[0].tree_.threshold, np.memmap)
+
+    def test_regressor_and_single_tree_match_sklearn(self):
+        regressor = ExtraTreesRegressor(n_estimators=5, random_state=0).fit(self.X, self.X[:, 0] * 2 + self.X[:, 3])
+        tree = DecisionTreeClassifier(max_depth=3, random_state=0).fit(self.X, self.y)
+
+        np.testing.assert_allclose(self._map(regressor).predict(self.X), regressor.predict(self.X))
+        np.testing.assert_array_equal(self._map(tree).predict(self.X), tree.predict(self.X))
+
+    def test_missing_values_follow_trained_direction(self):
+        X = self.X.copy()
+        X[::7, 1] = np.nan
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, self.y)
+
+        np.testing.assert_allclose(self._map(model).predict_proba(X), model.predict_proba(X))
+
+    def test_dataframe_columns_selected_by_name(self):
+        frame = pd.DataFrame(self.X, columns=['a', 'b', 'c', 'd'])
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(frame, self.y)
+
+        reordered = frame[['d', 'c', 'b', 'a']]
+        np.testing.assert_allclose(self._map(model).predict_proba(reordered), model.predict_proba(frame))
+
+    def test_tree_explainer_on_mapped_model(self):
+        model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(self.X, self.y)
+
+        expected = TreeExplainer(model)
+        explainer = TreeExplainer(self._map(model))
+
+        np.testing.assert_allclose(explainer.expected_value, expected.expected_value)
+        np.testing.assert_allclose(explainer.shap_values(self.X[:5]), expected.shap_values(self.X[:5]))
+
+    def test_supports(self):
+        self.assertTrue(MappedTrees.supports(RandomForestClassifier().fit(self.X, self.y)))
+        self.assertFalse(MappedTrees.supports(GradientBoostingClassifier(n_estimators=2).fit(self.X, self.y)))
+        self.assertFalse(MappedTrees.supports(RandomForestClassifier().fit(self.X, np.c_[self.y, self.y])))
+
+
+if __name__ == '__main__':
+    unittest.main()
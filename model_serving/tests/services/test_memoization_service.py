@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from model_serving.tests.base import create_metrics_dir
+
+create_metrics_dir()
+
+from model_serving.services.memoization_service import MemoizationService, SQLiteBackend
+from model_serving.models.prediction import Model, Prediction, Shap
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+class TestMemoizationService(unittest.TestCase):
+    backend_config = {'backend': 'memory'}
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        app = MagicMock()
+        app.config = {'PREDICTION_CACHE': {
+            'enabled': True, 'max_size': 10, 'path': os.path.join(self.temp_dir.name, 'cache.db'), **self.backend_config
+        }}
+        self.gateway = MagicMock()
+        self.service = MemoizationService()
+        self.service.init_app(app, self.gateway)
+
+        self.model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.CLASSIFICATION.value,
+            labels=[Labels.BENIGN, Labels.MALIGNANT]
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _scored_prediction(self, inputs):
+        prediction = Prediction(inputs=inputs)
+        prediction.value = Labels.MALIGNANT
+        prediction.probability = 0.8
+        prediction.threshold = 0.5
+        prediction.embeddings = [0.1, 0.2]
+        prediction.shap_values = [Shap(label=Labels.MALIGNANT.value, shap_values={"feature1": 0.3})]
+        return prediction
+
+    @patch('model_serving.services.memoization_service.PREDICTION_CACHE_HITS')
+    @patch('model_serving.services.memoization_service.PREDICTION_CACHE_MISSES')
+    def test_round_trip(self, mock_misses, mock_hits):
+        self.assertFalse(self.service.get(self.model, Prediction(inputs={"feature1": 1.0})))
+        mock_misses.inc.assert_called_once()
+
+        self.service.set(self.model, self._scored_prediction({"feature1": 1.0}))
+
+        prediction = Prediction(inputs={"feature1": 1})
+        self.assertTrue(self.service.get(self.model, prediction))
+        mock_hits.inc.assert_called_once()
+
+        self.assertEqual(prediction.value, Labels.MALIGNANT)
+        self.assertEqual(prediction.probability, 0.8)
+        self.assertEqual(prediction.threshold, 0.5)
+
+        # Only the inference result is memoized, embeddings and explanations are computed as for a miss
+        self.assertIsNone(prediction.embeddings)
+        self.assertFalse(prediction.shap_values)
+
+    def test_invalidated_on_reload(self):
+        self.gateway.add_load_listener.assert_called_once_with(self.service.invalidate)
+        self.service.set(self.model, self._scored_prediction({"feature1": 1.0}))
+
+        self.service.invalidate(self.model)
+
+        self.assertFalse(self.service.get(self.model, Prediction(inputs={"feature1": 1.0})))
+
+    def test_loaded_versions_invalidated_at_start(self):
+        self.service.set(self.model, self._scored_prediction({"feature1": 1.0}))
+        app = MagicMock()
+        app.config = {'PREDICTION_CACHE': {'enabled': True, **self.backend_config}}
+        self.gateway.get_loaded_versions.return_value = [("test_model", "1")]
+
+        # A restart, possibly with a new threshold, over the same backend
+        backend = self.service.backend
+        with patch.dict('model_serving.services.memoization_service.BACKENDS', {backend.name: lambda **config: backend}):
+            self.service.init_app(app, self.gateway)
+
+        self.assertFalse(self.service.get(self.model, Prediction(inputs={"feature1": 1.0})))
+
+    def test_versions_are_separate(self):
+        self.service.set(self.model, self._scored_prediction({"feature1": 1.0}))
+        other_version = Model(model_name="test_model", model_version="2", model_type=ModelType.CLASSIFICATION.value)
+
+        self.assertFalse(self.service.get(other_version, Prediction(inputs={"feature1": 1.0})))
+
+    @patch('model_serving.services.memoization_service.PREDICTION_CACHE_EVICTIONS')
+    def test_evictions_are_counted(self, mock_evictions):
+        self.service.backend.EVICTION_INTERVAL = 1
+        for value in range(12):
+            self.service.set(self.model, self._scored_prediction({"feature1": float(value)}))
+
+        evicted = sum(call.args[0] for call in mock_evictions.inc.call_args_list)
+        self.assertEqual(evicted, 2)
+        self.assertFalse(self.service.get(self.model, Prediction(inputs={"feature1": 0.0})))
+        self.assertTrue(self.service.get(self.model, Prediction(inputs={"feature1": 11.0})))
+
+
+class TestSQLiteMemoizationService(TestMemoizationService):
+    backend_config = {'backend': 'sqlite'}
+
+    def test_shared_between_instances(self):
+        self.assertIsInstance(self.service.backend, SQLiteBackend)
+        self.service.set(self.model, self._scored_prediction({"feature1": 1.0}))
+
+        other = SQLiteBackend(self.service.backend.path)
+
+        self.assertIsNotNone(other.get(("test_model", "1", Prediction(inputs={"feature1": 1.0}).input_key)))
+
+
+class TestMemoizationConfig(unittest.TestCase):
+    def test_disabled_by_default(self):
+        app = MagicMock()
+        app.config = {}
+        service = MemoizationService()
+        service.init_app(app, MagicMock())
+
+        self.assertFalse(service.enabled)
+
+    def test_unknown_backend(self):
+        app = MagicMock()
+        app.config = {'PREDICTION_CACHE': {'enabled': True, 'backend': 'redis'}}
+
+        with self.assertRaises(ValueError):
+            MemoizationService().init_app(app, MagicMock())
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, inspect, text
+
+from model_serving.tests.base import create_metrics_dir
+create_metrics_dir()
+
+from model_serving.services.database.migrations import run_migrations
+
+
+OLD_SCHEMA = [
+    'CREATE TABLE models (id VARCHAR(120) NOT NULL, model_type VARCHAR(250) NOT NULL, '
+    'model_name VARCHAR(240) NOT NULL, model_version INTEGER, updated DATETIME NOT NULL, created DATETIME NOT NULL, '
+    'PRIMARY KEY (id), UNIQUE (model_name), UNIQUE (model_version))',
+    'CREATE TABLE predictions (id VARCHAR(120) NOT NULL, inputs CLOB NOT NULL, value VARCHAR(120), '
+    'probability NUMERIC, actual NUMERIC, embeddings CLOB, updated DATETIME NOT NULL, created DATETIME NOT NULL, '
+    'model_id VARCHAR(120) NOT NULL, PRIMARY KEY (id), FOREIGN KEY(model_id) REFERENCES models (id))',
+    "INSERT INTO models (id, model_type, model_name, model_version, updated, created) "
+    "VALUES ('m1', 'classification', 'model', 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00')",
+    "INSERT INTO predictions (id, inputs, value, updated, created, model_id) "
+    "VALUES ('p1', '{\"feature1\": 1.0}', 'B', '2024-01-01 00:00:00', '2024-01-01 00:00:00', 'm1')"
+]
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+        with self.engine.begin() as connection:
+            for statement in OLD_SCHEMA:
+                connection.execute(text(statement))
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_indexes_are_added(self):
+        run_migrations(self.engine)
+
+        indexes = {index['name']: index['column_names'] for index in inspect(self.engine).get_indexes('predictions')}
+        self.assertEqual(indexes['ix_predictions_model_id_created'], ['model_id', 'created'])
+        self.assertEqual(indexes['ix_predictions_created'], ['created'])
+
+    def test_models_get_composite_unique_constraint(self):
+        run_migrations(self.engine)
+
+        inspector = inspect(self.engine)
+        self.assertEqual(
+            [constraint['column_names'] for constraint in inspector.get_unique_constraints('models')],
+            [['model_name', 'model_version']]
+        )
+        self.assertEqual(inspector.get_foreign_keys('predictions')[0]['referred_table'], 'models')
+
+        with self.engine.begin() as connection:
+            self.assertEqual(connection.execute(text('SELECT id FROM models')).scalars().all(), ['m1'])
+            # A second version of the same model used to violate UNIQUE (model_name)
+            connection.execute(text(
+                "INSERT INTO models (id, model_type, model_name, model_version, updated, created) "
+                "VALUES ('m2', 'classification', 'model', 2, '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+            ))
+
+    def test_compact_encoding_columns_are_added(self):
+        run_migrations(self.engine)
+
+        inspector = inspect(self.engine)
+        columns = {column['name']: column for column in inspector.get_columns('predictions')}
+        self.assertIn('inputs_blob', columns)
+        self.assertIn('embeddings_blob', columns)
+        self.assertTrue(columns['inputs']['nullable'])
+        self.assertIn('feature_names', {column['name'] for column in inspector.get_columns('models')})
+
+        with self.engine.begin() as connection:
+            self.assertEqual(
+                connection.execute(text('SELECT inputs FROM predictions WHERE id = :id'), {'id': 'p1'}).scalar(),
+                '{"feature1": 1.0}'
+            )
+
+    def test_migrations_are_idempotent(self):
+        run_migrations(self.engine)
+        run_migrations(self.engine)
+
+        self.assertEqual(len(inspect(self.engine).get_indexes('predictions')), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from model_serving.services.neighbor_index import NeighborIndex
+
+
+class TestNeighborIndex(unittest.TestCase):
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.data = random.rand(2000, 5)
+        # A linear "embedding" so interpolated positions can be checked exactly
+        self.embedding = self.data[:, :2] * 10
+        self.index = NeighborIndex(self.data, self.embedding, n_trees=8, leaf_size=32, n_neighbors=10)
+
+    def test_query_recall(self):
+        points = np.random.RandomState(1).rand(50, 5)
+
+        indices, distances = self.index.query(points)
+
+        exact = np.argsort(((points[:, None, :] - self.data[None, :, :]) ** 2).sum(axis=2), axis=1)[:, :10]
+        recall = np.mean([len(set(found) & set(expected)) / 10 for found, expected in zip(indices, exact)])
+
+        self.assertGreater(recall, 0.9)
+        self.assertTrue(np.all(np.diff(distances, axis=1) >= 0))
+
+    def test_transform_training_point(self):
+        embeddings = self.index.transform(self.data[:3])
+
+        # The training point itself dominates the weights and its neighbors lie close by in the embedding
+        np.testing.assert_allclose(embeddings, self.embedding[:3], atol=1.0)
+        self.assertEqual(embeddings.shape, (3, 2))
+
+    def test_transform_small_data(self):
+        index = NeighborIndex(self.data[:5], self.embedding[:5], n_neighbors=15)
+
+        self.assertEqual(index.transform(self.data[0]).shape, (1, 2))
+
+    def test_duplicate_points(self):
+        index = NeighborIndex(np.ones((100, 3)), np.zeros((100, 2)), leaf_size=8, n_neighbors=5)
+
+        np.testing.assert_allclose(index.transform(np.ones((1, 3))), [[0.0, 0.0]])
+
+    def test_supports(self):
+        reducer = MagicMock(_raw_data=self.data, embedding_=self.embedding, metric='euclidean')
+        self.assertTrue(NeighborIndex.supports(reducer))
+
+        reducer.metric = 'cosine'
+        self.assertFalse(NeighborIndex.supports(reducer))
+        self.assertFalse(NeighborIndex.supports(MagicMock()))
+        self.assertFalse(NeighborIndex.supports(None))
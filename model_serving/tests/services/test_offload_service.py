@@ -0,0 +1,46 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from model_serving.services.offload_service import OffloadService, INFERENCE, ENRICHMENT
+
+
+class TestOffloadService(unittest.TestCase):
+    def setUp(self):
+        self.service = OffloadService()
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_runs_inline_when_disabled(self):
+        thread = self.service.run(INFERENCE, threading.current_thread)
+
+        self.assertIs(thread, threading.current_thread())
+
+    def test_slow_enrichment_does_not_hold_up_inference(self):
+        app = MagicMock()
+        app.config = {'ASGI_INFERENCE_WORKERS': 1, 'ASGI_ENRICHMENT_WORKERS': 1}
+        self.service.init_app(app)
+        release = threading.Event()
+
+        # Occupies the only enrichment thread until released
+        explanation = threading.Thread(target=self.service.run, args=(ENRICHMENT, release.wait))
+        explanation.start()
+
+        started = time.perf_counter()
+        thread_name = self.service.run(INFERENCE, lambda: threading.current_thread().name)
+
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertTrue(thread_name.startswith('offload-inference'))
+
+        release.set()
+        explanation.join()
+
+    def test_errors_are_raised_in_the_caller(self):
+        app = MagicMock()
+        app.config = {}
+        self.service.init_app(app)
+
+        with self.assertRaises(ValueError):
+            self.service.run(ENRICHMENT, int, 'not a number')
@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from model_serving.services.pagination import encode_cursor, decode_cursor, get_limit, iter_json_array, iter_ndjson
+
+
+class TestPagination(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(["2024-01-01T00:00:00", "abc"])
+
+        self.assertEqual(decode_cursor(cursor, 2), ["2024-01-01T00:00:00", "abc"])
+
+    def test_invalid_cursor(self):
+        for cursor in ("not a cursor", encode_cursor(["a"]), encode_cursor([1, "a"]), encode_cursor([None, "a"])):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor, 2)
+
+    def test_limit_is_capped(self):
+        self.assertEqual(get_limit(None, 100, 1000), 100)
+        self.assertEqual(get_limit("5000", 100, 1000), 1000)
+
+        with self.assertRaises(ValueError):
+            get_limit("0", 100, 1000)
+
+    def test_generators(self):
+        items = [{"a": 1}, {"b": 2}]
+
+        self.assertEqual(json.loads(''.join(iter_json_array(items))), items)
+        self.assertEqual(json.loads(''.join(iter_json_array([]))), [])
+        self.assertEqual([json.loads(line) for line in ''.join(iter_ndjson(items)).splitlines()], items)
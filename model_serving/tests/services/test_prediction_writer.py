@@ -0,0 +1,133 @@
+from unittest.mock import patch, MagicMock
+
+from model_serving.tests.base import BaseTestCase
+from model_serving.services.database.database_client import db
+from model_serving.services.database.prediction import PredictionSQL, ModelSQL, ShapSQL
+from model_serving.services.database.prediction_writer import PredictionWriter
+from model_serving.models.prediction import Prediction, Shap
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+class TestPredictionWriter(BaseTestCase):
+    @patch('model_serving.gateways.mlflow_gateway.MLFlowGateway._load_model')
+    def setUp(self, mock_load_model):
+        mock_load_model.return_value = MagicMock()
+        super().setUp()
+
+        self.writer = PredictionWriter()
+        self.app.config['WRITE_BEHIND'] = {
+            'enabled': True, 'batch_size': 2, 'flush_interval_ms': 10, 'max_retries': 2, 'retry_backoff_ms': 1
+        }
+        self.writer.init_app(self.app)
+
+        self.model = ModelSQL(id="test_model_id", model_name="test_model", model_version=1, model_type=ModelType.CLASSIFICATION.value)
+
+    def _get_row(self, inputs):
+        prediction = Prediction(inputs=inputs)
+        prediction.value = Labels.BENIGN
+        prediction.probability = 0.9
+        return PredictionSQL.to_row(prediction, self.model)
+
+    def test_queued_predictions_are_written_on_flush(self):
+        rows = [self._get_row({"feature1": float(i)}) for i in range(5)]
+        on_written = MagicMock()
+
+        self.writer.enqueue(rows, on_written)
+        self.writer.flush()
+
+        on_written.assert_called_once()
+        with self.app.app_context():
+            for row in rows:
+                stored = db.session.get(PredictionSQL, row['id'])
+                self.assertEqual(stored.value, Labels.BENIGN.value)
+                self.assertIsNotNone(stored.created)
+
+    def test_rows_are_inserted_in_batches(self):
+        rows = [self._get_row({"feature1": float(i)}) for i in range(4)]
+
+        with patch.object(self.writer, '_write', wraps=self.writer._write) as mock_write:
+            self.writer.enqueue(rows)
+            self.writer.flush()
+
+        self.assertEqual(sum(len(call.args[0]) for call in mock_write.call_args_list), 4)
+        self.assertTrue(all(len(call.args[0]) <= 2 for call in mock_write.call_args_list))
+
+    def test_shap_rows_are_written_with_predictions(self):
+        row = self._get_row({"feature1": 1.0})
+        shap_row = ShapSQL.to_row(Shap(label=Labels.BENIGN.value, shap_values={"feature1": 0.5}), row['id'])
+
+        self.writer.enqueue([row], shap_rows=[shap_row])
+        self.writer.flush()
+
+        with self.app.app_context():
+            stored = db.session.get(PredictionSQL, row['id'])
+            self.assertEqual([shap.to_shap().shap_values for shap in stored.shaps], [{"feature1": 0.5}])
+
+    def test_empty_enqueue_calls_on_written(self):
+        on_written = MagicMock()
+
+        self.writer.enqueue([], on_written)
+        self.writer.enqueue([])
+
+        on_written.assert_called_once()
+
+    def test_failed_write_does_not_stop_writer(self):
+        on_written = MagicMock()
+
+        with patch.object(self.writer, '_write', side_effect=Exception("database is locked")):
+            with self.assertLogs(level='ERROR'):
+                self.writer.enqueue([self._get_row({"feature1": 1.0})], on_written)
+                self.writer.flush()
+
+        on_written.assert_not_called()
+
+        row = self._get_row({"feature1": 2.0})
+        self.writer.enqueue([row])
+        self.writer.flush()
+
+        with self.app.app_context():
+            self.assertIsNotNone(db.session.get(PredictionSQL, row['id']))
+
+    def test_failed_batch_is_retried(self):
+        row = self._get_row({"feature1": 1.0})
+        on_written = MagicMock()
+        write = self.writer._write
+        calls = []
+
+        def fail_once(items):
+            calls.append(items)
+            if len(calls) == 1:
+                raise Exception("database is locked")
+            write(items)
+
+        with patch.object(self.writer, '_write', side_effect=fail_once):
+            self.writer.enqueue([row], on_written)
+            self.writer.flush()
+
+        self.assertEqual(len(calls), 2)
+        on_written.assert_called_once()
+        with self.app.app_context():
+            self.assertIsNotNone(db.session.get(PredictionSQL, row['id']))
+
+    @patch('model_serving.services.database.prediction_writer.PREDICTION_WRITES_DROPPED')
+    def test_bad_row_does_not_drop_batch(self, mock_dropped):
+        first, second = self._get_row({"feature1": 1.0}), self._get_row({"feature1": 2.0})
+        duplicate = dict(first, inputs='{"feature1": 3.0}')
+
+        with self.assertLogs(level='ERROR'):
+            self.writer.enqueue([first])
+            self.writer.flush()
+            self.writer.enqueue([duplicate, second])
+            self.writer.flush()
+
+        mock_dropped.inc.assert_called_once_with(1)
+        with self.app.app_context():
+            self.assertIsNotNone(db.session.get(PredictionSQL, second['id']))
+            self.assertEqual(db.session.query(PredictionSQL).count(), 2)
+
+    def test_disabled_by_default(self):
+        writer = PredictionWriter()
+        self.app.config.pop('WRITE_BEHIND', None)
+        writer.init_app(self.app)
+
+        self.assertFalse(writer.enabled)
@@ -0,0 +1,123 @@
+import itertools
+import math
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+from model_serving.tests.base import create_metrics_dir
+
+create_metrics_dir()
+
+from model_serving.services.tree_explainer import TreeExplainer
+from model_serving.services.explainer_service import ExplainerService
+from model_serving.models.prediction import Model, Prediction
+from model_serving.domain.common_enums import ModelType, Labels
+
+
+def conditional_expectation(tree, x, subset, node=0):
+    """E[f(x) | x_S] with the features outside S integrated out along the tree's cover"""
+    if tree['children_left'][node] == -1:
+        return tree['value'][node]
+
+    left, right = tree['children_left'][node], tree['children_right'][node]
+    if tree['feature'][node] in subset:
+        return conditional_expectation(tree, x, subset, left if x[tree['feature'][node]] <= tree['threshold'][node] else right)
+
+    cover = tree['cover']
+    return (
+        cover[left] * conditional_expectation(tree, x, subset, left)
+        + cover[right] * conditional_expectation(tree, x, subset, right)
+    ) / cover[node]
+
+
+def brute_force_shap_values(explainer, x):
+    """Shapley values by enumerating every feature subset"""
+    n_features = explainer.n_features
+    phi = np.zeros((n_features, explainer.trees[0]['value'].shape[1]))
+
+    for tree in explainer.trees:
+        for feature in range(n_features):
+            others = [other for other in range(n_features) if other != feature]
+            for size in range(n_features):
+                weight = math.factorial(size) * math.factorial(n_features - size - 1) / math.factorial(n_features)
+                for subset in itertools.combinations(others, size):
+                    phi[feature] += weight * (
+                        conditional_expectation(tree, x, set(subset) | {feature})
+                        - conditional_expectation(tree, x, set(subset))
+                    )
+
+    return phi / len(explainer.trees)
+
+
+class TestTreeExplainer(unittest.TestCase):
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.X = random.rand(200, 4)
+        self.y = (self.X[:, 0] + self.X[:, 1] * self.X[:, 2] > 0.7).astype(int)
+
+    def test_matches_brute_force_classifier(self):
+        model = RandomForestClassifier(n_estimators=5, max_depth=6, random_state=0).fit(self.X, self.y)
+        explainer = TreeExplainer(model)
+
+        shap_values = explainer.shap_values(self.X[:5])
+
+        self.assertEqual(shap_values.shape, (5, 4, 2))
+        for row in range(5):
+            np.testing.assert_allclose(shap_values[row], brute_force_shap_values(explainer, self.X[row]), atol=1e-12)
+
+    def test_matches_brute_force_repeated_splits(self):
+        # Deep single tree so features are split on several times along a path
+        target = self.X[:, 0] * 3 + self.X[:, 1] ** 2 + self.X[:, 0] * self.X[:, 3]
+        explainer = TreeExplainer(DecisionTreeRegressor(max_depth=8, random_state=0).fit(self.X, target))
+
+        shap_values = explainer.shap_values(self.X[:5])
+
+        for row in range(5):
+            np.testing.assert_allclose(shap_values[row], brute_force_shap_values(explainer, self.X[row]), atol=1e-12)
+
+    def test_local_accuracy(self):
+        classifier = RandomForestClassifier(n_estimators=20, random_state=0).fit(self.X, self.y)
+        regressor = RandomForestRegressor(n_estimators=20, random_state=0).fit(self.X, self.X.sum(axis=1))
+
+        classifier_explainer = TreeExplainer(classifier)
+        regressor_explainer = TreeExplainer(regressor)
+
+        np.testing.assert_allclose(
+            classifier_explainer.shap_values(self.X).sum(axis=1) + classifier_explainer.expected_value,
+            classifier.predict_proba(self.X), atol=1e-10
+        )
+        np.testing.assert_allclose(
+            regressor_explainer.shap_values(self.X)[:, :, 0].sum(axis=1) + regressor_explainer.expected_value[0],
+            regressor.predict(self.X), atol=1e-10
+        )
+
+    def test_rows_split_across_steps(self):
+        explainer = TreeExplainer(RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, self.y))
+        expected = np.stack([explainer.shap_values(row)[0] for row in self.X[:20]])
+
+        with patch.object(TreeExplainer, '_BLOCK_ELEMENTS', 1):
+            np.testing.assert_allclose(explainer.shap_values(self.X[:20]), expected, atol=1e-12)
+
+    def test_unsupported_model(self):
+        with self.assertRaises(ValueError):
+            TreeExplainer(object())
+
+    def test_explainer_service_batch(self):
+        model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.CLASSIFICATION.value,
+            labels=[Labels.BENIGN, Labels.MALIGNANT],
+            feature_names=["f0", "f1", "f2", "f3"]
+        )
+        model._explainer = TreeExplainer(RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y))
+        predictions = [Prediction(inputs=dict(zip(model.feature_names, row))) for row in self.X[:3].tolist()]
+
+        ExplainerService.create_explanations(model, predictions)
+
+        expected = model._explainer.shap_values(self.X[:3])
+        self.assertEqual(predictions[2].shap_values[1].label, Labels.MALIGNANT.value)
+        self.assertAlmostEqual(predictions[2].shap_values[1].shap_values["f1"], expected[2, 1, 1])
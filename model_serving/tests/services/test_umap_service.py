@@ -19,144 +19,138 @@ class TestUMAPService(unittest.TestCase):
             labels=[Labels.BENIGN, Labels.MALIGNANT]
         )
         
-        # Clear any cached models before each test
-        UMAPService._umap_models = {}
+        # Clear any per-model state before each test
+        UMAPService._unfitted_models = set()
+        UMAPService._neighbor_indexes = {}
+        UMAPService.neighbor_index_params = None
+
+    def test_create_embedding_success(self):
+        reducer = MagicMock()
+        reducer.transform.return_value = np.array([[0.1, 0.2]])
+        self.sample_model._umap = reducer
 
-    @patch('umap.UMAP')
-    def test_create_embedding_success(self, mock_umap):
-        # Mock the UMAP transform method
-        mock_umap_instance = MagicMock()
-        mock_umap_instance.transform.return_value = np.array([[0.1, 0.2]])
-        mock_umap.return_value = mock_umap_instance
-        
-        # Call the service
         embeddings = umap_service.create_embedding(self.sample_model, self.sample_prediction)
-        
-        # Verify correct embeddings are returned
+
         self.assertEqual(embeddings, [0.1, 0.2])
-        
-        # Verify UMAP was created with default parameters
-        mock_umap.assert_called_once()
-        default_params = UMAPService._get_default_umap_params()
-        for key, value in default_params.items():
-            self.assertEqual(mock_umap.call_args[1][key], value)
-        
-        # Verify transform was called with the inputs
-        mock_umap_instance.transform.assert_called_once()
-        self.assertTrue(isinstance(mock_umap_instance.transform.call_args[0][0], pd.DataFrame))
+        reducer.transform.assert_called_once()
+        self.assertTrue(isinstance(reducer.transform.call_args[0][0], pd.DataFrame))
 
     @patch('umap.UMAP')
-    def test_create_embedding_with_custom_params(self, mock_umap):
-        # Mock the UMAP transform method
-        mock_umap_instance = MagicMock()
-        mock_umap_instance.transform.return_value = np.array([[0.1, 0.2]])
-        mock_umap.return_value = mock_umap_instance
-        
-        # Custom parameters
-        custom_params = {
-            "n_neighbors": 10,
-            "min_dist": 0.2,
-            "n_components": 3,
-            "random_state": 123
-        }
-        
-        # Call the service with custom parameters
-        embeddings = umap_service.create_embedding(
-            self.sample_model, 
-            self.sample_prediction, 
-            umap_params=custom_params
-        )
-        
-        # Verify UMAP was created with custom parameters
-        mock_umap.assert_called_once()
-        for key, value in custom_params.items():
-            self.assertEqual(mock_umap.call_args[1][key], value)
+    def test_no_reducer(self, mock_umap):
+        self.assertIsNone(umap_service.create_embedding(self.sample_model, self.sample_prediction))
+        self.assertIsNone(umap_service.create_embeddings(self.sample_model, [self.sample_prediction]))
 
-    @patch('umap.UMAP')
-    def test_model_persistence(self, mock_umap):
-        # Mock the UMAP transform method
-        mock_umap_instance = MagicMock()
-        mock_umap_instance.transform.return_value = np.array([[0.1, 0.2]])
-        mock_umap.return_value = mock_umap_instance
-        
-        # Call the service twice with the same model
-        umap_service.create_embedding(self.sample_model, self.sample_prediction)
-        umap_service.create_embedding(self.sample_model, self.sample_prediction)
-        
-        # Verify UMAP was only created once
-        mock_umap.assert_called_once()
-        
-        # Verify transform was called twice
-        self.assertEqual(mock_umap_instance.transform.call_count, 2)
-        
-        # Verify the model was cached
-        model_key = f"{self.sample_model.model_name}/{self.sample_model.model_version}"
-        self.assertIn(model_key, UMAPService._umap_models)
+        # No placeholder reducer is built on the request path
+        mock_umap.assert_not_called()
+
+    def test_handle_different_models(self):
+        self.sample_model._umap = MagicMock()
+        self.sample_model._umap.transform.return_value = np.array([[0.1, 0.2]])
 
-    @patch('umap.UMAP')
-    def test_handle_different_models(self, mock_umap):
-        # Mock the UMAP transform method
-        mock_umap_instance1 = MagicMock()
-        mock_umap_instance1.transform.return_value = np.array([[0.1, 0.2]])
-        mock_umap_instance2 = MagicMock()
-        mock_umap_instance2.transform.return_value = np.array([[0.3, 0.4]])
-        
-        mock_umap.side_effect = [mock_umap_instance1, mock_umap_instance2]
-        
-        # Create a second model
         second_model = Model(
             model_name="test_model",
             model_version="2",  # Different version
             model_type=ModelType.CLASSIFICATION,
             labels=[Labels.BENIGN, Labels.MALIGNANT]
         )
-        
-        # Call the service with different models
-        embeddings1 = umap_service.create_embedding(self.sample_model, self.sample_prediction)
-        embeddings2 = umap_service.create_embedding(second_model, self.sample_prediction)
-        
-        # Verify different embeddings
-        self.assertEqual(embeddings1, [0.1, 0.2])
-        self.assertEqual(embeddings2, [0.3, 0.4])
-        
-        # Verify UMAP was created twice for different models
-        self.assertEqual(mock_umap.call_count, 2)
-        
-        # Verify both models were cached
-        self.assertEqual(len(UMAPService._umap_models), 2)
+        second_model._umap = MagicMock()
+        second_model._umap.transform.return_value = np.array([[0.3, 0.4]])
+
+        # Each version embeds with its own reducer
+        self.assertEqual(umap_service.create_embedding(self.sample_model, self.sample_prediction), [0.1, 0.2])
+        self.assertEqual(umap_service.create_embedding(second_model, self.sample_prediction), [0.3, 0.4])
+
+    def test_error_handling(self):
+        self.sample_model._umap = MagicMock()
+        self.sample_model._umap.transform.side_effect = Exception("Test error")
 
-    @patch('umap.UMAP')
-    def test_error_handling(self, mock_umap):
-        # Mock UMAP to raise an exception
-        mock_umap_instance = MagicMock()
-        mock_umap_instance.transform.side_effect = Exception("Test error")
-        mock_umap.return_value = mock_umap_instance
-        
         # Call the service
         with self.assertLogs(level='ERROR') as log:
             embeddings = umap_service.create_embedding(self.sample_model, self.sample_prediction)
-            
+
             # Verify error is logged
             self.assertTrue(any("Error calculating UMAP embeddings" in message for message in log.output))
-            
+
             # Verify None is returned on error
             self.assertIsNone(embeddings)
 
     @patch('model_serving.monitoring.FUNCTION_DURATION')
-    @patch('umap.UMAP')
-    def test_monitoring_metrics(self, mock_umap, mock_duration):
-        # Mock the UMAP transform method
-        mock_umap_instance = MagicMock()
-        mock_umap_instance.transform.return_value = np.array([[0.1, 0.2]])
-        mock_umap.return_value = mock_umap_instance
-        
+    def test_monitoring_metrics(self, mock_duration):
+        self.sample_model._umap = MagicMock()
+        self.sample_model._umap.transform.return_value = np.array([[0.1, 0.2]])
+
         # Mock timer
         mock_timer = MagicMock()
         mock_duration.labels.return_value = mock_timer
-        
+
         # Call the service
         umap_service.create_embedding(self.sample_model, self.sample_prediction)
-        
+
         # Verify monitoring metrics are recorded
         mock_duration.labels.assert_called_once_with('create_umap_embedding')
         mock_timer.time.assert_called_once()
+
+    def test_create_embedding_unfitted_reducer(self):
+        reducer = MagicMock(spec=['transform'])
+        self.sample_model._umap = reducer
+
+        with self.assertLogs(level='WARNING') as log:
+            self.assertIsNone(umap_service.create_embedding(self.sample_model, self.sample_prediction))
+            self.assertIsNone(umap_service.create_embeddings(self.sample_model, [self.sample_prediction]))
+
+        # Skipped without attempting the transform, and only reported once per model
+        reducer.transform.assert_not_called()
+        self.assertEqual(len(log.output), 1)
+        self.assertIn("No fitted UMAP reducer", log.output[0])
+
+    @patch('umap.UMAP')
+    def test_fit_reducer(self, mock_umap):
+        training_inputs = np.random.rand(20, 2)
+
+        reducer = umap_service.fit_reducer(training_inputs, umap_params={"n_neighbors": 5})
+
+        mock_umap.assert_called_once_with(n_neighbors=5)
+        mock_umap.return_value.fit.assert_called_once_with(training_inputs)
+        self.assertIs(reducer, mock_umap.return_value.fit.return_value)
+
+    def test_create_embeddings_from_neighbor_index(self):
+        random = np.random.RandomState(0)
+        reducer = MagicMock(_raw_data=random.rand(200, 2), embedding_=random.rand(200, 2), metric='euclidean')
+        self.sample_model._umap = reducer
+        UMAPService.neighbor_index_params = {"n_trees": 2, "leaf_size": 16, "n_neighbors": 5}
+
+        umap_service.build_neighbor_index(self.sample_model)
+        embeddings = umap_service.create_embeddings(self.sample_model, [self.sample_prediction] * 3)
+
+        reducer.transform.assert_not_called()
+        self.assertEqual(len(embeddings), 3)
+        self.assertEqual(len(embeddings[0]), 2)
+
+    def test_neighbor_index_ignored_for_other_reducer(self):
+        random = np.random.RandomState(0)
+        UMAPService.neighbor_index_params = {"n_trees": 2, "leaf_size": 16, "n_neighbors": 5}
+        self.sample_model._umap = MagicMock(_raw_data=random.rand(200, 2), embedding_=random.rand(200, 2), metric='euclidean')
+        umap_service.build_neighbor_index(self.sample_model)
+
+        # The version was reloaded with a new reducer since the index was built
+        reloaded = MagicMock()
+        reloaded.transform.return_value = np.array([[0.1, 0.2]])
+        self.sample_model._umap = reloaded
+
+        self.assertEqual(umap_service.create_embedding(self.sample_model, self.sample_prediction), [0.1, 0.2])
+        reloaded.transform.assert_called_once()
+
+    def test_init_app_builds_indexes(self):
+        app = MagicMock()
+        app.config = {'UMAP_NEIGHBOR_INDEX': {'enabled': True, 'n_trees': 2, 'leaf_size': 16, 'n_neighbors': 5}}
+        random = np.random.RandomState(0)
+        self.sample_model._umap = MagicMock(_raw_data=random.rand(200, 2), embedding_=random.rand(200, 2), metric='euclidean')
+        gateway = MagicMock()
+        gateway.get_loaded_versions.return_value = [("test_model", "1")]
+        gateway.get_model.return_value = self.sample_model
+
+        umap_service.init_app(app, gateway)
+
+        gateway.add_load_listener.assert_called_once_with(umap_service.build_neighbor_index)
+        self.assertIn("test_model/1", UMAPService._neighbor_indexes)
+        self.assertTrue(app.config['UMAP_NEIGHBOR_INDEX']['enabled'])
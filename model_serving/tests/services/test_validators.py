@@ -35,4 +35,14 @@ class TestInputValidator(unittest.TestCase):
             model=self.model,
             features={"feature1": 1.0, "feature2": 2}
         )
-        self.assertEqual(errors, {})
\ No newline at end of file
+        self.assertEqual(errors, {})
+
+    def test_missing_schema_features(self):
+        self.model.feature_names = ["feature1", "feature2"]
+
+        errors = input_validator.validate_prediction_input(
+            model=self.model,
+            features={"feature1": 1.0}
+        )
+        self.assertIn("feature2", errors)
+        self.assertTrue("is required" in errors["feature2"])
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from model_serving.tests.base import create_metrics_dir
+
+create_metrics_dir()
+
+from model_serving.services.warmup_service import WarmupService
+from model_serving.models.prediction import Model
+from model_serving.domain.common_enums import ModelType
+
+
+class TestWarmupService(unittest.TestCase):
+    def setUp(self):
+        self.service = WarmupService()
+        self.service.iterations = 2
+        self.service.batch_size = 4
+
+        self.model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.REGRESSION.value,
+            feature_names=["feature1", "feature2"]
+        )
+        self.model.model = MagicMock()
+
+    @patch('model_serving.services.warmup_service.cache_service')
+    @patch('model_serving.services.warmup_service.explainer_service')
+    @patch('model_serving.services.warmup_service.umap_service')
+    @patch('model_serving.services.warmup_service.inference_service')
+    def test_warm_up_runs_every_stage(self, mock_inference, mock_umap, mock_explainer, mock_cache):
+        self.model._explainer = MagicMock()
+
+        self.service.warm_up(self.model)
+
+        self.assertEqual(mock_inference.create_inference.call_count, 2)
+        self.assertEqual(mock_umap.create_embedding.call_count, 2)
+        self.assertEqual(mock_explainer.create_explanation.call_count, 2)
+        self.assertEqual(len(mock_inference.create_batch_inference.call_args[0][1]), 4)
+
+        warmup_inputs = [call.args[1].inputs for call in mock_inference.create_inference.call_args_list]
+        self.assertEqual(warmup_inputs, [{"feature1": 0.0, "feature2": 0.0}, {"feature1": 1.0, "feature2": 1.0}])
+        mock_cache.invalidate.assert_called_once_with(self.model)
+
+    @patch('model_serving.services.warmup_service.inference_service')
+    def test_warm_up_requires_feature_schema(self, mock_inference):
+        self.model.feature_names = None
+
+        self.service.warm_up(self.model)
+
+        mock_inference.create_inference.assert_not_called()
+
+    @patch('model_serving.services.warmup_service.inference_service')
+    def test_warm_up_skips_unloaded_model(self, mock_inference):
+        self.model.model = None
+
+        self.service.warm_up(self.model)
+
+        mock_inference.create_inference.assert_not_called()
+
+    @patch('model_serving.services.warmup_service.inference_service')
+    def test_init_app_sets_ready(self, mock_inference):
+        app = MagicMock()
+        app.config = {'WARMUP_ITERATIONS': 1}
+        gateway = MagicMock()
+        gateway.get_loaded_versions.return_value = [("test_model", "1")]
+        gateway.get_model.return_value = self.model
+
+        self.service.init_app(app, gateway)
+
+        self.assertTrue(self.service.is_ready())
+        gateway.add_load_listener.assert_called_once_with(self.service.warm_up)
+        mock_inference.create_inference.assert_called_once()
+
+    @patch('model_serving.services.warmup_service.inference_service')
+    def test_wait_joins_background_warm_up(self, mock_inference):
+        app = MagicMock()
+        app.config = {'WARMUP_ITERATIONS': 1, 'WARMUP_IN_BACKGROUND': True}
+        gateway = MagicMock()
+        gateway.get_loaded_versions.return_value = [("test_model", "1")]
+        gateway.get_model.return_value = self.model
+
+        self.service.init_app(app, gateway)
+        self.service.wait()
+
+        self.assertTrue(self.service.is_ready())
+        mock_inference.create_inference.assert_called_once()
+
+    @patch('model_serving.services.warmup_service.inference_service')
+    def test_not_ready_until_warm_up_finishes(self, mock_inference):
+        gateway = MagicMock()
+        gateway.get_loaded_versions.side_effect = Exception("Registry unavailable")
+
+        self.assertFalse(self.service.is_ready())
+
+        with self.assertRaises(Exception):
+            self.service._warm_up_all(gateway)
+
+        # A failed warm-up must not leave the instance out of rotation forever
+        self.assertTrue(self.service.is_ready())
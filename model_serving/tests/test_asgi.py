@@ -0,0 +1,172 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from flask import Flask, Response, request, stream_with_context
+
+from model_serving.asgi import WSGIToASGI
+
+
+def create_test_app():
+    app = Flask(__name__)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return {'received': request.get_json(), 'query': request.args.get('q')}, 201
+
+    @app.route('/stream', methods=['POST'])
+    def stream():
+        def generate():
+            for line in request.stream:
+                yield line.upper()
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(0.3)
+        return 'slow'
+
+    @app.route('/fast')
+    def fast():
+        return 'fast'
+
+    return app
+
+
+async def call(asgi_app, method, path, body_chunks=(b'',), headers=(), query_string=b''):
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': idx < len(body_chunks) - 1}
+                for idx, chunk in enumerate(body_chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query_string,
+        'headers': list(headers), 'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80)
+    }
+    await asgi_app(scope, receive, send)
+
+    status = sent[0]['status']
+    chunks = [message['body'] for message in sent[1:] if message['body']]
+
+    return status, chunks
+
+
+class TestWSGIToASGI(unittest.TestCase):
+    def setUp(self):
+        self.asgi_app = WSGIToASGI(create_test_app(), max_workers=4)
+
+    def tearDown(self):
+        self.asgi_app.executor.shutdown(wait=True)
+
+    def test_request_and_response(self):
+        status, chunks = asyncio.run(call(
+            self.asgi_app, 'POST', '/echo',
+            body_chunks=(b'{"feat', b'ures": 1}'),
+            headers=[(b'content-type', b'application/json')],
+            query_string=b'q=test'
+        ))
+
+        self.assertEqual(status, 201)
+        self.assertEqual(json.loads(b''.join(chunks)), {'received': {'features': 1}, 'query': 'test'})
+
+    def test_streamed_body_and_response(self):
+        status, chunks = asyncio.run(call(
+            self.asgi_app, 'POST', '/stream',
+            body_chunks=(b'{"a": 1}\n{"b"', b': 2}\n'),
+            headers=[(b'content-type', b'application/x-ndjson')]
+        ))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(b''.join(chunks), b'{"A": 1}\n{"B": 2}\n')
+
+    def test_slow_request_does_not_block_loop(self):
+        async def scenario():
+            finished = []
+
+            async def run(path):
+                await call(self.asgi_app, 'GET', path)
+                finished.append(path)
+
+            await asyncio.gather(run('/slow'), run('/fast'))
+            return finished
+
+        self.assertEqual(asyncio.run(scenario()), ['/fast', '/slow'])
+
+    def test_lifespan_shutdown(self):
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        shutdown = []
+        self.asgi_app.on_shutdown = [lambda: shutdown.append(True)]
+
+        asyncio.run(self.asgi_app({'type': 'lifespan'}, receive, send))
+
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertEqual(shutdown, [True])
+
+    def test_lifespan_shutdown_failure_is_reported(self):
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        def fail():
+            raise RuntimeError('flush failed')
+
+        self.asgi_app.on_shutdown = [fail]
+
+        asyncio.run(self.asgi_app({'type': 'lifespan'}, receive, send))
+
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.failed'])
+
+    def test_websocket_is_closed(self):
+        sent = []
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.asgi_app({'type': 'websocket', 'path': '/ws'}, receive, send))
+
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': 1000}])
+
+
+class TestCreateAsgiApp(unittest.TestCase):
+    def test_predictions_are_written_behind(self):
+        from model_serving import app_factory
+        from model_serving.services.database.prediction_writer import prediction_writer
+        from model_serving.services.offload_service import offload_service
+
+        app = Flask(__name__)
+        app.config['WRITE_BEHIND'] = {'enabled': False, 'batch_size': 7}
+
+        with patch.object(app_factory, 'create_app', return_value=app), \
+                patch.object(offload_service, 'init_app'), patch.object(prediction_writer, 'init_app') as init_writer:
+            asgi_app = app_factory.create_asgi_app(object())
+
+        asgi_app.executor.shutdown(wait=True)
+
+        self.assertEqual(app.config['WRITE_BEHIND'], {'enabled': True, 'batch_size': 7})
+        init_writer.assert_called_once_with(app=app)
+        # Rows still queued at shutdown are committed before the process exits
+        self.assertEqual(asgi_app.on_shutdown, [prediction_writer.flush, offload_service.shutdown])
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from model_serving.tests.base import BaseTestCase
+from model_serving import batch_scoring
+from model_serving.gateways.mlflow_gateway import mlflow_gateway
+from model_serving.services.database.database_client import db
+from model_serving.services.database.prediction import PredictionSQL
+from model_serving.models.prediction import Model
+from model_serving.domain.common_enums import ModelType
+from model_serving.domain.exceptions import InvalidInputException, ModelNotFoundException
+
+
+class TestBatchScoring(BaseTestCase):
+    @patch('model_serving.gateways.mlflow_gateway.MLFlowGateway._load_model')
+    def setUp(self, mock_load_model):
+        mock_load_model.return_value = MagicMock()
+        super().setUp()
+
+        X = np.random.RandomState(0).rand(50, 2)
+        self.model = Model(
+            model_name="test_model",
+            model_version="1",
+            model_type=ModelType.REGRESSION.value,
+            mlflow_flavor="sklearn",
+            feature_names=["feature1", "feature2"]
+        )
+        self.model.model = LinearRegression().fit(X, X @ [2.0, -1.0])
+        self.model._explainer = MagicMock()
+        self.model._explainer.predict.side_effect = lambda inputs: np.asarray(inputs) * 0.5
+
+        self.directory = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.directory, 'input.csv')
+        self.output_path = os.path.join(self.directory, 'output.csv')
+        pd.DataFrame({"feature1": np.arange(25, dtype=float), "feature2": np.ones(25)}).to_csv(self.input_path, index=False)
+
+    def _run(self, workers, **kwargs):
+        with patch.object(mlflow_gateway, 'get_model', return_value=self.model), patch.object(batch_scoring, 'gc'):
+            return batch_scoring.run(
+                self.app, "test_model", "1", self.input_path, self.output_path, chunk_size=10, workers=workers, **kwargs
+            )
+
+    def test_scores_file_in_chunks_across_workers(self):
+        count = self._run(workers=2)
+
+        output = pd.read_csv(self.output_path)
+        self.assertEqual(count, 25)
+        self.assertEqual(list(output['feature1']), list(range(25)))
+        np.testing.assert_allclose(output['value'], output['feature1'] * 2.0 - 1.0, atol=1e-6)
+        self.assertEqual(output['prediction_id'].nunique(), 25)
+
+    def test_explanations_and_persistence(self):
+        self._run(workers=1, explain=True, persist=True)
+
+        output = pd.read_csv(self.output_path)
+        self.assertEqual(json.loads(output['shap_values'][4]), {"None": {"feature1": 2.0, "feature2": 0.5}})
+
+        with self.app.app_context():
+            self.assertEqual(db.session.query(PredictionSQL).count(), 25)
+            stored = db.session.get(PredictionSQL, output['prediction_id'][4])
+            self.assertEqual(len(stored.shaps), 1)
+
+    def test_unknown_model(self):
+        with patch.object(mlflow_gateway, 'get_model', return_value=None):
+            with self.assertRaises(ModelNotFoundException):
+                batch_scoring.run(self.app, "missing", "1", self.input_path, self.output_path, 10, 1)
+
+    def test_extra_columns_pass_through(self):
+        pd.DataFrame({
+            "id": [f"row-{idx}" for idx in range(25)], "feature2": np.ones(25), "feature1": np.arange(25, dtype=float)
+        }).to_csv(self.input_path, index=False)
+
+        self._run(workers=2)
+
+        output = pd.read_csv(self.output_path)
+        self.assertEqual(output['id'][3], "row-3")
+        np.testing.assert_allclose(output['value'], output['feature1'] * 2.0 - 1.0, atol=1e-6)
+
+    def test_missing_columns(self):
+        pd.DataFrame({"feature1": np.arange(25, dtype=float)}).to_csv(self.input_path, index=False)
+
+        with self.assertRaises(InvalidInputException) as context:
+            self._run(workers=2)
+
+        self.assertEqual(context.exception.details["validation_errors"], {"feature2": "Missing input column"})
+        self.assertFalse(os.path.exists(self.output_path))
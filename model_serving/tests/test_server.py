@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+from unittest.mock import MagicMock, patch
+
+from model_serving.tests.base import create_metrics_dir
+
+create_metrics_dir()
+
+from model_serving.server import PreforkServer
+
+
+class TestPreforkServer(unittest.TestCase):
+    def setUp(self):
+        self.server = PreforkServer(MagicMock(), workers=2)
+        self.server._socket = MagicMock()
+
+    @patch('prometheus_client.multiprocess')
+    @patch('model_serving.server.os')
+    def test_dead_worker_is_replaced(self, mock_os, mock_multiprocess):
+        self.server._children = {101, 102}
+        mock_os.fork.return_value = 103
+
+        def wait():
+            if self.server._children == {101, 102}:
+                return 101, 1
+            self.server._stopping = True
+            self.server._children.clear()
+            raise ChildProcessError()
+
+        mock_os.wait.side_effect = wait
+
+        self.server._monitor()
+
+        mock_multiprocess.mark_process_dead.assert_called_once_with(101)
+        mock_os.fork.assert_called_once()
+
+    @patch('prometheus_client.multiprocess')
+    @patch('model_serving.server.os')
+    def test_stop_terminates_workers_without_restart(self, mock_os, mock_multiprocess):
+        self.server._children = {101, 102}
+        mock_os.wait.side_effect = [(101, 0), (102, 0)]
+
+        self.server._handle_stop(15, None)
+        self.server._monitor()
+
+        self.assertEqual(mock_os.kill.call_count, 2)
+        mock_os.fork.assert_not_called()
+        self.assertEqual(mock_multiprocess.mark_process_dead.call_count, 2)
+        self.server._socket.close.assert_called_once()
+
+    @patch('model_serving.services.warmup_service.warmup_service')
+    @patch('model_serving.server.gc')
+    @patch('model_serving.services.database.database_client.db')
+    def test_prepare_fork_freezes_heap(self, mock_db, mock_gc, mock_warmup):
+        self.server._prepare_fork()
+
+        mock_warmup.wait.assert_called_once()
+
+        mock_db.engine.dispose.assert_called_once()
+        mock_gc.freeze.assert_called_once()
+
+
+class TestServerEntryPoint(unittest.TestCase):
+    def test_request_metrics_are_exported(self):
+        # A fresh interpreter, so prometheus_client is first imported through the server module as in production
+        script = textwrap.dedent("""
+            from unittest.mock import patch
+
+            import model_serving.server
+            from model_serving.app_factory import create_app
+            from model_serving.tests.config import TestConfig
+
+            with patch('model_serving.gateways.mlflow_gateway.MLFlowGateway._load_model'):
+                app = create_app(TestConfig)
+
+            client = app.test_client()
+            client.get('/metrics')
+            print(client.get('/metrics').data.decode())
+        """)
+        env = {
+            name: value for name, value in os.environ.items()
+            if name not in ('prometheus_multiproc_dir', 'PROMETHEUS_MULTIPROC_DIR')
+        }
+
+        result = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, timeout=120)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('request_count_total{', result.stdout)
@@ -4,4 +4,13 @@ setup(
     name="model_serving",
     version="0.1",
     packages=find_packages(),
-)
\ No newline at end of file
+    extras_require={
+        "parquet": ["pyarrow"],
+        "asgi": ["a2wsgi"],
+    },
+    entry_points={
+        "console_scripts": [
+            "model-serving-score=model_serving.batch_scoring:main",
+        ],
+    },
+)